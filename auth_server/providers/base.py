@@ -1,5 +1,6 @@
 """Base authentication provider interface."""
 
+import asyncio
 import logging
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Optional
@@ -192,4 +193,20 @@ class AuthProvider(ABC):
         Raises:
             ValueError: If token generation fails
         """
-        pass
\ No newline at end of file
+        pass
+
+    # Async variants used on the request path. The defaults run the blocking
+    # implementation in a worker thread; providers with native async I/O
+    # (pooled client, shared JWKS cache) override them.
+
+    async def validate_token_async(
+        self,
+        token: str,
+        **kwargs: Any
+    ) -> Dict[str, Any]:
+        """Async version of validate_token."""
+        return await asyncio.to_thread(self.validate_token, token, **kwargs)
+
+    async def get_jwks_async(self) -> Dict[str, Any]:
+        """Async version of get_jwks."""
+        return await asyncio.to_thread(self.get_jwks)
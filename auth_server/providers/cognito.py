@@ -2,7 +2,6 @@
 
 import json
 import logging
-import time
 from functools import lru_cache
 from typing import Any, Dict, List, Optional
 from urllib.parse import urlencode
@@ -11,6 +10,7 @@ import jwt
 import requests
 
 from .base import AuthProvider
+from .jwks import JWKSCache
 
 logging.basicConfig(
     level=logging.INFO,
@@ -46,11 +46,6 @@ class CognitoProvider(AuthProvider):
         self.region = region
         self.domain = domain
         
-        # Cache for JWKS
-        self._jwks_cache: Optional[Dict[str, Any]] = None
-        self._jwks_cache_time: float = 0
-        self._jwks_cache_ttl: int = 3600  # 1 hour
-        
         # Cognito endpoints
         if domain:
             self.cognito_domain = f"https://{domain}.auth.{region}.amazoncognito.com"
@@ -65,6 +60,9 @@ class CognitoProvider(AuthProvider):
         self.logout_url = f"{self.cognito_domain}/logout"
         self.issuer = f"https://cognito-idp.{region}.amazonaws.com/{user_pool_id}"
         
+        # JWKS cache shared by the sync and async validation paths
+        self.jwks_cache = JWKSCache(self.jwks_url)
+        
         logger.debug(f"Initialized Cognito provider for user pool '{user_pool_id}' in region '{region}'")
 
 
@@ -77,54 +75,9 @@ class CognitoProvider(AuthProvider):
         try:
             logger.debug("Validating Cognito JWT token")
             
-            # Get JWKS for validation
-            jwks = self.get_jwks()
-            
-            # Decode token header to get key ID
-            unverified_header = jwt.get_unverified_header(token)
-            kid = unverified_header.get('kid')
-            
-            if not kid:
-                raise ValueError("Token missing 'kid' in header")
-            
-            # Find matching key
-            signing_key = None
-            for key in jwks.get('keys', []):
-                if key.get('kid') == kid:
-                    from jwt import PyJWK
-                    signing_key = PyJWK(key).key
-                    break
-            
-            if not signing_key:
-                raise ValueError(f"No matching key found for kid: {kid}")
-            
-            # Validate and decode token
-            claims = jwt.decode(
-                token,
-                signing_key,
-                algorithms=['RS256'],
-                issuer=self.issuer,
-                audience=self.client_id,
-                options={
-                    "verify_exp": True,
-                    "verify_iat": True,
-                    "verify_aud": True
-                }
-            )
-            
-            logger.debug(f"Token validation successful for user: {claims.get('username', 'unknown')}")
-            
-            # Extract user info from claims
-            return {
-                'valid': True,
-                'username': claims.get('username', claims.get('sub')),
-                'email': claims.get('email'),
-                'groups': claims.get('cognito:groups', []),
-                'scopes': claims.get('scope', '').split() if claims.get('scope') else [],
-                'client_id': claims.get('client_id', self.client_id),
-                'method': 'cognito',
-                'data': claims
-            }
+            kid = self._get_token_kid(token)
+            signing_key = self.jwks_cache.get_signing_key_sync(kid)
+            return self._decode_token(token, signing_key)
             
         except jwt.ExpiredSignatureError:
             logger.warning("Token validation failed: Token has expired")
@@ -137,30 +90,84 @@ class CognitoProvider(AuthProvider):
             raise ValueError(f"Token validation failed: {e}")
 
 
-    def get_jwks(self) -> Dict[str, Any]:
-        """Get JSON Web Key Set from Cognito with caching."""
-        current_time = time.time()
-        
-        # Check if cache is still valid
-        if (self._jwks_cache and 
-            (current_time - self._jwks_cache_time) < self._jwks_cache_ttl):
-            logger.debug("Using cached JWKS")
-            return self._jwks_cache
-        
+    async def validate_token_async(
+        self,
+        token: str,
+        **kwargs: Any
+    ) -> Dict[str, Any]:
+        """Validate Cognito JWT token using the shared JWKS cache.
+
+        Rejections are logged at debug level only: callers on the request
+        path (/validate) write the reason to their access log.
+        """
         try:
-            logger.debug(f"Fetching JWKS from {self.jwks_url}")
-            response = requests.get(self.jwks_url, timeout=10)
-            response.raise_for_status()
-            
-            self._jwks_cache = response.json()
-            self._jwks_cache_time = current_time
-            
-            logger.debug("JWKS fetched and cached successfully")
-            return self._jwks_cache
+            logger.debug("Validating Cognito JWT token")
+            kid = self._get_token_kid(token)
+            signing_key = await self.jwks_cache.get_signing_key(kid)
+            return self._decode_token(token, signing_key)
             
+        except jwt.ExpiredSignatureError:
+            logger.debug("Token validation failed: Token has expired")
+            raise ValueError("Token has expired")
+        except jwt.InvalidTokenError as e:
+            logger.debug(f"Token validation failed: Invalid token - {e}")
+            raise ValueError(f"Invalid token: {e}")
         except Exception as e:
-            logger.error(f"Failed to retrieve JWKS from Cognito: {e}")
-            raise ValueError(f"Cannot retrieve JWKS: {e}")
+            logger.debug(f"Cognito token validation error: {e}")
+            raise ValueError(f"Token validation failed: {e}")
+
+
+    @staticmethod
+    def _get_token_kid(token: str) -> str:
+        """Key ID from the (unverified) token header."""
+        kid = jwt.get_unverified_header(token).get('kid')
+        if not kid:
+            raise ValueError("Token missing 'kid' in header")
+        return kid
+
+
+    def _decode_token(
+        self,
+        token: str,
+        signing_key: Any
+    ) -> Dict[str, Any]:
+        """Verify the token with its signing key and map the claims to a validation result."""
+        claims = jwt.decode(
+            token,
+            signing_key,
+            algorithms=['RS256'],
+            issuer=self.issuer,
+            audience=self.client_id,
+            options={
+                "verify_exp": True,
+                "verify_iat": True,
+                "verify_aud": True
+            }
+        )
+        
+        logger.debug(f"Token validation successful for user: {claims.get('username', 'unknown')}")
+        
+        # Extract user info from claims
+        return {
+            'valid': True,
+            'username': claims.get('username', claims.get('sub')),
+            'email': claims.get('email'),
+            'groups': claims.get('cognito:groups', []),
+            'scopes': claims.get('scope', '').split() if claims.get('scope') else [],
+            'client_id': claims.get('client_id', self.client_id),
+            'method': 'cognito',
+            'data': claims
+        }
+
+
+    def get_jwks(self) -> Dict[str, Any]:
+        """Get JSON Web Key Set from Cognito with caching."""
+        return self.jwks_cache.get_jwks_sync()
+
+
+    async def get_jwks_async(self) -> Dict[str, Any]:
+        """Get JSON Web Key Set from Cognito through the shared JWKS cache."""
+        return await self.jwks_cache.get_jwks()
 
 
     def exchange_code_for_token(
@@ -2,7 +2,8 @@
 
 import logging
 import os
-from typing import Optional
+import threading
+from typing import Dict, Optional
 
 from .base import AuthProvider
 from .cognito import CognitoProvider
@@ -15,6 +16,11 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# One provider per type for the life of the process, so its JWKS cache and the
+# pooled HTTP client are reused across requests
+_providers: Dict[str, AuthProvider] = {}
+_providers_lock = threading.Lock()
+
 
 def get_auth_provider(
     provider_type: Optional[str] = None
@@ -27,20 +33,36 @@ def get_auth_provider(
                       
     Returns:
         AuthProvider instance configured for the specified provider
+        (created on first use and reused afterwards)
         
     Raises:
         ValueError: If provider type is unknown or required config is missing
     """
     provider_type = provider_type or os.environ.get('AUTH_PROVIDER', 'cognito')
     
-    logger.info(f"Creating authentication provider: {provider_type}")
+    provider = _providers.get(provider_type)
+    if provider is not None:
+        return provider
     
-    if provider_type == 'keycloak':
-        return _create_keycloak_provider()
-    elif provider_type == 'cognito':
-        return _create_cognito_provider()
-    else:
-        raise ValueError(f"Unknown auth provider: {provider_type}")
+    with _providers_lock:
+        provider = _providers.get(provider_type)
+        if provider is None:
+            logger.info(f"Creating authentication provider: {provider_type}")
+            
+            if provider_type == 'keycloak':
+                provider = _create_keycloak_provider()
+            elif provider_type == 'cognito':
+                provider = _create_cognito_provider()
+            else:
+                raise ValueError(f"Unknown auth provider: {provider_type}")
+            _providers[provider_type] = provider
+    return provider
+
+
+def reset_auth_providers() -> None:
+    """Forget the cached providers (e.g. after the provider configuration changed)."""
+    with _providers_lock:
+        _providers.clear()
 
 
 def _create_keycloak_provider() -> KeycloakProvider:
@@ -0,0 +1,39 @@
+"""Shared pooled HTTP client for identity provider calls."""
+
+import logging
+import os
+from typing import Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Connection pool shared by all providers (JWKS, token, userinfo endpoints)
+PROVIDER_HTTP_TIMEOUT_SECONDS = float(os.environ.get("PROVIDER_HTTP_TIMEOUT_SECONDS", "10"))
+PROVIDER_HTTP_MAX_CONNECTIONS = int(os.environ.get("PROVIDER_HTTP_MAX_CONNECTIONS", "100"))
+PROVIDER_HTTP_MAX_KEEPALIVE = int(os.environ.get("PROVIDER_HTTP_MAX_KEEPALIVE", "20"))
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the process-wide AsyncClient, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(PROVIDER_HTTP_TIMEOUT_SECONDS, connect=min(5.0, PROVIDER_HTTP_TIMEOUT_SECONDS)),
+            limits=httpx.Limits(
+                max_connections=PROVIDER_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=PROVIDER_HTTP_MAX_KEEPALIVE,
+            ),
+        )
+        logger.debug("Created shared identity provider HTTP client")
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client (on application shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
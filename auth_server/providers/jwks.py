@@ -0,0 +1,294 @@
+"""JSON Web Key Set cache shared by the JWT-based providers."""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import requests
+from jwt import PyJWK
+
+from .http import get_http_client
+
+logger = logging.getLogger(__name__)
+
+JWKS_CACHE_TTL_SECONDS = int(os.environ.get("JWKS_CACHE_TTL_SECONDS", "3600"))
+# Keys that disappear from the provider's JWKS stay usable this long, so tokens
+# signed just before a rotation keep validating
+JWKS_KEY_OVERLAP_SECONDS = int(os.environ.get("JWKS_KEY_OVERLAP_SECONDS", "900"))
+# Background refresh happens at this fraction of the TTL
+JWKS_REFRESH_AHEAD_RATIO = float(os.environ.get("JWKS_REFRESH_AHEAD_RATIO", "0.8"))
+
+# Caches with a running background refresher, stopped on shutdown
+_refreshing_caches: "weakref.WeakSet[JWKSCache]" = weakref.WeakSet()
+
+
+@dataclass(frozen=True)
+class CachedKey:
+    """A JWK parsed once into its verification key."""
+
+    jwk: Dict[str, Any]
+    key: Any
+    retired_at: Optional[float] = None
+
+
+class JWKSCache:
+    """JWKS cache with pre-parsed keys, proactive refresh and key-rotation overlap.
+
+    - Keys are parsed into PyJWK objects once per JWKS version, not per token.
+    - Within ttl_seconds the cached set is used as is; a background task
+      refreshes it at refresh_ahead_ratio of the TTL so requests never wait.
+    - Up to stale_seconds past the TTL, the stale set is still served while one
+      refresh runs; beyond that callers wait for a refresh. Any number of
+      concurrent callers share a single request.
+    - Keys dropped by the provider are kept for overlap_seconds, so the cached
+      set is the union of the old and new keys during a rotation.
+    - A token signed with an unknown kid forces a refresh, at most once per
+      min_refetch_interval_seconds, so new keys are picked up immediately
+      without letting bogus kids hammer the identity provider.
+    """
+
+    def __init__(
+        self,
+        jwks_url: str,
+        ttl_seconds: int = JWKS_CACHE_TTL_SECONDS,
+        stale_seconds: int = 86400,
+        min_refetch_interval_seconds: float = 10.0,
+        overlap_seconds: int = JWKS_KEY_OVERLAP_SECONDS,
+        refresh_ahead_ratio: float = JWKS_REFRESH_AHEAD_RATIO,
+    ):
+        self.jwks_url = jwks_url
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.min_refetch_interval_seconds = min_refetch_interval_seconds
+        self.overlap_seconds = overlap_seconds
+        self.refresh_ahead_ratio = refresh_ahead_ratio
+        self._jwks: Optional[Dict[str, Any]] = None
+        self._keys: Dict[str, CachedKey] = {}
+        self._fetched_at: float = 0
+        self._last_attempt: float = 0
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._refresher_task: Optional[asyncio.Task] = None
+        self._sync_lock = threading.Lock()
+
+    @property
+    def age(self) -> float:
+        return time.time() - self._fetched_at
+
+    def peek(self) -> Optional[Dict[str, Any]]:
+        """Cached (merged) JWKS if still fresh, without any I/O."""
+        if self._jwks is not None and self.age < self.ttl_seconds:
+            return self._jwks
+        return None
+
+    def store(self, jwks: Dict[str, Any]) -> None:
+        """
+        Install a freshly fetched JWKS, merged with recently retired keys.
+
+        Unchanged keys keep their parsed objects; new keys are parsed once.
+        Encryption keys and keys that cannot be parsed are skipped.
+        """
+        now = time.time()
+        keys: Dict[str, CachedKey] = {}
+        for jwk in jwks.get('keys', []):
+            kid = jwk.get('kid')
+            if not kid or jwk.get('use') == 'enc':
+                # Encryption keys (Keycloak publishes one by default) never verify tokens
+                continue
+            existing = self._keys.get(kid)
+            if existing is not None and existing.jwk == jwk:
+                keys[kid] = CachedKey(jwk=jwk, key=existing.key)
+                continue
+            try:
+                keys[kid] = CachedKey(jwk=jwk, key=PyJWK(jwk).key)
+            except Exception as e:
+                logger.warning(f"Skipping unusable JWK {kid} from {self.jwks_url}: {e}")
+
+        for kid, cached in self._keys.items():
+            if kid in keys:
+                continue
+            retired_at = cached.retired_at or now
+            if now - retired_at < self.overlap_seconds:
+                if cached.retired_at is None:
+                    logger.info(f"Key {kid} removed from {self.jwks_url}, accepting it for {self.overlap_seconds}s more")
+                keys[kid] = CachedKey(jwk=cached.jwk, key=cached.key, retired_at=retired_at)
+            else:
+                logger.info(f"Dropped retired key {kid} of {self.jwks_url}")
+
+        # Single reference swaps: readers see either the old or the new set
+        self._keys = keys
+        self._jwks = {'keys': [cached.jwk for cached in keys.values()]}
+        self._fetched_at = now
+
+    async def _fetch(self) -> Dict[str, Any]:
+        self._last_attempt = time.time()
+        logger.debug(f"Fetching JWKS from {self.jwks_url}")
+        response = await get_http_client().get(self.jwks_url)
+        response.raise_for_status()
+        self.store(response.json())
+        logger.debug(f"JWKS fetched and cached ({len(self._keys)} keys)")
+        return self._jwks
+
+    async def refresh(self) -> Dict[str, Any]:
+        """Fetch the JWKS now; concurrent callers share one in-flight request."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.ensure_future(self._fetch())
+        # shield: a cancelled caller must not cancel the fetch other callers wait on
+        return await asyncio.shield(self._refresh_task)
+
+    def _refresh_in_background(self) -> None:
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        task = asyncio.ensure_future(self._fetch())
+        task.add_done_callback(self._log_background_failure)
+        self._refresh_task = task
+
+    @staticmethod
+    def _log_background_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Background JWKS refresh failed, serving stale keys: {task.exception()}")
+
+    def start_background_refresh(self) -> None:
+        """Refresh the JWKS ahead of expiry from a task on the running event loop."""
+        if self._refresher_task is not None and not self._refresher_task.done():
+            return
+        self._refresher_task = asyncio.ensure_future(self._refresh_loop())
+        _refreshing_caches.add(self)
+
+    async def stop_background_refresh(self) -> None:
+        if self._refresher_task is None:
+            return
+        self._refresher_task.cancel()
+        try:
+            await self._refresher_task
+        except asyncio.CancelledError:
+            pass
+        self._refresher_task = None
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            # Recomputed after every wake-up: an unknown-kid refetch may have moved the deadline
+            delay = self._fetched_at + self.ttl_seconds * self.refresh_ahead_ratio - time.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Scheduled JWKS refresh from {self.jwks_url} failed: {e}")
+                await asyncio.sleep(self.min_refetch_interval_seconds)
+
+    async def get_jwks(self) -> Dict[str, Any]:
+        """Current JWKS, refreshing as described in the class docstring.
+
+        Raises:
+            ValueError: If no usable JWKS can be obtained
+        """
+        self.start_background_refresh()
+        fresh = self.peek()
+        if fresh is not None:
+            return fresh
+        if self._jwks is not None and self.age < self.ttl_seconds + self.stale_seconds:
+            self._refresh_in_background()
+            return self._jwks
+        try:
+            return await self.refresh()
+        except Exception as e:
+            logger.error(f"Failed to retrieve JWKS from {self.jwks_url}: {e}")
+            raise ValueError(f"Cannot retrieve JWKS: {e}")
+
+    def _find_key(self, kid: str) -> Any:
+        cached = self._keys.get(kid)
+        if cached is None:
+            return None
+        if cached.retired_at is not None and time.time() - cached.retired_at >= self.overlap_seconds:
+            return None
+        return cached.key
+
+    def _should_refetch(self) -> bool:
+        return time.time() - self._last_attempt >= self.min_refetch_interval_seconds
+
+    async def get_signing_key(self, kid: str) -> Any:
+        """Verification key for a kid, refetching the JWKS once if the kid is unknown.
+
+        Raises:
+            ValueError: If no key with this kid exists
+        """
+        await self.get_jwks()
+        key = self._find_key(kid)
+        if key is None and self._should_refetch():
+            logger.info(f"Unknown kid {kid}, refetching JWKS")
+            try:
+                await self.refresh()
+                key = self._find_key(kid)
+            except Exception as e:
+                logger.warning(f"JWKS refetch for unknown kid failed: {e}")
+        if key is None:
+            raise ValueError(f"No matching key found for kid: {kid}")
+        return key
+
+    # Blocking variants for synchronous callers. They share the cached keys
+    # with the async path but fetch with requests on the calling thread.
+
+    def refresh_sync(self) -> Dict[str, Any]:
+        """Fetch the JWKS now, blocking; concurrent threads share one request."""
+        attempt = time.time()
+        with self._sync_lock:
+            if self._last_attempt >= attempt and self._jwks is not None:
+                # Another thread refreshed while this one waited for the lock
+                return self._jwks
+            self._last_attempt = time.time()
+            logger.debug(f"Fetching JWKS from {self.jwks_url}")
+            response = requests.get(self.jwks_url, timeout=10)
+            response.raise_for_status()
+            self.store(response.json())
+            return self._jwks
+
+    def get_jwks_sync(self) -> Dict[str, Any]:
+        """Current JWKS for synchronous callers; a stale set is kept if the refetch fails.
+
+        Raises:
+            ValueError: If no usable JWKS can be obtained
+        """
+        fresh = self.peek()
+        if fresh is not None:
+            return fresh
+        try:
+            return self.refresh_sync()
+        except Exception as e:
+            if self._jwks is not None and self.age < self.ttl_seconds + self.stale_seconds:
+                logger.warning(f"JWKS refresh from {self.jwks_url} failed, serving stale keys: {e}")
+                return self._jwks
+            logger.error(f"Failed to retrieve JWKS from {self.jwks_url}: {e}")
+            raise ValueError(f"Cannot retrieve JWKS: {e}")
+
+    def get_signing_key_sync(self, kid: str) -> Any:
+        """Blocking version of get_signing_key.
+
+        Raises:
+            ValueError: If no key with this kid exists
+        """
+        self.get_jwks_sync()
+        key = self._find_key(kid)
+        if key is None and self._should_refetch():
+            logger.info(f"Unknown kid {kid}, refetching JWKS")
+            try:
+                self.refresh_sync()
+                key = self._find_key(kid)
+            except Exception as e:
+                logger.warning(f"JWKS refetch for unknown kid failed: {e}")
+        if key is None:
+            raise ValueError(f"No matching key found for kid: {kid}")
+        return key
+
+
+async def stop_background_refreshers() -> None:
+    """Stop the background refresh of every cache (on application shutdown)."""
+    for cache in list(_refreshing_caches):
+        await cache.stop_background_refresh()
@@ -2,7 +2,6 @@
 
 import json
 import logging
-import time
 from functools import lru_cache
 from typing import Any, Dict, List, Optional
 from urllib.parse import urlencode
@@ -11,6 +10,7 @@ import jwt
 import requests
 
 from .base import AuthProvider
+from .jwks import JWKSCache
 
 logging.basicConfig(
     level=logging.INFO,
@@ -52,11 +52,6 @@ class KeycloakProvider(AuthProvider):
         self.m2m_client_id = m2m_client_id or client_id
         self.m2m_client_secret = m2m_client_secret or client_secret
 
-        # Cache for JWKS and configuration
-        self._jwks_cache: Optional[Dict[str, Any]] = None
-        self._jwks_cache_time: float = 0
-        self._jwks_cache_ttl: int = 3600  # 1 hour
-
         # Keycloak endpoints - use internal URL for server-to-server, external for browser redirects
         self.realm_url = f"{self.keycloak_url}/realms/{realm}"
         self.external_realm_url = f"{self.keycloak_external_url}/realms/{realm}"
@@ -67,6 +62,9 @@ class KeycloakProvider(AuthProvider):
         self.logout_url = f"{self.external_realm_url}/protocol/openid-connect/logout"
         self.config_url = f"{self.realm_url}/.well-known/openid_configuration"
 
+        # JWKS cache shared by the sync and async validation paths
+        self.jwks_cache = JWKSCache(self.jwks_url)
+
         logger.debug(f"Initialized Keycloak provider for realm '{realm}' at {keycloak_url} (external: {self.keycloak_external_url})")
 
 
@@ -79,72 +77,9 @@ class KeycloakProvider(AuthProvider):
         try:
             logger.debug("Validating Keycloak JWT token")
             
-            # Get JWKS for validation
-            jwks = self.get_jwks()
-            
-            # Decode token header to get key ID
-            unverified_header = jwt.get_unverified_header(token)
-            kid = unverified_header.get('kid')
-            
-            if not kid:
-                raise ValueError("Token missing 'kid' in header")
-            
-            # Find matching key
-            signing_key = None
-            for key in jwks.get('keys', []):
-                if key.get('kid') == kid:
-                    from jwt import PyJWK
-                    signing_key = PyJWK(key).key
-                    break
-            
-            if not signing_key:
-                raise ValueError(f"No matching key found for kid: {kid}")
-            
-            # Validate and decode token - accept multiple valid issuers
-            valid_issuers = [
-                self.external_realm_url,  # External URL: https://mcpgateway.ddns.net/realms/mcp-gateway
-                self.realm_url,           # Internal URL: http://keycloak:8080/realms/mcp-gateway
-                f"http://localhost:8080/realms/{self.realm}"  # Localhost URL for development
-            ]
-
-            claims = None
-            last_error = None
-            for issuer in valid_issuers:
-                try:
-                    claims = jwt.decode(
-                        token,
-                        signing_key,
-                        algorithms=['RS256'],
-                        issuer=issuer,
-                        audience=['account', self.client_id, self.m2m_client_id],
-                        options={
-                            "verify_exp": True,
-                            "verify_iat": True,
-                            "verify_aud": True
-                        }
-                    )
-                    logger.debug(f"Token validation successful with issuer: {issuer}")
-                    break
-                except jwt.InvalidIssuerError as e:
-                    last_error = e
-                    continue
-
-            if claims is None:
-                raise last_error or ValueError("Token validation failed with all valid issuers")
-            
-            logger.debug(f"Token validation successful for user: {claims.get('preferred_username', 'unknown')}")
-            
-            # Extract user info from claims
-            return {
-                'valid': True,
-                'username': claims.get('preferred_username', claims.get('sub')),
-                'email': claims.get('email'),
-                'groups': claims.get('groups', []),
-                'scopes': claims.get('scope', '').split() if claims.get('scope') else [],
-                'client_id': claims.get('azp', claims.get('aud', self.client_id)),
-                'method': 'keycloak',
-                'data': claims
-            }
+            kid = self._get_token_kid(token)
+            signing_key = self.jwks_cache.get_signing_key_sync(kid)
+            return self._decode_token(token, signing_key)
             
         except jwt.ExpiredSignatureError:
             logger.warning("Token validation failed: Token has expired")
@@ -157,30 +92,103 @@ class KeycloakProvider(AuthProvider):
             raise ValueError(f"Token validation failed: {e}")
 
 
-    def get_jwks(self) -> Dict[str, Any]:
-        """Get JSON Web Key Set from Keycloak with caching."""
-        current_time = time.time()
-        
-        # Check if cache is still valid
-        if (self._jwks_cache and 
-            (current_time - self._jwks_cache_time) < self._jwks_cache_ttl):
-            logger.debug("Using cached JWKS")
-            return self._jwks_cache
-        
+    async def validate_token_async(
+        self,
+        token: str,
+        **kwargs: Any
+    ) -> Dict[str, Any]:
+        """Validate Keycloak JWT token using the shared JWKS cache.
+
+        Rejections are logged at debug level only: callers on the request
+        path (/validate) write the reason to their access log.
+        """
         try:
-            logger.debug(f"Fetching JWKS from {self.jwks_url}")
-            response = requests.get(self.jwks_url, timeout=10)
-            response.raise_for_status()
-            
-            self._jwks_cache = response.json()
-            self._jwks_cache_time = current_time
-            
-            logger.debug("JWKS fetched and cached successfully")
-            return self._jwks_cache
+            logger.debug("Validating Keycloak JWT token")
+            kid = self._get_token_kid(token)
+            signing_key = await self.jwks_cache.get_signing_key(kid)
+            return self._decode_token(token, signing_key)
             
+        except jwt.ExpiredSignatureError:
+            logger.debug("Token validation failed: Token has expired")
+            raise ValueError("Token has expired")
+        except jwt.InvalidTokenError as e:
+            logger.debug(f"Token validation failed: Invalid token - {e}")
+            raise ValueError(f"Invalid token: {e}")
         except Exception as e:
-            logger.error(f"Failed to retrieve JWKS from Keycloak: {e}")
-            raise ValueError(f"Cannot retrieve JWKS: {e}")
+            logger.debug(f"Keycloak token validation error: {e}")
+            raise ValueError(f"Token validation failed: {e}")
+
+
+    @staticmethod
+    def _get_token_kid(token: str) -> str:
+        """Key ID from the (unverified) token header."""
+        kid = jwt.get_unverified_header(token).get('kid')
+        if not kid:
+            raise ValueError("Token missing 'kid' in header")
+        return kid
+
+
+    def _decode_token(
+        self,
+        token: str,
+        signing_key: Any
+    ) -> Dict[str, Any]:
+        """Verify the token with its signing key and map the claims to a validation result."""
+        # Validate and decode token - accept multiple valid issuers
+        valid_issuers = [
+            self.external_realm_url,  # External URL: https://mcpgateway.ddns.net/realms/mcp-gateway
+            self.realm_url,           # Internal URL: http://keycloak:8080/realms/mcp-gateway
+            f"http://localhost:8080/realms/{self.realm}"  # Localhost URL for development
+        ]
+
+        claims = None
+        last_error = None
+        for issuer in valid_issuers:
+            try:
+                claims = jwt.decode(
+                    token,
+                    signing_key,
+                    algorithms=['RS256'],
+                    issuer=issuer,
+                    audience=['account', self.client_id, self.m2m_client_id],
+                    options={
+                        "verify_exp": True,
+                        "verify_iat": True,
+                        "verify_aud": True
+                    }
+                )
+                logger.debug(f"Token validation successful with issuer: {issuer}")
+                break
+            except jwt.InvalidIssuerError as e:
+                last_error = e
+                continue
+
+        if claims is None:
+            raise last_error or ValueError("Token validation failed with all valid issuers")
+        
+        logger.debug(f"Token validation successful for user: {claims.get('preferred_username', 'unknown')}")
+        
+        # Extract user info from claims
+        return {
+            'valid': True,
+            'username': claims.get('preferred_username', claims.get('sub')),
+            'email': claims.get('email'),
+            'groups': claims.get('groups', []),
+            'scopes': claims.get('scope', '').split() if claims.get('scope') else [],
+            'client_id': claims.get('azp', claims.get('aud', self.client_id)),
+            'method': 'keycloak',
+            'data': claims
+        }
+
+
+    def get_jwks(self) -> Dict[str, Any]:
+        """Get JSON Web Key Set from Keycloak with caching."""
+        return self.jwks_cache.get_jwks_sync()
+
+
+    async def get_jwks_async(self) -> Dict[str, Any]:
+        """Get JSON Web Key Set from Keycloak through the shared JWKS cache."""
+        return await self.jwks_cache.get_jwks()
 
 
     def exchange_code_for_token(
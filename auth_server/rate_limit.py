@@ -0,0 +1,303 @@
+"""
+Sliding-window rate limiting over pluggable counter stores.
+
+The limiter uses the sliding-window-counter approximation: each key keeps the
+count of the current fixed window and of the previous one, and the rate is
+estimated as previous * (unexpired fraction of the previous window) + current.
+Every check is O(1) in time and keeps two integers per key.
+
+Stores:
+- MemoryCounterStore: a dict in this process (single worker)
+- SharedCounterStore: SQLite on /dev/shm, shared by all workers on one host
+- RedisCounterStore: Redis, shared across hosts; InMemoryRedis is a
+  dependency-free stand-in implementing the few commands it uses
+"""
+
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SHARED_PATH = "/dev/shm/mcp-auth-rate-limit.sqlite3"
+
+
+def _window_position(window_seconds: int, now: float) -> Tuple[int, float]:
+    """Index of the current fixed window and the weight of the previous one."""
+    window = int(now // window_seconds)
+    elapsed = (now - window * window_seconds) / window_seconds
+    return window, 1.0 - elapsed
+
+
+class CounterStore(ABC):
+    """Atomic check-and-increment of sliding-window counters."""
+
+    @abstractmethod
+    def hit(self, key: str, limit: int, window_seconds: int) -> Tuple[bool, float]:
+        """
+        Count one event for key if that keeps it within limit.
+
+        Args:
+            key: Counter key (e.g. a user)
+            limit: Maximum events per window
+            window_seconds: Length of the sliding window
+
+        Returns:
+            (allowed, estimated number of events in the window including this one if allowed)
+        """
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryCounterStore(CounterStore):
+    """Counters in a dict of this process; expired keys are swept once per window."""
+
+    def __init__(self):
+        # key -> (window index, current count, previous count)
+        self._counters: Dict[str, Tuple[int, int, int]] = {}
+        self._lock = threading.Lock()
+        self._next_sweep: float = 0
+
+    def hit(self, key: str, limit: int, window_seconds: int) -> Tuple[bool, float]:
+        now = time.time()
+        window, weight = _window_position(window_seconds, now)
+        with self._lock:
+            if now >= self._next_sweep:
+                self._sweep(window)
+                self._next_sweep = now + window_seconds
+            stored_window, current, previous = self._counters.get(key, (window, 0, 0))
+            if stored_window != window:
+                # Roll forward: the old current window becomes the previous one if adjacent
+                previous = current if stored_window == window - 1 else 0
+                current = 0
+            estimate = previous * weight + current
+            if estimate + 1 > limit:
+                self._counters[key] = (window, current, previous)
+                return False, estimate
+            self._counters[key] = (window, current + 1, previous)
+            return True, estimate + 1
+
+    def _sweep(self, window: int) -> None:
+        expired = [key for key, (stored, _, _) in self._counters.items() if stored < window - 1]
+        for key in expired:
+            del self._counters[key]
+
+
+class SharedCounterStore(CounterStore):
+    """
+    Counters in a SQLite database on a RAM-backed filesystem.
+
+    All uvicorn workers of a host open the same file; BEGIN IMMEDIATE
+    serializes the read-modify-write across processes.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        if path is None:
+            shm = os.path.dirname(DEFAULT_SHARED_PATH)
+            path = DEFAULT_SHARED_PATH if os.path.isdir(shm) else os.path.join(
+                tempfile.gettempdir(), os.path.basename(DEFAULT_SHARED_PATH)
+            )
+        self.path = path
+        self._local = threading.local()
+        self._next_sweep: float = 0
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS counters ("
+            "key TEXT PRIMARY KEY, window INTEGER NOT NULL, current INTEGER NOT NULL, previous INTEGER NOT NULL)"
+        )
+        logger.info(f"Using shared rate-limit counters at {self.path}")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode; transactions are opened explicitly
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = conn
+        return conn
+
+    def hit(self, key: str, limit: int, window_seconds: int) -> Tuple[bool, float]:
+        now = time.time()
+        window, weight = _window_position(window_seconds, now)
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if now >= self._next_sweep:
+                conn.execute("DELETE FROM counters WHERE window < ?", (window - 1,))
+                self._next_sweep = now + window_seconds
+            row = conn.execute(
+                "SELECT window, current, previous FROM counters WHERE key = ?", (key,)
+            ).fetchone()
+            stored_window, current, previous = row if row else (window, 0, 0)
+            if stored_window != window:
+                previous = current if stored_window == window - 1 else 0
+                current = 0
+            estimate = previous * weight + current
+            allowed = estimate + 1 <= limit
+            if allowed:
+                current += 1
+                estimate += 1
+            conn.execute(
+                "INSERT OR REPLACE INTO counters (key, window, current, previous) VALUES (?, ?, ?, ?)",
+                (key, window, current, previous),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return allowed, estimate
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class RedisCounterStore(CounterStore):
+    """
+    Counters in Redis: one key per (counter, fixed window), expiring after two windows.
+
+    An allowed event is an INCR; a rejected one is rolled back with DECR, so
+    clients retrying while limited do not extend their own lockout.
+    """
+
+    def __init__(self, client: Any, prefix: str = "mcp-auth:rate:"):
+        self.client = client
+        self.prefix = prefix
+
+    def hit(self, key: str, limit: int, window_seconds: int) -> Tuple[bool, float]:
+        window, weight = _window_position(window_seconds, time.time())
+        current_key = f"{self.prefix}{key}:{window}"
+        pipe = self.client.pipeline()
+        pipe.incr(current_key)
+        pipe.expire(current_key, window_seconds * 2)
+        pipe.get(f"{self.prefix}{key}:{window - 1}")
+        current, _, previous = pipe.execute()
+        estimate = int(previous or 0) * weight + int(current)
+        if estimate > limit:
+            self.client.decr(current_key)
+            return False, estimate - 1
+        return True, estimate
+
+    def close(self) -> None:
+        close = getattr(self.client, "close", None)
+        if close is not None:
+            close()
+
+
+class InMemoryRedis:
+    """In-process stand-in for the Redis commands used by RedisCounterStore."""
+
+    def __init__(self):
+        self._values: Dict[str, int] = {}
+        self._expires: Dict[str, float] = {}
+        self._lock = threading.RLock()
+
+    def _expire_if_due(self, key: str) -> None:
+        deadline = self._expires.get(key)
+        if deadline is not None and deadline <= time.time():
+            self._values.pop(key, None)
+            self._expires.pop(key, None)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            self._expire_if_due(key)
+            value = self._values.get(key)
+            return None if value is None else str(value).encode()
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        with self._lock:
+            self._expire_if_due(key)
+            self._values[key] = self._values.get(key, 0) + amount
+            return self._values[key]
+
+    def decr(self, key: str, amount: int = 1) -> int:
+        return self.incr(key, -amount)
+
+    def expire(self, key: str, seconds: int) -> bool:
+        with self._lock:
+            if key not in self._values:
+                return False
+            self._expires[key] = time.time() + seconds
+            return True
+
+    def pipeline(self) -> "_InMemoryPipeline":
+        return _InMemoryPipeline(self)
+
+
+class _InMemoryPipeline:
+    """Queued commands executed atomically, like a MULTI/EXEC pipeline."""
+
+    def __init__(self, redis: InMemoryRedis):
+        self._redis = redis
+        self._commands: List[Tuple[str, tuple]] = []
+
+    def __getattr__(self, name: str):
+        def queue(*args):
+            self._commands.append((name, args))
+            return self
+        return queue
+
+    def execute(self) -> List[Any]:
+        with self._redis._lock:
+            results = [getattr(self._redis, name)(*args) for name, args in self._commands]
+        self._commands = []
+        return results
+
+
+def create_counter_store(backend: str, shared_path: Optional[str] = None, redis_url: Optional[str] = None) -> CounterStore:
+    """
+    Build a counter store.
+
+    Args:
+        backend: 'memory', 'shared' or 'redis' ('redis' without a URL uses InMemoryRedis)
+        shared_path: SQLite file for the 'shared' backend
+        redis_url: Redis connection URL for the 'redis' backend
+
+    Returns:
+        The counter store
+
+    Raises:
+        ValueError: If the backend is unknown or the redis package is missing
+    """
+    if backend == "memory":
+        return MemoryCounterStore()
+    if backend == "shared":
+        return SharedCounterStore(shared_path)
+    if backend == "redis":
+        if not redis_url:
+            logger.warning("No Redis URL configured, rate-limit counters use an in-process Redis stand-in")
+            return RedisCounterStore(InMemoryRedis())
+        try:
+            import redis
+        except ImportError:
+            raise ValueError("The 'redis' rate-limit store requires the redis package (pip install auth_server[redis])")
+        return RedisCounterStore(redis.Redis.from_url(redis_url))
+    raise ValueError(f"Unknown rate-limit store: {backend}")
+
+
+class RateLimiter:
+    """A fixed limit of events per sliding window, counted in a CounterStore."""
+
+    def __init__(self, store: CounterStore, limit: int, window_seconds: int):
+        self.store = store
+        self.limit = limit
+        self.window_seconds = window_seconds
+
+    def hit(self, key: str) -> bool:
+        """Count an event for key; False if it would exceed the limit."""
+        allowed, _ = self.store.hit(key, self.limit, self.window_seconds)
+        return allowed
+
+    def hit_with_count(self, key: str) -> Tuple[bool, float]:
+        """Like hit, also returning the estimated number of events in the window."""
+        return self.store.hit(key, self.limit, self.window_seconds)
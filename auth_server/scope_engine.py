@@ -0,0 +1,162 @@
+"""
+Compiled scope authorization for MCP server methods and tools.
+
+scopes.yml maps each scope to a list of server configurations:
+
+    mcp-servers-restricted/read:
+    - server: fininfo
+      methods: [initialize, tools/list, tools/call]
+      tools: [get_stock_aggregates]
+
+ScopeEngine compiles that once into scope -> server -> (methods, tools) sets,
+so a decision costs one dict lookup per user scope, and memoizes decisions per
+(scope set, server, method, tool). The group_mappings section is resolved the
+same way, memoized per set of groups.
+"""
+
+import logging
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (allowed methods, allowed tools) of one scope on one server
+Grant = Tuple[FrozenSet[str], FrozenSet[str]]
+
+
+def compile_scopes(scopes_config: Dict[str, Any]) -> Dict[str, Dict[str, Grant]]:
+    """
+    Index the server permissions of scopes.yml by scope, then server.
+
+    Entries that are not lists of server configurations (UI-Scopes,
+    group_mappings) grant no server access and are skipped. Several entries
+    for the same server within a scope are merged.
+
+    Args:
+        scopes_config: Parsed scopes.yml
+
+    Returns:
+        Mapping of scope -> server name -> (methods, tools)
+    """
+    compiled: Dict[str, Dict[str, Grant]] = {}
+    for scope, server_configs in (scopes_config or {}).items():
+        if not isinstance(server_configs, list):
+            continue
+        servers: Dict[str, Tuple[set, set]] = {}
+        for server_config in server_configs:
+            if not isinstance(server_config, dict) or not server_config.get('server'):
+                continue
+            methods, tools = servers.setdefault(server_config['server'], (set(), set()))
+            methods.update(server_config.get('methods') or [])
+            tools.update(server_config.get('tools') or [])
+        compiled[scope] = {
+            server: (frozenset(methods), frozenset(tools))
+            for server, (methods, tools) in servers.items()
+        }
+    return compiled
+
+
+def _grant_allows(grant: Grant, method: str, tool_name: Optional[str]) -> bool:
+    methods, tools = grant
+    if method == 'tools/call':
+        # tools/call needs the specific tool; without one, only an explicit tools/call entry in tools
+        return tool_name in tools if tool_name else method in tools
+    # Methods may also be listed under tools (backward compatibility)
+    return method in methods or method in tools
+
+
+class ScopeEngine:
+    """Authorizes server/method/tool access against a compiled scopes.yml."""
+
+    def __init__(self, scopes_config: Optional[Dict[str, Any]], memo_size: int = 4096):
+        # An empty or missing configuration allows everything, as before compilation existed
+        self.enforced = bool(scopes_config)
+        self.grants = compile_scopes(scopes_config)
+        self.group_mappings: Dict[str, Tuple[str, ...]] = {
+            group: tuple(scopes)
+            for group, scopes in ((scopes_config or {}).get('group_mappings') or {}).items()
+        }
+        self._decide_cached = lru_cache(maxsize=memo_size)(self._decide)
+        self._map_groups_cached = lru_cache(maxsize=memo_size)(self._map_groups)
+        if not self.enforced:
+            logger.warning("No scopes configuration loaded, server/tool access will not be restricted")
+
+    def _decide(self, scopes: FrozenSet[str], server_name: str, method: str, tool_name: Optional[str]) -> bool:
+        for scope in scopes:
+            grant = self.grants.get(scope, {}).get(server_name)
+            if grant is not None and _grant_allows(grant, method, tool_name):
+                return True
+        return False
+
+    def _map_groups(self, groups: FrozenSet[str]) -> Tuple[str, ...]:
+        scopes: Dict[str, None] = {}
+        # Sorted so the result does not depend on the order groups were listed in
+        for group in sorted(groups):
+            group_scopes = self.group_mappings.get(group)
+            if group_scopes is None:
+                logger.debug(f"No scope mapping found for group: {group}")
+                continue
+            logger.debug(f"Mapped group '{group}' to scopes: {list(group_scopes)}")
+            scopes.update(dict.fromkeys(group_scopes))
+        return tuple(scopes)
+
+    def scopes_for_groups(self, groups: Iterable[str]) -> List[str]:
+        """
+        MCP scopes granted to a set of identity provider groups by group_mappings.
+
+        Args:
+            groups: Group names from the identity provider
+
+        Returns:
+            Unique scopes, in group name order
+        """
+        return list(self._map_groups_cached(frozenset(groups)))
+
+    def is_allowed(
+        self, user_scopes: Iterable[str], server_name: str, method: str, tool_name: Optional[str] = None
+    ) -> bool:
+        """
+        Whether any of the user's scopes allows the method (or tool, for tools/call) on the server.
+
+        Args:
+            user_scopes: Scopes of the caller
+            server_name: Name of the MCP server
+            method: JSON-RPC method (e.g. 'initialize', 'tools/list', 'tools/call')
+            tool_name: Tool being called, for tools/call
+
+        Returns:
+            True if access is allowed, False otherwise
+        """
+        if not self.enforced:
+            return True
+        scopes = frozenset(user_scopes)
+        if logger.isEnabledFor(logging.DEBUG):
+            for line in self.explain(scopes, server_name, method, tool_name):
+                logger.debug(line)
+        return self._decide_cached(scopes, server_name, method, tool_name)
+
+    def explain(
+        self, user_scopes: Iterable[str], server_name: str, method: str, tool_name: Optional[str] = None
+    ) -> List[str]:
+        """Human-readable decision trace, one line per user scope."""
+        trace = [f"Authorizing {server_name}.{method} (tool: {tool_name}) for scopes {sorted(user_scopes)}"]
+        for scope in sorted(user_scopes):
+            if scope not in self.grants:
+                trace.append(f"  scope '{scope}': not in configuration")
+                continue
+            grant = self.grants[scope].get(server_name)
+            if grant is None:
+                trace.append(f"  scope '{scope}': no entry for server '{server_name}'")
+            elif _grant_allows(grant, method, tool_name):
+                trace.append(f"  scope '{scope}': GRANTED")
+            else:
+                trace.append(f"  scope '{scope}': methods {sorted(grant[0])}, tools {sorted(grant[1])} do not allow it")
+        return trace
+
+    def cache_info(self):
+        """Hit/miss statistics of the decision memo."""
+        return self._decide_cached.cache_info()
+
+    def group_cache_info(self):
+        """Hit/miss statistics of the group mapping memo."""
+        return self._map_groups_cached.cache_info()
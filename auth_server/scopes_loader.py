@@ -0,0 +1,211 @@
+"""
+Hot-reloadable scopes.yml loader.
+
+Shared by the auth server and the registry (which imports it as
+auth_server.scopes_loader), so it depends on nothing but PyYAML. The file is
+polled for changes from a background thread; a new version is parsed,
+validated and compiled off the request path and swapped in with a single
+reference assignment, so readers always see one complete version. An invalid
+file is logged and ignored, keeping the last good version in service.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+# Top-level keys of scopes.yml that are not server permission scopes
+UI_SCOPES_KEY = 'UI-Scopes'
+GROUP_MAPPINGS_KEY = 'group_mappings'
+
+
+def validate_scopes_config(config: Any) -> Dict[str, Any]:
+    """
+    Check the structure of a parsed scopes.yml.
+
+    Args:
+        config: Result of yaml.safe_load on the file
+
+    Returns:
+        The configuration (an empty file yields an empty dict)
+
+    Raises:
+        ValueError: If the structure is not what the authorizers expect
+    """
+    if config is None:
+        return {}
+    if not isinstance(config, dict):
+        raise ValueError("scopes configuration must be a mapping")
+    for key, value in config.items():
+        if key == GROUP_MAPPINGS_KEY:
+            if not isinstance(value, dict) or not all(isinstance(scopes, list) for scopes in value.values()):
+                raise ValueError(f"'{GROUP_MAPPINGS_KEY}' must map each group to a list of scopes")
+        elif key == UI_SCOPES_KEY:
+            if not isinstance(value, dict):
+                raise ValueError(f"'{UI_SCOPES_KEY}' must be a mapping")
+        else:
+            if not isinstance(value, list):
+                raise ValueError(f"scope '{key}' must be a list of server entries")
+            for entry in value:
+                if not isinstance(entry, dict) or not entry.get('server'):
+                    raise ValueError(f"scope '{key}' has an entry without a 'server'")
+                for list_key in ('methods', 'tools'):
+                    if not isinstance(entry.get(list_key) or [], list):
+                        raise ValueError(f"scope '{key}' server '{entry['server']}': '{list_key}' must be a list")
+    return config
+
+
+@dataclass(frozen=True)
+class ScopesSnapshot:
+    """One loaded version of scopes.yml, with whatever the owner compiled from it."""
+
+    version: int
+    config: Dict[str, Any]
+    compiled: Any = None
+    loaded_at: float = field(default_factory=time.time)
+    # SHA-256 of the file's bytes; unlike the version, comparable across processes
+    content_hash: Optional[str] = None
+
+
+class ScopesLoader:
+    """Loads scopes.yml, watches it for changes and swaps in new versions atomically."""
+
+    def __init__(
+        self,
+        path: Path,
+        compile: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        poll_interval_seconds: float = 5.0,
+    ):
+        self.path = Path(path)
+        self.poll_interval_seconds = poll_interval_seconds
+        self._compile = compile
+        self._listeners: List[Callable[[ScopesSnapshot], None]] = []
+        self._file_signature: Optional[Tuple[int, int, int]] = None
+        self._reload_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._watch_thread: Optional[threading.Thread] = None
+
+        self._snapshot: Optional[ScopesSnapshot] = None
+        if not self.reload():
+            # Version 0: empty configuration until a valid file appears
+            self._snapshot = ScopesSnapshot(version=0, config={}, compiled=self._compile_config({}))
+
+    @property
+    def snapshot(self) -> ScopesSnapshot:
+        """The current version; hold on to it to use one consistent version for a whole request."""
+        return self._snapshot
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        return self._snapshot.config
+
+    @property
+    def compiled(self) -> Any:
+        return self._snapshot.compiled
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    @property
+    def content_hash(self) -> Optional[str]:
+        return self._snapshot.content_hash
+
+    def add_listener(self, callback: Callable[[ScopesSnapshot], None]) -> None:
+        """Call callback with every newly swapped-in snapshot."""
+        self._listeners.append(callback)
+
+    def _compile_config(self, config: Dict[str, Any]) -> Any:
+        return self._compile(config) if self._compile else None
+
+    def _read_signature(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            # stat follows symlinks, so ConfigMap-style symlink swaps are noticed too
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def reload(self) -> bool:
+        """
+        Load, validate and compile the file, then swap it in as a new version.
+
+        Returns:
+            True if a new version was installed, False if the file was missing
+            or invalid (the current version stays in service)
+        """
+        with self._reload_lock:
+            signature = self._read_signature()
+            if signature is None:
+                logger.warning(f"Scopes config file not found at {self.path}")
+                return False
+            try:
+                with open(self.path, 'rb') as f:
+                    content = f.read()
+                config = validate_scopes_config(yaml.safe_load(content))
+                compiled = self._compile_config(config)
+            except Exception as e:
+                # Remember the signature so a broken file is reported once, not on every poll
+                self._file_signature = signature
+                current = self._snapshot.version if self._snapshot else 0
+                logger.error(f"Ignoring invalid scopes configuration {self.path}, keeping version {current}: {e}")
+                return False
+
+            version = self._snapshot.version + 1 if self._snapshot else 1
+            snapshot = ScopesSnapshot(
+                version=version,
+                config=config,
+                compiled=compiled,
+                content_hash=hashlib.sha256(content).hexdigest(),
+            )
+            self._snapshot = snapshot
+            self._file_signature = signature
+            logger.info(
+                f"Loaded scopes configuration version {snapshot.version} from {self.path} "
+                f"({len(config.get(GROUP_MAPPINGS_KEY, {}))} group mappings, sha256 {snapshot.content_hash[:12]})"
+            )
+
+        for callback in self._listeners:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                logger.error(f"Scopes reload listener failed: {e}")
+        return True
+
+    def check_for_changes(self) -> bool:
+        """Reload if the file changed since the last load attempt; returns True if a new version was installed."""
+        signature = self._read_signature()
+        if signature is None or signature == self._file_signature:
+            return False
+        return self.reload()
+
+    def start_watching(self) -> None:
+        """Poll the file from a daemon thread."""
+        if self.poll_interval_seconds <= 0:
+            return
+        if self._watch_thread is not None and self._watch_thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._watch_thread = threading.Thread(target=self._watch, name="scopes-loader", daemon=True)
+        self._watch_thread.start()
+
+    def stop_watching(self) -> None:
+        self._stop_event.set()
+        if self._watch_thread is not None:
+            self._watch_thread.join(timeout=self.poll_interval_seconds + 1)
+            self._watch_thread = None
+
+    def _watch(self) -> None:
+        while not self._stop_event.wait(self.poll_interval_seconds):
+            try:
+                self.check_for_changes()
+            except Exception as e:
+                logger.error(f"Scopes config watch failed: {e}")
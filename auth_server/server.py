@@ -4,34 +4,41 @@ Configuration is passed via headers instead of environment variables.
 """
 
 import argparse
+import asyncio
 import logging
 import os
 import boto3
 import jwt
-import requests
 import json
 import yaml
 import time
 import uuid
 import hashlib
-from jwt.api_jwk import PyJWK
+import hmac
 from datetime import datetime
 from typing import Dict, Optional, List, Any
 from functools import lru_cache
 from botocore.exceptions import ClientError
-from fastapi import FastAPI, Header, HTTPException, Request, Cookie
+from fastapi import FastAPI, Header, HTTPException, Request, Cookie, Depends
+from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse, Response, RedirectResponse
 import uvicorn
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, ValidationError
 from pathlib import Path
 from itsdangerous import URLSafeTimedSerializer, SignatureExpired, BadSignature
 import secrets
 import urllib.parse
-import httpx
 from string import Template
 
 # Import provider factory
 from providers.factory import get_auth_provider
+from providers.http import close_http_client, get_http_client
+from providers.jwks import JWKSCache, stop_background_refreshers
+from scope_engine import ScopeEngine
+from scopes_loader import ScopesLoader
+from rate_limit import RateLimiter, create_counter_store
+from token_cache import TokenValidationCache, get_expires_at
+from validate_log import ValidateLogRecord
 
 # Configure logging
 logging.basicConfig(
@@ -47,23 +54,61 @@ JWT_AUDIENCE = "mcp-registry"
 MAX_TOKEN_LIFETIME_HOURS = 24
 DEFAULT_TOKEN_LIFETIME_HOURS = 8
 
-# Rate limiting for token generation (simple in-memory counter)
-user_token_generation_counts = {}
-MAX_TOKENS_PER_USER_PER_HOUR = 10
+# Upper bound on how long nginx may cache a successful /validate result (see
+# capture_body.lua); the actual TTL never exceeds the credential's remaining lifetime
+AUTH_CACHE_MAX_TTL_SECONDS = int(os.environ.get("AUTH_CACHE_MAX_TTL_SECONDS", "30"))
 
-# Load scopes configuration
-def load_scopes_config():
-    """Load the scopes configuration from scopes.yml"""
-    try:
-        scopes_file = Path(__file__).parent / "scopes.yml"
-        with open(scopes_file, 'r') as f:
-            return yaml.safe_load(f)
-    except Exception as e:
-        logger.error(f"Failed to load scopes configuration: {e}")
-        return {}
+# Session cookie lifetime enforced by the signer
+SESSION_MAX_AGE_SECONDS = 28800
+
+# Verified-token cache: results live until the token expires, at most TOKEN_CACHE_MAX_TTL_SECONDS;
+# failed validations are remembered for TOKEN_CACHE_NEGATIVE_TTL_SECONDS
+token_cache = TokenValidationCache(
+    max_entries=int(os.environ.get("TOKEN_CACHE_MAX_ENTRIES", "10000")),
+    max_ttl_seconds=int(os.environ.get("TOKEN_CACHE_MAX_TTL_SECONDS", "300")),
+    negative_ttl_seconds=int(os.environ.get("TOKEN_CACHE_NEGATIVE_TTL_SECONDS", "5")),
+)
+
+# Fraction of successful /validate requests written to the access log (denials are always logged)
+VALIDATE_LOG_SAMPLE_RATE = float(os.environ.get("VALIDATE_LOG_SAMPLE_RATE", "0.01"))
+
+# Decoded session cookies with their mapped scopes, kept until the session expires (the
+# signer's max_age) so repeat requests from a browser session skip the HMAC check
+session_cache = TokenValidationCache(
+    max_entries=int(os.environ.get("SESSION_CACHE_MAX_ENTRIES", "10000")),
+    max_ttl_seconds=SESSION_MAX_AGE_SECONDS,
+    negative_ttl_seconds=int(os.environ.get("TOKEN_CACHE_NEGATIVE_TTL_SECONDS", "5")),
+)
+
+# Maximum number of items accepted by POST /validate/batch
+VALIDATE_BATCH_MAX_ITEMS = int(os.environ.get("VALIDATE_BATCH_MAX_ITEMS", "1000"))
+# Shared secret that internal callers of POST /validate/batch send in X-Internal-Api-Key.
+# Without it the endpoint would answer token validity and scope questions for anyone who can
+# reach the auth server, so it stays disabled until a key is configured.
+INTERNAL_API_KEY = os.environ.get("INTERNAL_API_KEY")
+
+# Rate limiting for token generation: a sliding hour per user, counted in a store shared by
+# all workers when running several (RATE_LIMIT_STORE: memory, shared or redis)
+MAX_TOKENS_PER_USER_PER_HOUR = 10
+AUTH_SERVER_WORKERS = int(os.environ.get("AUTH_SERVER_WORKERS", "1"))
+RATE_LIMIT_STORE = os.environ.get("RATE_LIMIT_STORE") or ("shared" if AUTH_SERVER_WORKERS > 1 else "memory")
+token_generation_limiter = RateLimiter(
+    create_counter_store(
+        RATE_LIMIT_STORE,
+        shared_path=os.environ.get("RATE_LIMIT_SHARED_PATH") or None,
+        redis_url=os.environ.get("RATE_LIMIT_REDIS_URL") or None,
+    ),
+    limit=MAX_TOKENS_PER_USER_PER_HOUR,
+    window_seconds=3600,
+)
 
-# Global scopes configuration
-SCOPES_CONFIG = load_scopes_config()
+# scopes.yml, compiled into scope -> server -> (methods, tools) sets and reloaded when the file
+# changes (polled every SCOPES_RELOAD_INTERVAL_SECONDS; 0 disables reloading)
+scopes_loader = ScopesLoader(
+    Path(__file__).parent / "scopes.yml",
+    compile=ScopeEngine,
+    poll_interval_seconds=float(os.environ.get("SCOPES_RELOAD_INTERVAL_SECONDS", "5")),
+)
 
 # Utility functions for GDPR/SOX compliance
 def mask_sensitive_id(value: str) -> str:
@@ -133,27 +178,8 @@ def map_groups_to_scopes(groups: List[str]) -> List[str]:
     Returns:
         List of MCP scopes
     """
-    scopes = []
-    group_mappings = SCOPES_CONFIG.get('group_mappings', {})
-    
-    for group in groups:
-        if group in group_mappings:
-            group_scopes = group_mappings[group]
-            scopes.extend(group_scopes)
-            logger.debug(f"Mapped group '{group}' to scopes: {group_scopes}")
-        else:
-            logger.debug(f"No scope mapping found for group: {group}")
-    
-    # Remove duplicates while preserving order
-    seen = set()
-    unique_scopes = []
-    for scope in scopes:
-        if scope not in seen:
-            seen.add(scope)
-            unique_scopes.append(scope)
-    
-    logger.info(f"Final mapped scopes: {unique_scopes}")
-    return unique_scopes
+    # Precomputed per set of groups by the compiled scopes configuration
+    return scopes_loader.compiled.scopes_for_groups(groups)
 
 def validate_session_cookie(cookie_value: str) -> Dict[str, any]:
     """
@@ -181,9 +207,28 @@ def validate_session_cookie(cookie_value: str) -> Dict[str, any]:
         logger.warning("Global signer not configured for session cookie validation")
         raise ValueError("Session cookie validation not configured")
     
+    # The mapped scopes depend on scopes.yml, so results are cached per configuration version
+    cache_key = session_cache.make_key(cookie_value, str(scopes_loader.version))
+    cached_result = session_cache.get(cache_key)
+    if cached_result:
+        return cached_result
+    cached_failure = session_cache.get_failure(cache_key)
+    if cached_failure:
+        raise ValueError(cached_failure)
+    
+    try:
+        validation_result = _decode_session_cookie(cookie_value)
+    except ValueError as e:
+        session_cache.put_failure(cache_key, str(e))
+        raise
+    session_cache.put(cache_key, validation_result)
+    return validation_result
+
+def _decode_session_cookie(cookie_value: str) -> Dict[str, Any]:
+    """Verify a session cookie with the signer and build its validation result."""
     try:
         # Decrypt cookie (max_age=28800 for 8 hours)
-        data = signer.loads(cookie_value, max_age=28800)
+        data, signed_at = signer.loads(cookie_value, max_age=SESSION_MAX_AGE_SECONDS, return_timestamp=True)
         
         # Extract user info
         username = data.get('username')
@@ -192,7 +237,7 @@ def validate_session_cookie(cookie_value: str) -> Dict[str, any]:
         # Map groups to scopes
         scopes = map_groups_to_scopes(groups)
         
-        logger.info(f"Session cookie validated for user: {hash_username(username)}")
+        logger.debug(f"Session cookie validated for user: {hash_username(username)}")
         
         return {
             'valid': True,
@@ -201,6 +246,7 @@ def validate_session_cookie(cookie_value: str) -> Dict[str, any]:
             'method': 'session_cookie',
             'groups': groups,
             'client_id': '',  # Not applicable for session
+            'expires_at': signed_at.timestamp() + SESSION_MAX_AGE_SECONDS,
             'data': data  # Include full data for consistency
         }
     except SignatureExpired:
@@ -213,6 +259,19 @@ def validate_session_cookie(cookie_value: str) -> Dict[str, any]:
         logger.error(f"Session cookie validation error: {e}")
         raise ValueError(f"Session cookie validation failed: {e}")
 
+def get_auth_cache_ttl(validation_result: Dict[str, Any]) -> int:
+    """
+    Seconds nginx may cache a successful validation result.
+    
+    Bounded by AUTH_CACHE_MAX_TTL_SECONDS and by the credential's expiry, so a
+    cached decision never outlives the token or session it was made for.
+    Returns 0 (do not cache) when the expiry is unknown.
+    """
+    expires_at = get_expires_at(validation_result)
+    if not expires_at or AUTH_CACHE_MAX_TTL_SECONDS <= 0:
+        return 0
+    return max(0, min(AUTH_CACHE_MAX_TTL_SECONDS, int(expires_at - time.time())))
+
 def parse_server_and_tool_from_url(original_url: str) -> tuple[Optional[str], Optional[str]]:
     """
     Parse server name and tool name from the original URL and request payload.
@@ -255,88 +314,10 @@ def validate_server_tool_access(server_name: str, method: str, tool_name: str, u
         True if access is allowed, False otherwise
     """
     try:
-        # Verbose logging: Print input parameters
-        logger.info(f"=== VALIDATE_SERVER_TOOL_ACCESS START ===")
-        logger.info(f"Requested server: '{server_name}'")
-        logger.info(f"Requested method: '{method}'")
-        logger.info(f"Requested tool: '{tool_name}'")
-        logger.info(f"User scopes: {user_scopes}")
-        logger.info(f"Available scopes config keys: {list(SCOPES_CONFIG.keys()) if SCOPES_CONFIG else 'None'}")
-        
-        if not SCOPES_CONFIG:
-            logger.warning("No scopes configuration loaded, allowing access")
-            logger.info(f"=== VALIDATE_SERVER_TOOL_ACCESS END: ALLOWED (no config) ===")
-            return True
-            
-        # Check each user scope to see if it grants access
-        for scope in user_scopes:
-            logger.info(f"--- Checking scope: '{scope}' ---")
-            scope_config = SCOPES_CONFIG.get(scope, [])
-            
-            if not scope_config:
-                logger.info(f"Scope '{scope}' not found in configuration")
-                continue
-                
-            logger.info(f"Scope '{scope}' config: {scope_config}")
-            
-            # The scope_config is directly a list of server configurations
-            # since the permission type is already encoded in the scope name
-            for server_config in scope_config:
-                logger.info(f"  Examining server config: {server_config}")
-                server_config_name = server_config.get('server')
-                logger.info(f"  Server name in config: '{server_config_name}' vs requested: '{server_name}'")
-                
-                if server_config_name == server_name:
-                    logger.info(f"  ✓ Server name matches!")
-                    
-                    # Check methods first
-                    allowed_methods = server_config.get('methods', [])
-                    logger.info(f"  Allowed methods for server '{server_name}': {allowed_methods}")
-                    logger.info(f"  Checking if method '{method}' is in allowed methods...")
-                    
-                    # for all methods except tools/call we are good if the method is allowed
-                    # for tools/call we need to do an extra validation to check if the tool
-                    # itself is allowed or not
-                    if method in allowed_methods and method != 'tools/call':
-                        logger.info(f"  ✓ Method '{method}' found in allowed methods!")
-                        logger.info(f"Access granted: scope '{scope}' allows access to {server_name}.{method}")
-                        logger.info(f"=== VALIDATE_SERVER_TOOL_ACCESS END: GRANTED ===")
-                        return True
-                    
-                    # Check tools if method not found in methods
-                    allowed_tools = server_config.get('tools', [])
-                    logger.info(f"  Allowed tools for server '{server_name}': {allowed_tools}")
-                    
-                    # For tools/call, check if the specific tool is allowed
-                    if method == 'tools/call' and tool_name:
-                        logger.info(f"  Checking if tool '{tool_name}' is in allowed tools for tools/call...")
-                        if tool_name in allowed_tools:
-                            logger.info(f"  ✓ Tool '{tool_name}' found in allowed tools!")
-                            logger.info(f"Access granted: scope '{scope}' allows access to {server_name}.{method} for tool {tool_name}")
-                            logger.info(f"=== VALIDATE_SERVER_TOOL_ACCESS END: GRANTED ===")
-                            return True
-                        else:
-                            logger.info(f"  ✗ Tool '{tool_name}' NOT found in allowed tools")
-                    else:
-                        # For other methods, check if method is in tools list (backward compatibility)
-                        logger.info(f"  Checking if method '{method}' is in allowed tools...")
-                        if method in allowed_tools:
-                            logger.info(f"  ✓ Method '{method}' found in allowed tools!")
-                            logger.info(f"Access granted: scope '{scope}' allows access to {server_name}.{method}")
-                            logger.info(f"=== VALIDATE_SERVER_TOOL_ACCESS END: GRANTED ===")
-                            return True
-                        else:
-                            logger.info(f"  ✗ Method '{method}' NOT found in allowed tools")
-                else:
-                    logger.info(f"  ✗ Server name does not match")
-        
-        logger.warning(f"Access denied: no scope allows access to {server_name}.{method} (tool: {tool_name}) for user scopes: {user_scopes}")
-        logger.info(f"=== VALIDATE_SERVER_TOOL_ACCESS END: DENIED ===")
-        return False
-        
+        # Decision trace is only built when debug logging is on (see ScopeEngine.is_allowed)
+        return scopes_loader.compiled.is_allowed(user_scopes, server_name, method, tool_name)
     except Exception as e:
         logger.error(f"Error validating server/tool access: {e}")
-        logger.info(f"=== VALIDATE_SERVER_TOOL_ACCESS END: ERROR ===")
         return False  # Deny access on error
 
 def validate_scope_subset(user_scopes: List[str], requested_scopes: List[str]) -> bool:
@@ -374,30 +355,10 @@ def check_rate_limit(username: str) -> bool:
     Returns:
         True if under rate limit, False if exceeded
     """
-    current_time = int(time.time())
-    current_hour = current_time // 3600
-    
-    # Clean up old entries (older than 1 hour)
-    keys_to_remove = []
-    for key in user_token_generation_counts.keys():
-        stored_hour = int(key.split(':')[1])
-        if current_hour - stored_hour > 1:
-            keys_to_remove.append(key)
-    
-    for key in keys_to_remove:
-        del user_token_generation_counts[key]
-    
-    # Check current hour count
-    rate_key = f"{username}:{current_hour}"
-    current_count = user_token_generation_counts.get(rate_key, 0)
-    
-    if current_count >= MAX_TOKENS_PER_USER_PER_HOUR:
-        logger.warning(f"Rate limit exceeded for user {hash_username(username)}: {current_count} tokens this hour")
-        return False
-    
-    # Increment counter
-    user_token_generation_counts[rate_key] = current_count + 1
-    return True
+    allowed, count = token_generation_limiter.hit_with_count(username)
+    if not allowed:
+        logger.warning(f"Rate limit exceeded for user {hash_username(username)}: {count:.0f} tokens in the last hour")
+    return allowed
 
 # Create FastAPI app
 app = FastAPI(
@@ -415,6 +376,30 @@ class TokenValidationResponse(BaseModel):
     client_id: Optional[str] = None
     username: Optional[str] = None
 
+class BatchValidationItem(BaseModel):
+    """One check of a batch: a bearer token (or already known scopes) and the access to decide"""
+    token: Optional[str] = None
+    scopes: Optional[List[str]] = None
+    server: Optional[str] = None
+    method: Optional[str] = None
+    tool: Optional[str] = None
+
+class BatchValidationRequest(BaseModel):
+    """Request model for batch validation"""
+    items: List[BatchValidationItem] = Field(..., max_length=VALIDATE_BATCH_MAX_ITEMS)
+
+class BatchValidationDecision(BaseModel):
+    """Decision for one batch item"""
+    valid: Optional[bool] = None
+    allowed: bool
+    username: Optional[str] = None
+    scopes: List[str] = []
+    error: Optional[str] = None
+
+class BatchValidationResponse(BaseModel):
+    """Response model for batch validation, with one decision per item in request order"""
+    results: List[BatchValidationDecision]
+
 class GenerateTokenRequest(BaseModel):
     """Request model for token generation"""
     user_context: Dict[str, Any]
@@ -445,7 +430,7 @@ class SimplifiedCognitoValidator:
         """
         self.default_region = region
         self._cognito_clients = {}  # Cache boto3 clients by region
-        self._jwks_cache = {}  # Cache JWKS by user pool
+        self._jwks_caches: Dict[str, JWKSCache] = {}  # JWKS (with pre-parsed keys) by user pool
         
     def _get_cognito_client(self, region: str):
         """Get or create boto3 cognito client for region"""
@@ -453,29 +438,20 @@ class SimplifiedCognitoValidator:
             self._cognito_clients[region] = boto3.client('cognito-idp', region_name=region)
         return self._cognito_clients[region]
     
+    def _get_jwks_cache(self, user_pool_id: str, region: str) -> JWKSCache:
+        """Get or create the JWKS cache of a user pool"""
+        cache_key = f"{region}:{user_pool_id}"
+        cache = self._jwks_caches.get(cache_key)
+        if cache is None:
+            issuer = f"https://cognito-idp.{region}.amazonaws.com/{user_pool_id}"
+            cache = self._jwks_caches.setdefault(cache_key, JWKSCache(f"{issuer}/.well-known/jwks.json"))
+        return cache
+    
     def _get_jwks(self, user_pool_id: str, region: str) -> Dict:
         """
         Get JSON Web Key Set (JWKS) from Cognito with caching
         """
-        cache_key = f"{region}:{user_pool_id}"
-        
-        if cache_key not in self._jwks_cache:
-            try:
-                issuer = f"https://cognito-idp.{region}.amazonaws.com/{user_pool_id}"
-                jwks_url = f"{issuer}/.well-known/jwks.json"
-                
-                response = requests.get(jwks_url, timeout=10)
-                response.raise_for_status()
-                jwks = response.json()
-                
-                self._jwks_cache[cache_key] = jwks
-                logger.debug(f"Retrieved JWKS for {cache_key} with {len(jwks.get('keys', []))} keys")
-                
-            except Exception as e:
-                logger.error(f"Failed to retrieve JWKS from {jwks_url}: {e}")
-                raise ValueError(f"Cannot retrieve JWKS: {e}")
-        
-        return self._jwks_cache[cache_key]
+        return self._get_jwks_cache(user_pool_id, region).get_jwks_sync()
 
     def validate_jwt_token(self, 
                           access_token: str, 
@@ -508,30 +484,8 @@ class SimplifiedCognitoValidator:
             if not kid:
                 raise ValueError("Token missing 'kid' in header")
             
-            # Get JWKS and find matching key
-            jwks = self._get_jwks(user_pool_id, region)
-            signing_key = None
-            
-            for key in jwks.get('keys', []):
-                if key.get('kid') == kid:
-                    # Handle different versions of PyJWT
-                    try:
-                        # For newer versions of PyJWT
-                        from jwt.algorithms import RSAAlgorithm
-                        signing_key = RSAAlgorithm.from_jwk(key)
-                    except (ImportError, AttributeError):
-                        try:
-                            # For older versions of PyJWT
-                            from jwt.algorithms import get_default_algorithms
-                            algorithms = get_default_algorithms()
-                            signing_key = algorithms['RS256'].from_jwk(key)
-                        except (ImportError, AttributeError):
-                            # For PyJWT 2.0.0+
-                            signing_key = PyJWK.from_jwk(json.dumps(key)).key
-                    break
-            
-            if not signing_key:
-                raise ValueError(f"No matching key found for kid: {kid}")
+            # Pre-parsed key from the cached JWKS (refetched if the kid is unknown)
+            signing_key = self._get_jwks_cache(user_pool_id, region).get_signing_key_sync(kid)
             
             # Set up issuer for validation
             issuer = f"https://cognito-idp.{region}.amazonaws.com/{user_pool_id}"
@@ -775,13 +729,87 @@ class SimplifiedCognitoValidator:
                 logger.debug(f"Boto3 validation failed: {boto3_error}")
                 raise ValueError(f"All validation methods failed. JWT: {jwt_error}, Boto3: {boto3_error}")
 
-# Create global validator instance
-validator = SimplifiedCognitoValidator()
+# Create global validator instance (AUTH_SERVER_REGION carries --region into worker processes)
+validator = SimplifiedCognitoValidator(region=os.environ.get("AUTH_SERVER_REGION", "us-east-1"))
+
+@app.on_event("startup")
+async def start_scopes_watcher():
+    scopes_loader.start_watching()
+
+@app.on_event("shutdown")
+async def stop_scopes_watcher():
+    scopes_loader.stop_watching()
+
+@app.on_event("shutdown")
+async def close_provider_clients():
+    await stop_background_refreshers()
+    await close_http_client()
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "service": "simplified-auth-server"}
+    # scopes_hash identifies the loaded scopes.yml, comparable with the registry's
+    scopes = scopes_loader.snapshot
+    return {
+        "status": "healthy",
+        "service": "simplified-auth-server",
+        "scopes_version": scopes.version,
+        "scopes_hash": scopes.content_hash,
+    }
+
+async def verify_bearer_token(
+    access_token: str,
+    user_pool_id: Optional[str] = None,
+    client_id: Optional[str] = None,
+    region: str = "us-east-1"
+) -> tuple[Dict[str, Any], bool]:
+    """
+    Verify a bearer token with the configured provider, through the token cache.
+    
+    Args:
+        access_token: The raw bearer token
+        user_pool_id: Cognito user pool (X-User-Pool-Id), part of the cache key
+        client_id: Expected client id (X-Client-Id), part of the cache key
+        region: AWS region (X-Region), part of the cache key
+        
+    Returns:
+        Tuple of (validation result, whether it was served from the cache)
+        
+    Raises:
+        ValueError: If the token is invalid (including recently rejected tokens)
+        Exception: If the provider is misconfigured or unreachable
+    """
+    # Recently verified (or recently rejected) tokens skip signature verification
+    token_cache_key = token_cache.make_key(access_token, user_pool_id, client_id, region)
+    validation_result = token_cache.get(token_cache_key)
+    if validation_result:
+        return validation_result, True
+    cached_failure = token_cache.get_failure(token_cache_key)
+    if cached_failure:
+        raise ValueError(cached_failure)
+    
+    auth_provider = get_auth_provider()
+    logger.debug(f"Using authentication provider: {auth_provider.__class__.__name__}")
+    try:
+        validation_result = await auth_provider.validate_token_async(access_token)
+    except ValueError as e:
+        token_cache.put_failure(token_cache_key, str(e))
+        raise
+    
+    token_cache.put(token_cache_key, validation_result)
+    return validation_result, False
+
+def get_user_scopes(validation_result: Dict[str, Any]) -> List[str]:
+    """
+    Scopes of a validated caller: Keycloak groups are mapped through group_mappings,
+    other methods carry their scopes directly.
+    """
+    user_groups = validation_result.get('groups', [])
+    if user_groups and validation_result.get('method') == 'keycloak':
+        user_scopes = map_groups_to_scopes(user_groups)
+        logger.debug(f"Mapped Keycloak groups {user_groups} to scopes: {user_scopes}")
+        return user_scopes
+    return validation_result.get('scopes', [])
 
 @app.get("/validate")
 async def validate_request(request: Request):
@@ -794,6 +822,8 @@ async def validate_request(request: Request):
     - X-Client-Id: <client_id>
     - X-Region: <region> (optional, defaults to us-east-1)
     - X-Original-URL: <original_url> (optional, for scope validation)
+    - X-MCP-Method: <json-rpc method> (optional, set by capture_body.lua, for scope validation)
+    - X-MCP-Tool-Name: <params.name> (optional, set by capture_body.lua for tools/call)
     
     Returns:
         HTTP 200 with user info headers if valid, HTTP 401/403 if invalid
@@ -801,7 +831,8 @@ async def validate_request(request: Request):
     Raises:
         HTTPException: If the token is missing, invalid, or configuration is incomplete
     """
-    
+    access_log = ValidateLogRecord(sample_rate=VALIDATE_LOG_SAMPLE_RATE)
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
     
     try:
         # Extract headers
@@ -811,7 +842,9 @@ async def validate_request(request: Request):
         client_id = request.headers.get("X-Client-Id")
         region = request.headers.get("X-Region", "us-east-1")
         original_url = request.headers.get("X-Original-URL")
-        body = request.headers.get("X-Body")
+        # JSON-RPC method and tool name, extracted from the request body by nginx
+        rpc_method = request.headers.get("X-MCP-Method")
+        rpc_tool_name = request.headers.get("X-MCP-Tool-Name")
         
         # Extract server_name from original_url early for logging
         server_name_from_url = None
@@ -822,50 +855,30 @@ async def validate_request(request: Request):
                 path = parsed_url.path.strip('/')
                 path_parts = path.split('/') if path else []
                 server_name_from_url = path_parts[0] if path_parts else None
-                logger.info(f"Extracted server_name '{server_name_from_url}' from original_url: {original_url}")
+                logger.debug(f"Extracted server_name '{server_name_from_url}' from original_url: {original_url}")
             except Exception as e:
                 logger.warning(f"Failed to extract server_name from original_url {original_url}: {e}")
         
-        # Read request body
-        request_payload = None
-        try:
-            if body:
-                payload_text = body #.decode('utf-8')
-                logger.info(f"Raw Request Payload ({len(payload_text)} chars): {payload_text[:1000]}...")
-                request_payload = json.loads(payload_text)
-                logger.info(f"JSON RPC Request Payload: {json.dumps(request_payload, indent=2)}")
-            else:
-                logger.info(f"No request body provided, skipping payload parsing")
-        except UnicodeDecodeError as e:
-            logger.warning(f"Could not decode body as UTF-8: {e}")
-        except json.JSONDecodeError as e:
-            logger.warning(f"Could not parse JSON RPC payload: {e}")
-        except Exception as e:
-            logger.error(f"Error reading request payload: {type(e).__name__}: {e}")
-        
-        # Log request for debugging with anonymized IP
         client_ip = request.client.host if request.client else 'unknown'
-        logger.info(f"Validation request from {anonymize_ip(client_ip)}")
-        logger.info(f"Request Method: {request.method}")
-        
-        # Log masked HTTP headers for GDPR/SOX compliance
-        all_headers = dict(request.headers)
-        masked_headers = mask_headers(all_headers)
-        logger.debug(f"HTTP Headers (masked): {json.dumps(masked_headers, indent=2)}")
-        
-        # Log specific headers for debugging with masked sensitive data
-        logger.info(f"Key Headers: Authorization={bool(authorization)}, Cookie={bool(cookie_header)}, "
-                    f"User-Pool-Id={mask_sensitive_id(user_pool_id) if user_pool_id else 'None'}, "
-                    f"Client-Id={mask_sensitive_id(client_id) if client_id else 'None'}, "
-                    f"Region={region}, Original-URL={original_url}")
-        logger.info(f"Server Name from URL: {server_name_from_url}")
+        access_log.set(server=server_name_from_url, rpc_method=rpc_method, tool=rpc_tool_name)
+        access_log.set_lazy("client_ip", lambda: anonymize_ip(client_ip))
+        
+        # Per-request detail, with masked HTTP headers for GDPR/SOX compliance; only built at DEBUG
+        if debug_enabled:
+            logger.debug(f"Validation request from {anonymize_ip(client_ip)}, method {request.method}, "
+                         f"JSON-RPC method: {rpc_method}, tool: {rpc_tool_name}")
+            logger.debug(f"HTTP Headers (masked): {json.dumps(mask_headers(dict(request.headers)), indent=2)}")
+            logger.debug(f"Key Headers: Authorization={bool(authorization)}, Cookie={bool(cookie_header)}, "
+                         f"User-Pool-Id={mask_sensitive_id(user_pool_id) if user_pool_id else 'None'}, "
+                         f"Client-Id={mask_sensitive_id(client_id) if client_id else 'None'}, "
+                         f"Region={region}, Original-URL={original_url}")
         
         # Initialize validation result
         validation_result = None
         
         # FIRST: Check for session cookie if present
         if "mcp_gateway_session=" in cookie_header:
-            logger.info("Session cookie detected, attempting session validation")
+            logger.debug("Session cookie detected, attempting session validation")
             # Extract cookie value
             cookie_value = None
             for cookie in cookie_header.split(';'):
@@ -876,20 +889,16 @@ async def validate_request(request: Request):
             if cookie_value:
                 try:
                     validation_result = validate_session_cookie(cookie_value)
-                    # Log validation result without exposing username
-                    safe_result = {k: v for k, v in validation_result.items() if k != 'username'}
-                    safe_result['username'] = hash_username(validation_result.get('username', ''))
-                    logger.info(f"Session cookie validation result: {safe_result}")
-                    logger.info(f"Session cookie validation successful for user: {hash_username(validation_result['username'])}")
+                    access_log.set(credential="session")
                 except ValueError as e:
-                    logger.warning(f"Session cookie validation failed: {e}")
+                    logger.debug(f"Session cookie validation failed: {e}")
+                    access_log.set(session_error=str(e))
                     # Fall through to JWT validation
         
         # SECOND: If no valid session cookie, check for JWT token
         if not validation_result:
             # Validate required headers for JWT
             if not authorization or not authorization.startswith("Bearer "):
-                logger.warning("Missing or invalid Authorization header and no valid session cookie")
                 raise HTTPException(
                     status_code=401,
                     detail="Missing or invalid Authorization header. Expected: Bearer <token> or valid session cookie",
@@ -901,107 +910,42 @@ async def validate_request(request: Request):
             
             # Get authentication provider based on AUTH_PROVIDER environment variable
             try:
-                auth_provider = get_auth_provider()
-                logger.info(f"Using authentication provider: {auth_provider.__class__.__name__}")
-                
-                # Provider-specific validation
-                if hasattr(auth_provider, 'validate_token'):
-                    # For Keycloak, no additional headers needed
-                    validation_result = auth_provider.validate_token(access_token)
-                    logger.info(f"Token validation successful using {auth_provider.__class__.__name__}")
-                else:
-                    # Fallback to old validation for compatibility
-                    if not user_pool_id:
-                        logger.warning("Missing X-User-Pool-Id header for Cognito validation")
-                        raise HTTPException(
-                            status_code=400,
-                            detail="Missing X-User-Pool-Id header",
-                            headers={"Connection": "close"}
-                        )
-                    
-                    if not client_id:
-                        logger.warning("Missing X-Client-Id header for Cognito validation")
-                        raise HTTPException(
-                            status_code=400,
-                            detail="Missing X-Client-Id header",
-                            headers={"Connection": "close"}
-                        )
-                    
-                    # Use old validator for backward compatibility
-                    validation_result = validator.validate_token(
-                        access_token=access_token,
-                        user_pool_id=user_pool_id,
-                        client_id=client_id,
-                        region=region
-                    )
-                    
+                validation_result, cache_hit = await verify_bearer_token(access_token, user_pool_id, client_id, region)
+                access_log.set(credential="bearer", token_cache="hit" if cache_hit else "miss")
             except Exception as e:
-                logger.error(f"Authentication provider error: {e}")
+                # The access log line carries the reason; rejected tokens are not errors
+                logger.debug(f"Authentication provider error: {e}")
                 raise HTTPException(
                     status_code=500,
                     detail=f"Authentication provider configuration error: {str(e)}",
                     headers={"Connection": "close"}
                 )
         
-        logger.info(f"Token validation successful using method: {validation_result['method']}")
+        access_log.set(auth_method=validation_result.get('method'))
+        access_log.set_lazy("user", lambda: hash_username(validation_result.get('username', '')))
         
         # Parse server and tool information from original URL if available
         server_name = server_name_from_url  # Use the server_name we extracted earlier
         tool_name = None
         
-        if original_url and request_payload:
-            # We already extracted server_name above, now just get tool_name from URL parsing
-            _, tool_name = parse_server_and_tool_from_url(original_url)
-            logger.debug(f"Parsed from original URL: server='{server_name}', tool='{tool_name}'")
-            
-            # Try to extract tool name from request payload if not found in URL
-            if server_name and not tool_name and request_payload:
-                try:
-                    # Look for tool name in JSON-RPC 2.0 format and other MCP patterns
-                    if isinstance(request_payload, dict):
-                        # JSON-RPC 2.0 format: method field contains the tool name
-                        tool_name = request_payload.get('method')
-                        
-                        # If not found in method, check other common patterns
-                        if not tool_name:
-                            tool_name = request_payload.get('tool') or request_payload.get('name')
-                            
-                        # Check for nested tool reference in params
-                        if not tool_name and 'params' in request_payload:
-                            params = request_payload['params']
-                            if isinstance(params, dict):
-                                tool_name = params.get('name') or params.get('tool') or params.get('method')
-                        
-                        logger.info(f"Extracted tool name from JSON-RPC payload: '{tool_name}'")
-                    else:
-                        logger.warning(f"Payload is not a dictionary: {type(request_payload)}")
-                except Exception as e:
-                    logger.error(f"Error processing request payload for tool extraction: {e}")
+        if original_url and rpc_method:
+            # JSON-RPC 2.0 format: the method field identifies the operation
+            tool_name = rpc_method
+            logger.debug(f"Parsed request: server='{server_name}', method='{tool_name}'")
         
         # Validate scope-based access if we have server/tool information
-        # For Keycloak, map groups to scopes; otherwise use scopes directly
-        user_groups = validation_result.get('groups', [])
-        if user_groups and validation_result.get('method') == 'keycloak':
-            # Map Keycloak groups to scopes using the group mappings
-            user_scopes = map_groups_to_scopes(user_groups)
-            logger.info(f"Mapped Keycloak groups {user_groups} to scopes: {user_scopes}")
-        else:
-            user_scopes = validation_result.get('scopes', [])
-        if request_payload and server_name and tool_name:
+        user_scopes = get_user_scopes(validation_result)
+        if server_name and tool_name:
             # Extract method and actual tool name
             method = tool_name  # The extracted tool_name is actually the method
             actual_tool_name = None
             
-            # For tools/call, extract the actual tool name from params
-            if method == 'tools/call' and isinstance(request_payload, dict):
-                params = request_payload.get('params', {})
-                if isinstance(params, dict):
-                    actual_tool_name = params.get('name')
-                    logger.info(f"Extracted actual tool name for tools/call: '{actual_tool_name}'")
+            # For tools/call, the actual tool name comes from params.name
+            if method == 'tools/call':
+                actual_tool_name = rpc_tool_name
             
             # Check if user has any scopes - if not, deny access (fail closed)
             if not user_scopes:
-                logger.warning(f"Access denied for user {hash_username(validation_result.get('username', ''))} to {server_name}.{method} (tool: {actual_tool_name}) - no scopes configured")
                 raise HTTPException(
                     status_code=403,
                     detail=f"Access denied to {server_name}.{method} - user has no scopes configured",
@@ -1009,13 +953,13 @@ async def validate_request(request: Request):
                 )
             
             if not validate_server_tool_access(server_name, method, actual_tool_name, user_scopes):
-                logger.warning(f"Access denied for user {hash_username(validation_result.get('username', ''))} to {server_name}.{method} (tool: {actual_tool_name})")
+                access_log.set_lazy("scopes", lambda: sorted(user_scopes))
                 raise HTTPException(
                     status_code=403,
                     detail=f"Access denied to {server_name}.{method}",
                     headers={"Connection": "close"}
                 )
-            logger.info(f"Scope validation passed for {server_name}.{method} (tool: {actual_tool_name})")
+            logger.debug(f"Scope validation passed for {server_name}.{method} (tool: {actual_tool_name})")
         elif server_name or tool_name:
             logger.debug(f"Partial server/tool info available (server='{server_name}', tool='{tool_name}'), skipping scope validation")
         else:
@@ -1032,8 +976,9 @@ async def validate_request(request: Request):
             'server_name': server_name,
             'tool_name': tool_name
         }
-        logger.info(f"Full validation result: {json.dumps(validation_result, indent=2)}")
-        logger.info(f"Response data being sent: {json.dumps(response_data, indent=2)}")
+        if debug_enabled:
+            logger.debug(f"Full validation result: {json.dumps(validation_result, indent=2, default=str)}")
+            logger.debug(f"Response data being sent: {json.dumps(response_data, indent=2)}")
         # Create JSON response with headers that nginx can use
         response = JSONResponse(content=response_data, status_code=200)
         
@@ -1046,10 +991,14 @@ async def validate_request(request: Request):
         response.headers["X-Server-Name"] = server_name or ''
         response.headers["X-Tool-Name"] = tool_name or ''
         
+        # Lifetime of this result in nginx's auth cache (0 disables caching)
+        response.headers["X-Accel-Expires"] = str(get_auth_cache_ttl(validation_result))
+        
+        access_log.emit(200)
         return response
         
     except ValueError as e:
-        logger.warning(f"Token validation failed: {e}")
+        access_log.emit(401, str(e))
         raise HTTPException(
             status_code=401,
             detail=str(e),
@@ -1058,9 +1007,10 @@ async def validate_request(request: Request):
     except HTTPException as e:
         # If it's a 403 HTTPException, re-raise it as is
         if e.status_code == 403:
+            access_log.emit(403, e.detail)
             raise
         # For other HTTPExceptions, let them fall through to general handler
-        logger.error(f"HTTP error during validation: {e}")
+        access_log.emit(500, f"HTTP {e.status_code}: {e.detail}")
         raise HTTPException(
             status_code=500,
             detail=f"Internal validation error: {str(e)}",
@@ -1068,13 +1018,121 @@ async def validate_request(request: Request):
         )
     except Exception as e:
         logger.error(f"Unexpected error during validation: {e}")
+        access_log.emit(500, str(e))
         raise HTTPException(
             status_code=500,
             detail=f"Internal validation error: {str(e)}",
             headers={"Connection": "close"}
         )
-    finally:
-        pass
+
+def require_internal_api_key(request: Request) -> None:
+    """
+    Reject requests that do not carry the shared internal API key.
+    
+    Args:
+        request: The incoming request, expected to have an X-Internal-Api-Key header
+        
+    Raises:
+        HTTPException: 503 if INTERNAL_API_KEY is not configured, 401 if the key is missing or wrong
+    """
+    if not INTERNAL_API_KEY:
+        raise HTTPException(
+            status_code=503,
+            detail="Internal API is disabled: INTERNAL_API_KEY is not configured",
+        )
+    provided_key = request.headers.get("X-Internal-Api-Key", "")
+    if not hmac.compare_digest(provided_key.encode("utf-8"), INTERNAL_API_KEY.encode("utf-8")):
+        logger.warning(f"Rejected internal API call to {request.url.path} without a valid key")
+        raise HTTPException(status_code=401, detail="Invalid or missing internal API key")
+
+@app.post(
+    "/validate/batch",
+    response_model=BatchValidationResponse,
+    dependencies=[Depends(require_internal_api_key)],
+)
+async def validate_batch(request: Request):
+    """
+    Validate many (token or scopes, server, method, tool) tuples in one call.
+    
+    Each distinct token is verified once (through the token cache) and every
+    item is decided against the same version of the compiled scopes. Items
+    with scopes instead of a token only get the access decision. Items
+    without a server and method only get the token check.
+    
+    Only for trusted internal callers, which must send INTERNAL_API_KEY in
+    the X-Internal-Api-Key header. The key is checked before the body is read,
+    so unauthenticated callers cannot make the server parse large batches.
+    
+    Optional headers, applying to all tokens: X-User-Pool-Id, X-Client-Id, X-Region.
+    
+    Returns:
+        One decision per item, in request order
+        
+    Raises:
+        HTTPException: 401/503 if the caller is not authenticated (see require_internal_api_key)
+        RequestValidationError: 422 if the body is invalid or has more than VALIDATE_BATCH_MAX_ITEMS items
+    """
+    try:
+        batch = BatchValidationRequest.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+    access_log = ValidateLogRecord(sample_rate=VALIDATE_LOG_SAMPLE_RATE, event="validate_batch")
+    user_pool_id = request.headers.get("X-User-Pool-Id")
+    client_id = request.headers.get("X-Client-Id")
+    region = request.headers.get("X-Region", "us-east-1")
+    
+    async def verify(token: str) -> Dict[str, Any]:
+        try:
+            validation_result, _ = await verify_bearer_token(token, user_pool_id, client_id, region)
+            return validation_result
+        except HTTPException as e:
+            return {'error': str(e.detail)}
+        except Exception as e:
+            return {'error': str(e)}
+    
+    tokens = list(dict.fromkeys(item.token for item in batch.items if item.token))
+    verified = dict(zip(tokens, await asyncio.gather(*(verify(token) for token in tokens))))
+    
+    # One scopes version for the whole batch, even if scopes.yml is reloaded meanwhile
+    engine = scopes_loader.compiled
+    results = []
+    for item in batch.items:
+        username = None
+        valid = None
+        if item.token:
+            validation_result = verified[item.token]
+            if 'error' in validation_result:
+                results.append(BatchValidationDecision(valid=False, allowed=False, error=validation_result['error']))
+                continue
+            valid = True
+            username = validation_result.get('username')
+            user_scopes = get_user_scopes(validation_result)
+        elif item.scopes is not None:
+            user_scopes = item.scopes
+        else:
+            results.append(BatchValidationDecision(allowed=False, error="Item needs a token or scopes"))
+            continue
+        
+        error = None
+        if item.server and item.method:
+            tool_name = item.tool if item.method == 'tools/call' else None
+            # Fail closed without scopes, as /validate does
+            allowed = bool(user_scopes) and engine.is_allowed(user_scopes, item.server, item.method, tool_name)
+            if not allowed:
+                error = f"Access denied to {item.server}.{item.method}"
+        else:
+            allowed = bool(valid)
+        results.append(BatchValidationDecision(
+            valid=valid, allowed=allowed, username=username, scopes=user_scopes, error=error
+        ))
+    
+    access_log.set(
+        items=len(batch.items),
+        tokens=len(tokens),
+        denied=sum(1 for result in results if not result.allowed),
+    )
+    access_log.emit(200)
+    return BatchValidationResponse(results=results)
 
 @app.get("/config")
 async def get_auth_config():
@@ -1150,8 +1208,8 @@ async def generate_user_token(
                 headers={"Connection": "close"}
             )
         
-        # Check rate limiting
-        if not check_rate_limit(username):
+        # Check rate limiting (off the event loop: the shared and Redis stores do blocking I/O)
+        if not await asyncio.to_thread(check_rate_limit, username):
             raise HTTPException(
                 status_code=429,
                 detail=f"Rate limit exceeded. Maximum {MAX_TOKENS_PER_USER_PER_HOUR} tokens per hour.",
@@ -1244,8 +1302,15 @@ def parse_arguments():
     parser.add_argument(
         "--region",
         type=str,
-        default="us-east-1",
-        help="Default AWS region (default: us-east-1)",
+        default=os.environ.get("AUTH_SERVER_REGION", "us-east-1"),
+        help="Default AWS region (default: AUTH_SERVER_REGION or us-east-1)",
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=AUTH_SERVER_WORKERS,
+        help="Number of worker processes (default: AUTH_SERVER_WORKERS or 1)",
     )
 
     return parser.parse_args()
@@ -1261,7 +1326,17 @@ def main():
     logger.info(f"Starting simplified auth server on {args.host}:{args.port}")
     logger.info(f"Default region: {args.region}")
     
-    uvicorn.run(app, host=args.host, port=args.port)
+    if args.workers > 1:
+        if not os.environ.get('SECRET_KEY'):
+            raise SystemExit("SECRET_KEY must be set when running more than one auth server worker")
+        # Workers import the app themselves; they read the worker count to share rate-limit
+        # counters and the region to build their own validator
+        os.environ["AUTH_SERVER_WORKERS"] = str(args.workers)
+        os.environ["AUTH_SERVER_REGION"] = args.region
+        logger.info(f"Starting {args.workers} workers, rate-limit store: {os.environ.get('RATE_LIMIT_STORE') or 'shared'}")
+        uvicorn.run("server:app", host=args.host, port=args.port, workers=args.workers)
+    else:
+        uvicorn.run(app, host=args.host, port=args.port)
 
 if __name__ == "__main__":
     main()
@@ -1327,6 +1402,10 @@ OAUTH2_CONFIG = load_oauth2_config()
 
 # Initialize SECRET_KEY and signer for session management
 SECRET_KEY = os.environ.get('SECRET_KEY')
+if not SECRET_KEY and AUTH_SERVER_WORKERS > 1:
+    # A per-worker random key would make tokens and session cookies valid only on the worker
+    # that signed them
+    raise RuntimeError("SECRET_KEY must be set when AUTH_SERVER_WORKERS > 1")
 if not SECRET_KEY:
     # Generate a secure random key (32 bytes = 256 bits of entropy)
     SECRET_KEY = secrets.token_hex(32)
@@ -1601,38 +1680,38 @@ async def exchange_code_for_token(provider: str, code: str, provider_config: dic
     if auth_server_url is None:
         auth_server_url = os.environ.get('AUTH_SERVER_URL', 'http://localhost:8888')
         
-    async with httpx.AsyncClient() as client:
-        token_data = {
-            "grant_type": provider_config["grant_type"],
-            "client_id": provider_config["client_id"],
-            "client_secret": provider_config["client_secret"],
-            "code": code,
-            "redirect_uri": f"{auth_server_url}/oauth2/callback/{provider}"
-        }
-        
-        headers = {"Accept": "application/json"}
-        if provider == "github":
-            headers["Accept"] = "application/json"
-        
-        response = await client.post(
-            provider_config["token_url"],
-            data=token_data,
-            headers=headers
-        )
-        response.raise_for_status()
-        return response.json()
+    client = get_http_client()
+    token_data = {
+        "grant_type": provider_config["grant_type"],
+        "client_id": provider_config["client_id"],
+        "client_secret": provider_config["client_secret"],
+        "code": code,
+        "redirect_uri": f"{auth_server_url}/oauth2/callback/{provider}"
+    }
+    
+    headers = {"Accept": "application/json"}
+    if provider == "github":
+        headers["Accept"] = "application/json"
+    
+    response = await client.post(
+        provider_config["token_url"],
+        data=token_data,
+        headers=headers
+    )
+    response.raise_for_status()
+    return response.json()
 
 async def get_user_info(access_token: str, provider_config: dict) -> dict:
     """Get user information from OAuth2 provider"""
-    async with httpx.AsyncClient() as client:
-        headers = {"Authorization": f"Bearer {access_token}"}
-        
-        response = await client.get(
-            provider_config["user_info_url"],
-            headers=headers
-        )
-        response.raise_for_status()
-        return response.json()
+    client = get_http_client()
+    headers = {"Authorization": f"Bearer {access_token}"}
+    
+    response = await client.get(
+        provider_config["user_info_url"],
+        headers=headers
+    )
+    response.raise_for_status()
+    return response.json()
 
 def map_user_info(user_info: dict, provider_config: dict) -> dict:
     """Map provider-specific user info to our standard format"""
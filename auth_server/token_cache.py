@@ -0,0 +1,129 @@
+"""
+Cache of bearer token validation results.
+
+Signature verification is the most expensive step of /validate. Successful
+results are kept until the token expires (bounded by a configured maximum),
+and recent failures are remembered briefly so a client retrying a bad token
+does not trigger a verification per request. Tokens are only ever stored as
+SHA-256 digests.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def get_expires_at(validation_result: Dict[str, Any]) -> Optional[float]:
+    """
+    Expiry (epoch seconds) of the credential behind a validation result.
+
+    Args:
+        validation_result: Result returned by a token or session validator
+
+    Returns:
+        The expiry timestamp, or None when the validator did not report one
+    """
+    expires_at = validation_result.get('expires_at') or (validation_result.get('data') or {}).get('exp')
+    return float(expires_at) if expires_at else None
+
+
+class TokenValidationCache:
+    """Bounded LRU of token validation results keyed by a SHA-256 of the token."""
+
+    def __init__(self, max_entries: int = 10000, max_ttl_seconds: int = 300, negative_ttl_seconds: int = 5):
+        self.max_entries = max_entries
+        self.max_ttl_seconds = max_ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        # key -> (deadline, validation result or None, failure message or None)
+        self._entries: "OrderedDict[str, Tuple[float, Optional[Dict[str, Any]], Optional[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(token: str, *context: Optional[str]) -> str:
+        """
+        Cache key for a token and the validation context (e.g. user pool and client id).
+
+        Args:
+            token: The raw bearer token
+            *context: Extra values the validation result depends on
+
+        Returns:
+            Hex SHA-256 digest; the token itself is never stored
+        """
+        material = "\0".join([token, *(value or "" for value in context)])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _lookup(self, key: str) -> Optional[Tuple[float, Optional[Dict[str, Any]], Optional[str]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _store(self, key: str, deadline: float, result: Optional[Dict[str, Any]], failure: Optional[str]) -> None:
+        with self._lock:
+            self._entries[key] = (deadline, result, failure)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Cached successful validation result for a key.
+
+        The returned dict is shared between requests and must not be modified.
+        """
+        entry = self._lookup(key)
+        if entry is None or entry[1] is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def get_failure(self, key: str) -> Optional[str]:
+        """Error message of a recent failed validation for a key, if any."""
+        entry = self._lookup(key)
+        return entry[2] if entry is not None else None
+
+    def put(self, key: str, validation_result: Dict[str, Any]) -> None:
+        """
+        Cache a successful validation until min(token expiry, now + max TTL).
+
+        Results without a known expiry are not cached.
+        """
+        if self.max_entries <= 0 or self.max_ttl_seconds <= 0:
+            return
+        expires_at = get_expires_at(validation_result)
+        if expires_at is None:
+            return
+        deadline = min(expires_at, time.time() + self.max_ttl_seconds)
+        if deadline > time.time():
+            self._store(key, deadline, validation_result, None)
+
+    def put_failure(self, key: str, error: str) -> None:
+        """Remember a failed validation for the negative TTL."""
+        if self.max_entries <= 0 or self.negative_ttl_seconds <= 0:
+            return
+        self._store(key, time.time() + self.negative_ttl_seconds, None, error)
+
+    def clear(self) -> None:
+        """Drop all entries (e.g. after a signing key is revoked)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Entry count and hit/miss counters."""
+        with self._lock:
+            size = len(self._entries)
+        return {"entries": size, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,84 @@
+"""
+Structured, sampled access logging for /validate.
+
+Every /validate request produces at most one compact JSON log line. Denials
+(any non-2xx outcome) are always logged at WARNING; successful requests are
+logged at INFO for a configurable fraction of requests. Fields that cost
+something to compute (hashed usernames, anonymized IPs) are registered as
+callables and only evaluated when the line is actually written, so a
+request that is not sampled, or a disabled log level, costs a few dict
+assignments.
+"""
+
+import json
+import logging
+import random
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger("validate_access")
+
+
+class ValidateLogRecord:
+    """Fields of one /validate request, written as a single JSON line by emit()."""
+
+    __slots__ = ("_started", "_fields", "_lazy_fields", "sample_rate", "event")
+
+    def __init__(self, sample_rate: float = 1.0, event: str = "validate"):
+        """
+        Args:
+            sample_rate: Fraction (0.0-1.0) of successful requests to log;
+                denials are always logged
+            event: Value of the line's "event" field
+        """
+        self.event = event
+        self._started = time.perf_counter()
+        self._fields: Dict[str, Any] = {}
+        self._lazy_fields: Dict[str, Callable[[], Any]] = {}
+        self.sample_rate = sample_rate
+
+    def set(self, **fields: Any) -> None:
+        """Record fields that are already at hand."""
+        self._fields.update(fields)
+
+    def set_lazy(self, name: str, compute: Callable[[], Any]) -> None:
+        """Record a field computed only if the line is written."""
+        self._lazy_fields[name] = compute
+
+    def _should_log(self, status_code: int) -> Optional[int]:
+        """Log level to write the line at, or None to skip it."""
+        if status_code >= 400:
+            return logging.WARNING if logger.isEnabledFor(logging.WARNING) else None
+        if self.sample_rate <= 0 or not logger.isEnabledFor(logging.INFO):
+            return None
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return None
+        return logging.INFO
+
+    def emit(self, status_code: int, reason: Optional[str] = None) -> None:
+        """
+        Write the request's log line, subject to sampling.
+
+        Args:
+            status_code: HTTP status returned to nginx
+            reason: Why the request was denied, for non-2xx outcomes
+        """
+        level = self._should_log(status_code)
+        if level is None:
+            return
+        entry: Dict[str, Any] = {
+            "event": self.event,
+            "status": status_code,
+            "duration_ms": round((time.perf_counter() - self._started) * 1000, 3),
+        }
+        if reason:
+            entry["reason"] = reason
+        entry.update(self._fields)
+        for name, compute in self._lazy_fields.items():
+            try:
+                entry[name] = compute()
+            except Exception as e:
+                entry[name] = f"<error: {e}>"
+        if self.sample_rate < 1 and level == logging.INFO:
+            entry["sample_rate"] = self.sample_rate
+        logger.log(level, json.dumps(entry, separators=(",", ":"), default=str))
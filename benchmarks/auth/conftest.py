@@ -0,0 +1,173 @@
+"""
+Fixtures for the auth server benchmarks.
+
+The auth server is imported in-process (it runs with auth_server/ as its
+working directory, so that directory goes on sys.path) and configured for
+the Keycloak provider against a fake identity provider: a local HTTP server
+publishing the JWKS of an RSA key generated for the session. Tokens and
+session cookies are minted locally, so nothing leaves the machine.
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+
+AUTH_SERVER_DIR = Path(__file__).resolve().parents[2] / "auth_server"
+REALM = "mcp-gateway"
+CLIENT_ID = "bench-client"
+KEY_ID = "bench-key-1"
+
+# Load test results, reported at the end of the session
+LOAD_RESULTS: List[Dict[str, Any]] = []
+
+
+class FakeIdentityProvider:
+    """Serves a JWKS on localhost and signs tokens with the matching private key."""
+
+    def __init__(self):
+        self.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        jwk = json.loads(RSAAlgorithm.to_jwk(self.private_key.public_key()))
+        jwk.update({"kid": KEY_ID, "alg": "RS256", "use": "sig"})
+        self.jwks = {"keys": [jwk]}
+        self.jwks_requests = 0
+        self._httpd: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._httpd.server_port}"
+
+    @property
+    def issuer(self) -> str:
+        return f"{self.url}/realms/{REALM}"
+
+    def start(self) -> None:
+        idp = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if not self.path.endswith("/protocol/openid-connect/certs"):
+                    self.send_error(404)
+                    return
+                idp.jwks_requests += 1
+                body = json.dumps(idp.jwks).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+
+    def issue_token(self, groups: List[str], username: str = "bench-user", lifetime_seconds: int = 3600) -> str:
+        """A Keycloak-style access token for the given groups."""
+        now = int(time.time())
+        claims = {
+            "iss": self.issuer,
+            "aud": CLIENT_ID,
+            "azp": CLIENT_ID,
+            "sub": username,
+            "preferred_username": username,
+            "groups": groups,
+            "iat": now,
+            "exp": now + lifetime_seconds,
+        }
+        return jwt.encode(claims, self.private_key, algorithm="RS256", headers={"kid": KEY_ID})
+
+
+@pytest.fixture(scope="session")
+def fake_idp():
+    idp = FakeIdentityProvider()
+    idp.start()
+    yield idp
+    idp.stop()
+
+
+@pytest.fixture(scope="session")
+def auth_server(fake_idp):
+    """The auth server module, configured for the fake identity provider."""
+    os.environ.update(
+        AUTH_PROVIDER="keycloak",
+        KEYCLOAK_URL=fake_idp.url,
+        KEYCLOAK_REALM=REALM,
+        KEYCLOAK_CLIENT_ID=CLIENT_ID,
+        KEYCLOAK_CLIENT_SECRET="bench-secret",
+        SECRET_KEY="bench-secret-key",
+        SCOPES_RELOAD_INTERVAL_SECONDS="0",
+    )
+    sys.path.insert(0, str(AUTH_SERVER_DIR))
+    import server
+
+    # Keep per-request logging out of the measurements
+    logging.getLogger().setLevel(logging.WARNING)
+    return server
+
+
+@pytest.fixture(scope="session")
+def access_target(auth_server) -> Dict[str, Any]:
+    """
+    A (group, server, tool) triple from the shipped scopes.yml where the group
+    is allowed to call the tool, so benchmarks exercise the granted path.
+    """
+    engine = auth_server.scopes_loader.compiled
+    for group in engine.group_mappings:
+        scopes = engine.scopes_for_groups([group])
+        for scope in scopes:
+            for server_name, (_, tools) in engine.grants.get(scope, {}).items():
+                for tool in sorted(tools):
+                    if "/" not in tool and engine.is_allowed(scopes, server_name, "tools/call", tool):
+                        return {"group": group, "scopes": scopes, "server": server_name, "tool": tool}
+    pytest.skip("scopes.yml has no group allowed to call a tool")
+
+
+@pytest.fixture(scope="session")
+def bearer_token(fake_idp, access_target) -> str:
+    return fake_idp.issue_token([access_target["group"]])
+
+
+@pytest.fixture(scope="session")
+def session_cookie(auth_server, access_target) -> str:
+    return auth_server.signer.dumps({"username": "bench-user", "groups": [access_target["group"]]})
+
+
+@pytest.fixture
+def record_load_result() -> Callable[[Dict[str, Any]], None]:
+    return LOAD_RESULTS.append
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not LOAD_RESULTS:
+        return
+    terminalreporter.section("/validate load test")
+    terminalreporter.write_line(
+        f"{'scenario':<20}{'requests':>10}{'errors':>8}{'rps':>10}{'p50 ms':>10}{'p99 ms':>10}"
+    )
+    for result in LOAD_RESULTS:
+        terminalreporter.write_line(
+            f"{result['scenario']:<20}{result['requests']:>10}{result['errors']:>8}"
+            f"{result['rps']:>10.0f}{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+        )
+    report_path = os.environ.get("AUTH_BENCH_REPORT")
+    if report_path:
+        Path(report_path).parent.mkdir(parents=True, exist_ok=True)
+        Path(report_path).write_text(json.dumps(LOAD_RESULTS, indent=2))
+        terminalreporter.write_line(f"Load test report written to {report_path}")
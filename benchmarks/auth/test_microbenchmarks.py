@@ -0,0 +1,66 @@
+"""
+Microbenchmarks of the auth server's per-request building blocks.
+
+Each pair measures the steady state (memoized or cached, as served to
+repeat callers) and the cold computation behind it, so a regression in
+either the cache or the underlying work shows up.
+"""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+
+@pytest.fixture(scope="module")
+def provider(auth_server, bearer_token):
+    provider = auth_server.get_auth_provider()
+    # Warm the JWKS cache so the benchmarks measure verification, not the fetch
+    provider.validate_token(bearer_token)
+    return provider
+
+
+def test_validate_server_tool_access(benchmark, auth_server, access_target):
+    allowed = benchmark(
+        auth_server.validate_server_tool_access,
+        access_target["server"], "tools/call", access_target["tool"], access_target["scopes"],
+    )
+    assert allowed
+
+
+def test_scope_decision_uncached(benchmark, auth_server, access_target):
+    engine = auth_server.scopes_loader.compiled
+    scopes = frozenset(access_target["scopes"])
+    allowed = benchmark(engine._decide, scopes, access_target["server"], "tools/call", access_target["tool"])
+    assert allowed
+
+
+def test_map_groups_to_scopes(benchmark, auth_server, access_target):
+    scopes = benchmark(auth_server.map_groups_to_scopes, [access_target["group"]])
+    assert scopes == access_target["scopes"]
+
+
+def test_map_groups_uncached(benchmark, auth_server, access_target):
+    engine = auth_server.scopes_loader.compiled
+    scopes = benchmark(engine._map_groups, frozenset([access_target["group"]]))
+    assert list(scopes) == access_target["scopes"]
+
+
+def test_provider_jwt_decode(benchmark, provider, bearer_token):
+    signing_key = provider.jwks_cache.get_signing_key_sync(provider._get_token_kid(bearer_token))
+    result = benchmark(provider._decode_token, bearer_token, signing_key)
+    assert result["valid"]
+
+
+def test_provider_validate_token(benchmark, provider, bearer_token):
+    result = benchmark(provider.validate_token, bearer_token)
+    assert result["valid"]
+
+
+def test_validate_session_cookie(benchmark, auth_server, session_cookie, access_target):
+    result = benchmark(auth_server.validate_session_cookie, session_cookie)
+    assert result["scopes"] == access_target["scopes"]
+
+
+def test_decode_session_cookie_uncached(benchmark, auth_server, session_cookie):
+    result = benchmark(auth_server._decode_session_cookie, session_cookie)
+    assert result["valid"]
@@ -0,0 +1,117 @@
+"""
+In-process load test of GET /validate.
+
+Requests go through the ASGI app with httpx's ASGITransport (no sockets on
+the request path), from AUTH_BENCH_CONCURRENCY concurrent clients. Each
+scenario reports requests per second and latency percentiles (printed at the
+end of the run and written to AUTH_BENCH_REPORT as JSON if set) and fails if
+any request is rejected or p99 exceeds AUTH_BENCH_MAX_P99_MS.
+"""
+
+import asyncio
+import os
+import statistics
+import time
+from typing import Any, Callable, Dict
+
+import httpx
+import pytest
+
+REQUESTS = int(os.environ.get("AUTH_BENCH_REQUESTS", "2000"))
+CONCURRENCY = int(os.environ.get("AUTH_BENCH_CONCURRENCY", "32"))
+MAX_P99_MS = float(os.environ.get("AUTH_BENCH_MAX_P99_MS", "250"))
+# Distinct tokens for the uncached scenario; each one costs a signature verification
+UNCACHED_TOKENS = int(os.environ.get("AUTH_BENCH_UNCACHED_TOKENS", "500"))
+
+
+def _percentile(sorted_values, fraction: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_load(app, make_headers: Callable[[int], Dict[str, str]], requests: int, concurrency: int) -> Dict[str, Any]:
+    """
+    Send requests to /validate from concurrent clients and summarize latency and throughput.
+
+    make_headers is called with the request number (0 to requests - 1), and
+    with -1 for an untimed warm-up request that pays the one-off costs (JWKS
+    fetch, first RSA verification, lazy imports).
+    """
+    from providers.http import close_http_client
+    from providers.jwks import stop_background_refreshers
+
+    latencies = []
+    errors = 0
+    request_ids = iter(range(requests))
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://auth-server") as client:
+
+            async def worker():
+                nonlocal errors
+                for request_id in request_ids:
+                    headers = make_headers(request_id)
+                    started = time.perf_counter()
+                    response = await client.get("/validate", headers=headers)
+                    latencies.append(time.perf_counter() - started)
+                    if response.status_code != 200:
+                        errors += 1
+
+            await client.get("/validate", headers=make_headers(-1))
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - started
+    finally:
+        # The pooled client and JWKS refresher belong to this test's event loop
+        await stop_background_refreshers()
+        await close_http_client()
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "rps": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "max_ms": latencies[-1] * 1000,
+    }
+
+
+@pytest.fixture
+def request_headers(access_target):
+    return {
+        "X-Original-URL": f"https://gateway.example.com/{access_target['server']}/mcp",
+        "X-MCP-Method": "tools/call",
+        "X-MCP-Tool-Name": access_target["tool"],
+    }
+
+
+@pytest.mark.parametrize("scenario", ["bearer_cached", "bearer_uncached", "session_cookie"])
+async def test_validate_load(scenario, auth_server, fake_idp, access_target, bearer_token, session_cookie,
+                             request_headers, record_load_result):
+    if scenario == "bearer_cached":
+        headers = {**request_headers, "X-Authorization": f"Bearer {bearer_token}"}
+        make_headers = lambda request_id: headers
+        requests = REQUESTS
+    elif scenario == "bearer_uncached":
+        # Unique tokens: every timed request pays for the signature verification
+        # (tokens[0] is the warm-up request's)
+        tokens = [
+            fake_idp.issue_token([access_target["group"]], username=f"bench-user-{i}")
+            for i in range(UNCACHED_TOKENS + 1)
+        ]
+        make_headers = lambda request_id: {**request_headers, "X-Authorization": f"Bearer {tokens[request_id + 1]}"}
+        requests = UNCACHED_TOKENS
+    else:
+        headers = {**request_headers, "Cookie": f"mcp_gateway_session={session_cookie}"}
+        make_headers = lambda request_id: headers
+        requests = REQUESTS
+
+    result = await run_load(auth_server.app, make_headers, requests, CONCURRENCY)
+    result["scenario"] = scenario
+    record_load_result(result)
+
+    assert result["errors"] == 0
+    assert result["p99_ms"] <= MAX_P99_MS, f"{scenario}: p99 {result['p99_ms']:.1f} ms exceeds {MAX_P99_MS} ms"
@@ -55,23 +55,433 @@ LUA_SCRIPTS_DIR="/etc/nginx/lua"
 mkdir -p "$LUA_SCRIPTS_DIR"
 
 cat > "$LUA_SCRIPTS_DIR/capture_body.lua" << 'EOF'
--- capture_body.lua: Read request body and encode it in X-Body header for auth_request
-local cjson = require "cjson"
+-- capture_body.lua: Extract the JSON-RPC method and tool name for auth_request
+-- Only these two fields travel to the auth server (as X-MCP-Method / X-MCP-Tool-Name),
+-- never the request body itself.
+local cjson = require "cjson.safe"
 
--- Read the request body
-ngx.req.read_body()
-local body_data = ngx.req.get_body_data()
+-- Longest method / tool name forwarded to the auth server
+local MAX_FIELD_LENGTH = 256
 
-if body_data then
-    -- Set the X-Body header with the raw body data
-    ngx.req.set_header("X-Body", body_data)
-    ngx.log(ngx.INFO, "Captured request body (" .. string.len(body_data) .. " bytes) for auth validation")
-else
+-- Methods whose auth_request result is never cached (a new session always revalidates)
+local NON_CACHEABLE_METHODS = {
+    ["initialize"] = true,
+}
+
+-- Idempotent listing methods answered from the gateway response cache (response_cache.lua)
+local RESPONSE_CACHEABLE_METHODS = {
+    ["tools/list"] = true,
+    ["resources/list"] = true,
+    ["resources/templates/list"] = true,
+    ["prompts/list"] = true,
+}
+
+-- request_uri: $uri may already be rewritten to the backend path
+local server_name = string.match(ngx.var.request_uri, "^/([^/?]+)") or ""
+
+-- Cache key for the /validate subrequest: credentials hash + server + JSON-RPC method/tool
+local function auth_cache_key(method, tool_name)
+    if NON_CACHEABLE_METHODS[method] then
+        return nil
+    end
+    local credentials = table.concat({
+        ngx.var.http_authorization or "",
+        ngx.var.http_x_authorization or "",
+        ngx.var.http_cookie or "",
+        ngx.var.http_x_user_pool_id or "",
+        ngx.var.http_x_client_id or "",
+        ngx.var.http_x_region or "",
+    }, "\n")
+    return ngx.md5(credentials) .. ":" .. server_name .. ":" .. method .. ":" .. (tool_name or "")
+end
+
+-- Response cache key without the scope set (added after auth_request) and cache version.
+-- Only plain listings qualify: no params besides the pagination cursor and _meta.
+local function response_cache_key(payload)
+    if not RESPONSE_CACHEABLE_METHODS[payload.method] or payload.id == nil or payload.id == cjson.null then
+        return nil
+    end
+    local cursor = ""
+    if payload.params ~= nil then
+        if type(payload.params) ~= "table" then
+            return nil
+        end
+        for name, value in pairs(payload.params) do
+            if name == "cursor" and type(value) == "string" then
+                cursor = value
+            elseif name ~= "_meta" then
+                return nil
+            end
+        end
+    end
+    return server_name .. ":" .. payload.method .. ":" .. ngx.md5(cursor)
+end
+
+local function read_body()
+    ngx.req.read_body()
+    local body_data = ngx.req.get_body_data()
+    if body_data then
+        return body_data
+    end
+    -- Bodies larger than client_body_buffer_size are spooled to a file
+    local body_file = ngx.req.get_body_file()
+    if body_file then
+        local f = io.open(body_file, "rb")
+        if f then
+            body_data = f:read("*a")
+            f:close()
+        end
+    end
+    return body_data
+end
+
+-- Client-supplied values must never reach the auth server
+ngx.req.clear_header("X-MCP-Method")
+ngx.req.clear_header("X-MCP-Tool-Name")
+ngx.req.clear_header("X-Auth-Cache-Key")
+ngx.req.clear_header("X-Body")
+
+local body_data = read_body()
+if not body_data then
     ngx.log(ngx.INFO, "No request body found")
+    return
 end
+
+local payload = cjson.decode(body_data)
+if type(payload) ~= "table" or type(payload.method) ~= "string" then
+    -- Batches and non JSON-RPC bodies carry no single method to authorize
+    return
+end
+
+local method = payload.method
+local tool_name = nil
+if type(payload.params) == "table" and type(payload.params.name) == "string" then
+    tool_name = payload.params.name
+end
+
+if #method > MAX_FIELD_LENGTH or (tool_name and #tool_name > MAX_FIELD_LENGTH) then
+    ngx.status = ngx.HTTP_BAD_REQUEST
+    ngx.header["Content-Type"] = "application/json"
+    ngx.say('{"error": "JSON-RPC method or tool name too long"}')
+    return ngx.exit(ngx.HTTP_BAD_REQUEST)
+end
+
+ngx.req.set_header("X-MCP-Method", method)
+if tool_name then
+    ngx.req.set_header("X-MCP-Tool-Name", tool_name)
+end
+
+local cache_key = auth_cache_key(method, tool_name)
+if cache_key then
+    ngx.req.set_header("X-Auth-Cache-Key", cache_key)
+end
+
+local cache_version = ngx.var.mcp_cache_version
+if cache_version and cache_version ~= "" then
+    local response_key = response_cache_key(payload)
+    if response_key then
+        ngx.ctx.mcp_response_cache = {key = response_key, id = cjson.encode(payload.id)}
+    end
+end
+EOF
+
+# Create the response cache lookup script (access phase, after auth_request)
+cat > "$LUA_SCRIPTS_DIR/response_cache.lua" << 'EOF'
+-- response_cache.lua: Answer MCP listing calls from the mcp_responses shared dict
+-- Runs at the end of the access phase, i.e. after auth_request has set $auth_scopes, so
+-- callers with different scope sets never share an entry. Entries are stored by
+-- response_cache_store.lua and keyed by the server's tool-list version, so a changed
+-- tool list starts from an empty cache.
+local entry = ngx.ctx.mcp_response_cache
+if not entry then
+    return
+end
+
+entry.store_key = ngx.var.mcp_cache_version .. ":" .. entry.key .. ":" .. ngx.md5(ngx.var.auth_scopes or "")
+local cached = ngx.shared.mcp_responses:get(entry.store_key)
+if not cached then
+    return
+end
+ngx.ctx.mcp_response_cache = nil
+
+-- Stored as "<content type>\n<result JSON>"; the response is rebuilt with this request's id
+local content_type, result = string.match(cached, "^([^\n]*)\n(.*)$")
+local response = '{"jsonrpc":"2.0","id":' .. entry.id .. ',"result":' .. result .. '}'
+
+ngx.header["Content-Type"] = content_type
+ngx.header["X-MCP-Cache"] = "HIT"
+if ngx.var.http_mcp_session_id then
+    ngx.header["Mcp-Session-Id"] = ngx.var.http_mcp_session_id
+end
+if content_type == "text/event-stream" then
+    ngx.print("event: message\ndata: ", response, "\n\n")
+else
+    ngx.print(response)
+end
+return ngx.exit(ngx.HTTP_OK)
+EOF
+
+# Create the response cache store script (body filter of cache misses)
+cat > "$LUA_SCRIPTS_DIR/response_cache_store.lua" << 'EOF'
+-- response_cache_store.lua: Store the result of a successful MCP listing call
+-- Only the JSON-RPC result is kept; response_cache.lua wraps it with the next caller's id.
+local cjson = require("cjson.safe").new()
+-- Keep empty arrays as arrays ("tools": [] must not come back as {})
+cjson.decode_array_with_array_mt(true)
+
+-- Larger responses are passed through without caching
+local MAX_BODY_BYTES = 1048576
+
+local entry = ngx.ctx.mcp_response_cache
+if not entry or not entry.store_key or ngx.status ~= ngx.HTTP_OK or ngx.header["Content-Encoding"] then
+    return
+end
+
+local chunk, eof = ngx.arg[1], ngx.arg[2]
+entry.size = (entry.size or 0) + #chunk
+if entry.size > MAX_BODY_BYTES then
+    ngx.ctx.mcp_response_cache = nil
+    return
+end
+entry.chunks = entry.chunks or {}
+table.insert(entry.chunks, chunk)
+if not eof then
+    return
+end
+
+local body = table.concat(entry.chunks)
+local content_type = string.match(ngx.header["Content-Type"] or "", "^%s*([^;%s]+)") or ""
+local message
+if content_type == "text/event-stream" then
+    -- Streamable HTTP may answer with a short SSE stream: find the response event
+    for data in string.gmatch(body, "data: ?([^\r\n]+)") do
+        local decoded = cjson.decode(data)
+        if type(decoded) == "table" and decoded.result ~= nil then
+            message = decoded
+            break
+        end
+    end
+else
+    message = cjson.decode(body)
+end
+if type(message) ~= "table" or type(message.result) ~= "table" then
+    return
+end
+
+local result = cjson.encode(message.result)
+ngx.shared.mcp_responses:set(entry.store_key, content_type .. "\n" .. result, tonumber(ngx.var.mcp_cache_ttl) or 300)
+EOF
+
+cat > "$LUA_SCRIPTS_DIR/dynamic_route.lua" << 'EOF'
+-- dynamic_route.lua: Resolve MCP server routes from the mcp_routes shared dict
+-- Runs in `location /`; requests that match no route fall through to the registry UI.
+local cjson = require "cjson.safe"
+
+local routes = ngx.shared.mcp_routes
+local uri = ngx.var.uri
+
+-- Longest matching route: try the full path, then strip one segment at a time
+local candidate = uri
+local route, route_key
+while candidate and candidate ~= "" do
+    local entry = routes:get("route:" .. candidate)
+    if entry then
+        route = cjson.decode(entry)
+        if route and string.sub(uri, 1, #route.prefix) == route.prefix then
+            route_key = candidate
+            break
+        end
+        route = nil
+    end
+    candidate = string.match(candidate, "^(.*)/[^/]*$")
+end
+
+if not route then
+    return
+end
+
+if not route.healthy then
+    ngx.status = ngx.HTTP_SERVICE_UNAVAILABLE
+    ngx.header["Content-Type"] = "application/json"
+    ngx.say('{"error": "MCP server unavailable"}')
+    return ngx.exit(ngx.HTTP_SERVICE_UNAVAILABLE)
+end
+
+-- Same URI mapping as `location <prefix> { proxy_pass <base><uri>; }`
+local target_uri = ngx.var.request_uri
+if route.uri ~= cjson.null then
+    target_uri = route.uri .. string.sub(uri, #route.prefix + 1)
+    if ngx.var.args then
+        target_uri = target_uri .. "?" .. ngx.var.args
+    end
+end
+
+-- Multi-instance servers: keep MCP sessions on their instance, spread new ones by weight
+local base = route.base
+local endpoints = route.endpoints
+if type(endpoints) == "table" and #endpoints > 1 then
+    base = nil
+    local session_id = ngx.var.http_mcp_session_id
+    if session_id then
+        local pinned = ngx.shared.mcp_sessions:get("peer:" .. route_key .. ":" .. session_id)
+        for _, endpoint in ipairs(endpoints) do
+            if endpoint.base == pinned then
+                base = pinned
+                ngx.var.mcp_pinned_base = pinned
+                break
+            end
+        end
+    end
+    if not base then
+        local total = 0
+        for _, endpoint in ipairs(endpoints) do
+            total = total + endpoint.weight
+        end
+        local pick = math.random() * total
+        for _, endpoint in ipairs(endpoints) do
+            pick = pick - endpoint.weight
+            base = endpoint.base
+            if pick <= 0 then
+                break
+            end
+        end
+    end
+    ngx.var.mcp_route_key = route_key
+    ngx.var.mcp_base = base
+end
+
+ngx.var.mcp_target = base .. target_uri
+ngx.var.mcp_ssl_name = route.ssl_name
+if route.host ~= cjson.null then
+    ngx.var.mcp_host = route.host
+end
+if route.transport == "streamable-http" then
+    ngx.var.mcp_connection = ""
+    -- Listing responses are only cacheable on streamable-http (SSE answers on its own stream)
+    if type(route.cache_version) == "string" then
+        ngx.var.mcp_cache_version = route.cache_version
+    end
+else
+    ngx.var.mcp_connection = ngx.var.http_connection or ""
+end
+
+return ngx.exec("@mcp_dynamic")
+EOF
+
+cat > "$LUA_SCRIPTS_DIR/session_peer.lua" << 'EOF'
+-- session_peer.lua: Pick the upstream for a multi-instance MCP server (set_by_lua_file)
+-- ngx.arg[1] is the server's balanced upstream. Requests of a known MCP session go
+-- straight to the instance that created the session; everything else is balanced.
+local upstream = ngx.arg[1]
+ngx.ctx.mcp_upstream = upstream
+
+local session_id = ngx.var.http_mcp_session_id
+if session_id then
+    local peer = ngx.shared.mcp_sessions:get("peer:" .. upstream .. ":" .. session_id)
+    if peer then
+        ngx.ctx.mcp_pinned_peer = peer
+        return peer
+    end
+end
+return upstream
+EOF
+
+cat > "$LUA_SCRIPTS_DIR/session_learn.lua" << 'EOF'
+-- session_learn.lua: Remember which instance owns an MCP session (header_filter_by_lua_file)
+-- File-based routing keys sessions by upstream and pins to the answering peer address;
+-- dynamic routing keys them by route and pins to the chosen endpoint base URL.
+local SESSION_TTL_SECONDS = 3600
+
+local scope = ngx.ctx.mcp_upstream or ngx.var.mcp_route_key
+if not scope or scope == "" then
+    return
+end
+
+local sessions = ngx.shared.mcp_sessions
+local request_session = ngx.var.http_mcp_session_id
+
+if request_session then
+    local key = "peer:" .. scope .. ":" .. request_session
+    if ngx.req.get_method() == "DELETE" or ngx.status == ngx.HTTP_NOT_FOUND then
+        -- Session ended, or the instance no longer knows it: let the client start over balanced
+        sessions:delete(key)
+    else
+        local peer = ngx.ctx.mcp_pinned_peer or ngx.var.mcp_pinned_base
+        if peer and peer ~= "" then
+            -- Keep active sessions pinned
+            sessions:set(key, peer, SESSION_TTL_SECONDS)
+        end
+    end
+    return
+end
+
+local session_id = ngx.header["Mcp-Session-Id"]
+if not session_id then
+    return
+end
+
+local peer
+if ngx.ctx.mcp_upstream then
+    -- With retries upstream_addr lists every peer tried; the last one answered
+    peer = string.match(ngx.var.upstream_addr or "", "([^,%s]+)$")
+else
+    peer = ngx.var.mcp_base
+end
+if peer and peer ~= "" then
+    sessions:set("peer:" .. scope .. ":" .. session_id, peer, SESSION_TTL_SECONDS)
+end
+EOF
+
+cat > "$LUA_SCRIPTS_DIR/routes_admin.lua" << 'EOF'
+-- routes_admin.lua: Local endpoint the registry uses to replace the dynamic route table
+--   PUT {"version": "...", "routes": {"/path": {...}}}  replaces all routes
+--   GET                                               returns the active version
+local cjson = require "cjson.safe"
+
+local routes = ngx.shared.mcp_routes
+ngx.header["Content-Type"] = "application/json"
+
+if ngx.req.get_method() == "GET" then
+    ngx.say(cjson.encode({version = routes:get("version"), count = routes:get("count") or 0}))
+    return
+end
+
+if ngx.req.get_method() ~= "PUT" then
+    return ngx.exit(ngx.HTTP_NOT_ALLOWED)
+end
+
+ngx.req.read_body()
+local payload = cjson.decode(ngx.req.get_body_data() or "")
+if not payload or type(payload.routes) ~= "table" then
+    ngx.status = ngx.HTTP_BAD_REQUEST
+    ngx.say('{"error": "invalid route table"}')
+    return
+end
+
+-- Write the new routes first, then drop stale ones, so lookups never see a gap
+local count = 0
+for path, route in pairs(payload.routes) do
+    local ok, err = routes:set("route:" .. path, cjson.encode(route))
+    if not ok then
+        ngx.status = ngx.HTTP_INSUFFICIENT_STORAGE
+        ngx.say(cjson.encode({error = err}))
+        return
+    end
+    count = count + 1
+end
+for _, key in ipairs(routes:get_keys(0)) do
+    if string.sub(key, 1, 6) == "route:" and payload.routes[string.sub(key, 7)] == nil then
+        routes:delete(key)
+    end
+end
+routes:set("version", payload.version)
+routes:set("count", count)
+
+ngx.log(ngx.INFO, "Loaded " .. count .. " MCP routes (version " .. tostring(payload.version) .. ")")
+ngx.say(cjson.encode({version = payload.version, count = count}))
 EOF
 
-echo "Lua script created."
+echo "Lua scripts created."
 
 # --- Nginx Configuration ---
 echo "Copying custom Nginx configuration..."
@@ -22,7 +22,7 @@ interface Server {
   last_checked_time?: string;
   usersCount?: number;
   rating?: number;
-  status?: 'healthy' | 'healthy-auth-expired' | 'unhealthy' | 'unknown';
+  status?: 'healthy' | 'healthy-auth-expired' | 'degraded' | 'unhealthy' | 'unknown';
   num_tools?: number;
 }
 
@@ -98,6 +98,8 @@ const ServerCard: React.FC<ServerCardProps> = ({ server, onToggle, onEdit, canMo
         return <CheckCircleIcon className="h-4 w-4 text-green-500" />;
       case 'healthy-auth-expired':
         return <CheckCircleIcon className="h-4 w-4 text-orange-500" />;
+      case 'degraded':
+        return <CheckCircleIcon className="h-4 w-4 text-yellow-500" />;
       case 'unhealthy':
         return <XCircleIcon className="h-4 w-4 text-red-500" />;
       default:
@@ -111,6 +113,8 @@ const ServerCard: React.FC<ServerCardProps> = ({ server, onToggle, onEdit, canMo
         return 'bg-green-100 text-green-800 dark:bg-green-900/30 dark:text-green-400';
       case 'healthy-auth-expired':
         return 'bg-orange-100 text-orange-800 dark:bg-orange-900/30 dark:text-orange-400';
+      case 'degraded':
+        return 'bg-yellow-100 text-yellow-800 dark:bg-yellow-900/30 dark:text-yellow-400';
       case 'unhealthy':
         return 'bg-red-100 text-red-800 dark:bg-red-900/30 dark:text-red-400';
       default:
@@ -151,6 +155,7 @@ const ServerCard: React.FC<ServerCardProps> = ({ server, onToggle, onEdit, canMo
         const updates: Partial<Server> = {
           status: response.data.status === 'healthy' ? 'healthy' : 
                   response.data.status === 'healthy-auth-expired' ? 'healthy-auth-expired' :
+                  response.data.status === 'degraded' ? 'degraded' :
                   response.data.status === 'unhealthy' ? 'unhealthy' : 'unknown',
           last_checked_time: response.data.last_checked_iso,
           num_tools: response.data.num_tools
@@ -301,6 +306,8 @@ const ServerCard: React.FC<ServerCardProps> = ({ server, onToggle, onEdit, canMo
                     ? 'bg-emerald-400 shadow-lg shadow-emerald-400/30'
                     : server.status === 'healthy-auth-expired'
                     ? 'bg-orange-400 shadow-lg shadow-orange-400/30'
+                    : server.status === 'degraded'
+                    ? 'bg-yellow-400 shadow-lg shadow-yellow-400/30'
                     : server.status === 'unhealthy'
                     ? 'bg-red-400 shadow-lg shadow-red-400/30'
                     : 'bg-amber-400 shadow-lg shadow-amber-400/30'
@@ -308,6 +315,7 @@ const ServerCard: React.FC<ServerCardProps> = ({ server, onToggle, onEdit, canMo
                 <span className="text-sm font-medium text-gray-700 dark:text-gray-300">
                   {server.status === 'healthy' ? 'Healthy' : 
                    server.status === 'healthy-auth-expired' ? 'Healthy (Auth Expired)' :
+                   server.status === 'degraded' ? 'Degraded (Slow)' :
                    server.status === 'unhealthy' ? 'Unhealthy' : 'Unknown'}
                 </span>
               </div>
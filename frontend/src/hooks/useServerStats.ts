@@ -11,7 +11,7 @@ interface Server {
   last_checked_time?: string;
   usersCount?: number;
   rating?: number;
-  status?: 'healthy' | 'healthy-auth-expired' | 'unhealthy' | 'unknown';
+  status?: 'healthy' | 'healthy-auth-expired' | 'degraded' | 'unhealthy' | 'unknown';
   num_tools?: number;
 }
 
@@ -46,9 +46,10 @@ export const useServerStats = (): UseServerStatsReturn => {
   const [error, setError] = useState<string | null>(null);
 
   // Helper function to map backend health status to frontend status
-  const mapHealthStatus = (healthStatus: string): 'healthy' | 'unhealthy' | 'unknown' => {
+  const mapHealthStatus = (healthStatus: string): 'healthy' | 'degraded' | 'unhealthy' | 'unknown' => {
     if (!healthStatus || healthStatus === 'unknown') return 'unknown';
     if (healthStatus === 'healthy') return 'healthy';
+    if (healthStatus === 'degraded') return 'degraded';
     if (healthStatus.includes('unhealthy') || healthStatus.includes('error') || healthStatus.includes('timeout')) return 'unhealthy';
     return 'unknown';
   };
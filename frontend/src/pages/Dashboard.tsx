@@ -16,7 +16,7 @@ interface Server {
   last_checked_time?: string;
   usersCount?: number;
   rating?: number;
-  status?: 'healthy' | 'healthy-auth-expired' | 'unhealthy' | 'unknown';
+  status?: 'healthy' | 'healthy-auth-expired' | 'degraded' | 'unhealthy' | 'unknown';
   num_tools?: number;
   proxy_pass_url?: string;
   license?: string;
@@ -234,17 +234,14 @@ async def toggle_service_route(
     else:
         # When disabling, set status to disabled
         status = "disabled"
+        health_service.forget_service(service_path)
         logger.info(f"Service {service_path} toggled OFF. Status set to disabled.")
 
     # Update FAISS metadata with new enabled state
     await faiss_service.add_or_update_service(service_path, server_info, new_state)
     
     # Regenerate Nginx configuration
-    enabled_servers = {
-        path: server_service.get_server_info(path) 
-        for path in server_service.get_enabled_services()
-    }
-    await nginx_service.generate_config_async(enabled_servers)
+    nginx_service.request_reconcile(f"toggle: {service_path}")
     
     # Broadcast health status update to WebSocket clients
     await health_service.broadcast_health_update(service_path)
@@ -325,15 +322,14 @@ async def register_service(
             content={"error": f"Service with path '{path}' already exists or failed to save"},
         )
 
+    # A path registered again must not inherit health history from its previous registration
+    health_service.forget_service(path)
+
     # Add to FAISS index (disabled by default)
     await faiss_service.add_or_update_service(path, server_entry, False)
     
     # Regenerate Nginx configuration
-    enabled_servers = {
-        server_path: server_service.get_server_info(server_path) 
-        for server_path in server_service.get_enabled_services()
-    }
-    await nginx_service.generate_config_async(enabled_servers)
+    nginx_service.request_reconcile(f"register: {path}")
     
     # Broadcast health status update to WebSocket clients
     await health_service.broadcast_health_update(path)
@@ -469,11 +465,7 @@ async def edit_server_submit(
     await faiss_service.add_or_update_service(service_path, updated_server_entry, is_enabled)
     
     # Regenerate Nginx configuration
-    enabled_servers = {
-        path: server_service.get_server_info(path) 
-        for path in server_service.get_enabled_services()
-    }
-    await nginx_service.generate_config_async(enabled_servers)
+    nginx_service.request_reconcile(f"edit: {service_path}")
     
     logger.info(f"Server '{name}' ({service_path}) updated by user '{user_context['username']}'")
 
@@ -697,18 +689,16 @@ async def refresh_service(
     logger.info(f"Refreshing service {service_path} at {proxy_pass_url} by user '{user_context['username']}'")
 
     try:
-        # Perform immediate health check
-        status, last_checked_dt = await health_service.perform_immediate_health_check(service_path)
+        # Perform immediate health check; a manual refresh always re-fetches the tool list
+        status, last_checked_dt = await health_service.perform_immediate_health_check(
+            service_path, force_tool_refresh=True
+        )
         last_checked_iso = last_checked_dt.isoformat() if last_checked_dt else None
         logger.info(f"Manual refresh health check for {service_path} completed. Status: {status}")
         
         # Regenerate Nginx config after manual refresh
         logger.info(f"Regenerating Nginx config after manual refresh for {service_path}...")
-        enabled_servers = {
-            path: server_service.get_server_info(path) 
-            for path in server_service.get_enabled_services()
-        }
-        await nginx_service.generate_config_async(enabled_servers)
+        nginx_service.request_reconcile(f"manual refresh: {service_path}")
         
     except Exception as e:
         logger.error(f"ERROR during manual refresh check for {service_path}: {e}")
@@ -1,12 +1,13 @@
 import secrets
 from typing import Annotated, List, Dict, Any, Optional
 import logging
-import yaml
 from pathlib import Path
 
 from fastapi import Depends, HTTPException, status, Cookie
 from itsdangerous import URLSafeTimedSerializer, SignatureExpired, BadSignature
 
+from auth_server.scopes_loader import ScopesLoader
+
 from ..core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -126,26 +127,11 @@ def get_user_session_data(
         )
 
 
-def load_scopes_config() -> Dict[str, Any]:
-    """Load the scopes configuration from auth_server/scopes.yml"""
-    try:
-        # Look for scopes.yml in auth_server directory
-        scopes_file = Path(__file__).parent.parent.parent / "auth_server" / "scopes.yml"
-        if not scopes_file.exists():
-            logger.warning(f"Scopes config file not found at {scopes_file}")
-            return {}
-            
-        with open(scopes_file, 'r') as f:
-            config = yaml.safe_load(f)
-            logger.info(f"Loaded scopes configuration with {len(config.get('group_mappings', {}))} group mappings")
-            return config
-    except Exception as e:
-        logger.error(f"Failed to load scopes configuration: {e}")
-        return {}
-
-
-# Global scopes configuration
-SCOPES_CONFIG = load_scopes_config()
+# Global scopes configuration, reloaded when auth_server/scopes.yml changes
+scopes_loader = ScopesLoader(
+    Path(__file__).parent.parent.parent / "auth_server" / "scopes.yml",
+    poll_interval_seconds=settings.scopes_reload_interval_seconds,
+)
 
 
 def map_cognito_groups_to_scopes(groups: List[str]) -> List[str]:
@@ -159,7 +145,7 @@ def map_cognito_groups_to_scopes(groups: List[str]) -> List[str]:
         List of MCP scopes
     """
     scopes = []
-    group_mappings = SCOPES_CONFIG.get('group_mappings', {})
+    group_mappings = scopes_loader.config.get('group_mappings', {})
     
     for group in groups:
         if group in group_mappings:
@@ -193,7 +179,7 @@ def get_ui_permissions_for_user(user_scopes: List[str]) -> Dict[str, List[str]]:
         Example: {'list_service': ['mcpgw', 'auth_server'], 'toggle_service': ['mcpgw']}
     """
     ui_permissions = {}
-    ui_scopes = SCOPES_CONFIG.get('UI-Scopes', {})
+    ui_scopes = scopes_loader.config.get('UI-Scopes', {})
     
     for scope in user_scopes:
         if scope in ui_scopes:
@@ -273,7 +259,7 @@ def get_servers_for_scope(scope: str) -> List[str]:
     Returns:
         List of server names the scope grants access to
     """
-    scope_config = SCOPES_CONFIG.get(scope, [])
+    scope_config = scopes_loader.config.get(scope, [])
     server_names = []
     
     for server_config in scope_config:
@@ -296,7 +282,7 @@ def get_user_accessible_servers(user_scopes: List[str]) -> List[str]:
     accessible_servers = set()
     
     logger.info(f"DEBUG: get_user_accessible_servers called with scopes: {user_scopes}")
-    logger.info(f"DEBUG: Available scope configs: {list(SCOPES_CONFIG.keys())}")
+    logger.info(f"DEBUG: Available scope configs: {list(scopes_loader.config.keys())}")
     
     for scope in user_scopes:
         logger.info(f"DEBUG: Processing scope: {scope}")
@@ -12,6 +12,7 @@ class HealthStatus(str, Enum):
     
     HEALTHY = "healthy"
     HEALTHY_AUTH_EXPIRED = "healthy-auth-expired"
+    DEGRADED = "degraded"  # Reachable, but probe latency is above the SLO thresholds
     UNHEALTHY_TIMEOUT = "unhealthy: timeout"
     UNHEALTHY_CONNECTION_ERROR = "unhealthy: connection error" 
     UNHEALTHY_ENDPOINT_CHECK_FAILED = "unhealthy: endpoint check failed"
@@ -22,7 +23,7 @@ class HealthStatus(str, Enum):
     @classmethod
     def get_healthy_statuses(cls) -> List[str]:
         """Get list of statuses that should be considered healthy for nginx inclusion."""
-        return [cls.HEALTHY, cls.HEALTHY_AUTH_EXPIRED]
+        return [cls.HEALTHY, cls.HEALTHY_AUTH_EXPIRED, cls.DEGRADED]
     
     @classmethod
     def is_healthy(cls, status: str) -> bool:
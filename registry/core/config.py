@@ -22,6 +22,7 @@ class Settings(BaseSettings):
     session_max_age_seconds: int = 60 * 60 * 8  # 8 hours
     auth_server_url: str = "http://localhost:8888"
     auth_server_external_url: str = "http://localhost:8888"  # External URL for OAuth redirects
+    scopes_reload_interval_seconds: float = 5.0  # How often auth_server/scopes.yml is checked for changes (0 disables)
     
     # Embeddings settings
     embeddings_model_name: str = "all-MiniLM-L6-v2"
@@ -30,6 +31,25 @@ class Settings(BaseSettings):
     # Health check settings  
     health_check_interval_seconds: int = 300  # 5 minutes for automatic background checks
     health_check_timeout_seconds: int = 2  # Very fast timeout for user-driven actions
+
+    # Health worker settings - run probes in a child process so large fleets don't slow the API loop
+    health_worker_enabled: bool = False
+    health_worker_cycle_timeout_seconds: int = 120  # Worker is restarted if a cycle takes longer
+
+    # Tool list refresh settings
+    tool_refresh_min_interval_seconds: int = 30  # Minimum time between tool list fetches per service
+
+    # Latency SLO settings - healthy services whose probe latency EWMA exceeds these are marked degraded
+    health_latency_ewma_alpha: float = 0.3  # Weight of the newest probe in the moving average
+    health_degraded_total_latency_ms: float = 1000.0
+    health_degraded_ttfb_ms: float = 750.0
+    health_degraded_recovery_ratio: float = 0.8  # Recover only once below threshold * ratio (hysteresis)
+
+    # Health history settings
+    health_history_max_samples: int = 2880  # Raw probe samples kept per service
+    health_history_retention_seconds: int = 60 * 60 * 24  # 24 hours of raw samples
+    health_history_rollup_interval_seconds: int = 300  # 5 minute rollup buckets
+    health_history_rollup_retention_seconds: int = 60 * 60 * 24 * 7  # 7 days of rollups
     
     # WebSocket performance settings
     max_websocket_connections: int = 100  # Reasonable limit for development/testing
@@ -37,7 +57,47 @@ class Settings(BaseSettings):
     websocket_broadcast_interval_ms: int = 10  # Very responsive - 10ms minimum between broadcasts
     websocket_max_batch_size: int = 20  # Smaller batches for faster updates
     websocket_cache_ttl_seconds: int = 1  # 1 second cache for near real-time user feedback
-    
+
+    # Server-Sent Events settings
+    health_change_feed_size: int = 500  # Number of change events kept for Last-Event-ID resume
+    sse_keepalive_interval_seconds: float = 15.0  # Comment ping interval to keep proxies from timing out
+    sse_retry_ms: int = 3000  # Reconnect delay advertised to EventSource clients
+
+    # Nginx reconcile settings - config changes are coalesced into as few reloads as possible
+    nginx_reload_debounce_seconds: float = 1.0  # Window in which reload requests are merged
+    nginx_reload_min_interval_seconds: float = 5.0  # Minimum time between reloads
+    nginx_command_timeout_seconds: float = 10.0  # Timeout for nginx -t and nginx -s reload
+
+    # Default upstream keepalive pool, overridable per server JSON (keepalive, keepalive_requests, keepalive_timeout)
+    nginx_upstream_keepalive: int = 32  # Idle connections kept per nginx worker
+    nginx_upstream_keepalive_requests: int = 1000
+    nginx_upstream_keepalive_timeout_seconds: int = 60
+    # Multi-instance servers: healthy endpoints get this many times the traffic share of degraded ones
+    nginx_degraded_endpoint_weight_divisor: int = 4
+
+    # Routing mode: "file" renders a location block per server (reload on change),
+    # "dynamic" pushes routes into an nginx lua_shared_dict (no reloads)
+    nginx_routing_mode: str = "file"
+    nginx_admin_url: str = "http://127.0.0.1:8089/_mcp/routes"  # Local route admin endpoint
+    nginx_dns_resolver: str = "127.0.0.11"  # Docker embedded DNS, used to resolve dynamic routes
+    nginx_route_push_retry_seconds: float = 5.0  # First retry delay after a failed route push, doubled per failure
+    nginx_route_push_retry_max_seconds: float = 300.0  # Cap on the route push retry delay
+
+    # Cache auth_request /validate results in nginx (TTL set by the auth server, bounded by token expiry)
+    nginx_auth_cache_enabled: bool = True
+    nginx_auth_cache_path: str = "/var/cache/nginx/auth"
+
+    # Public DNS name added to nginx server_name. EC2_PUBLIC_DNS overrides the lookup; otherwise
+    # it is read from the instance metadata service at startup and refreshed in the background
+    ec2_public_dns: str = ""
+    ec2_metadata_url: str = "http://169.254.169.254"
+    ec2_public_dns_refresh_seconds: int = 3600  # 0 disables the background refresh
+
+    # Cache tools/list, resources/list and prompts/list results in nginx, per server, scope set
+    # and tool-list version (a changed tool list starts from an empty cache)
+    nginx_response_cache_enabled: bool = True
+    nginx_response_cache_ttl_seconds: int = 300
+
     # Container paths - adjust for local development
     container_app_dir: Path = Path("/app")
     container_registry_dir: Path = Path("/app/registry")
@@ -1,16 +1,191 @@
 import logging
 import asyncio
+import hashlib
+import json
+import os
+import re
+import subprocess
 import httpx
+from collections import deque
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Any, Optional
+from time import monotonic, perf_counter
+from typing import Dict, Any, List, Optional, Set, Tuple
 from urllib.parse import urlparse
 
+from pydantic import BaseModel
+
 from .config import settings
+from .schemas import ServerEndpoint, get_server_endpoints
 from registry.constants import HealthStatus
 
 logger = logging.getLogger(__name__)
 
 
+class NginxCommandResult(BaseModel):
+    """Outcome of an nginx command (`nginx -t`, `nginx -s reload`)."""
+
+    command: str
+    success: bool
+    returncode: Optional[int] = None
+    stdout: str = ""
+    stderr: str = ""
+    duration_ms: float = 0.0
+    timed_out: bool = False
+    nginx_missing: bool = False
+    timestamp: str
+
+
+def _write_file_atomic(path: Path, content: str):
+    """Write via a temp file in the same directory and rename over the target.
+
+    The temp name does not end in .conf so nginx's conf.d include never picks it up.
+    """
+    tmp_path = path.with_name(f".{path.name}.tmp-{os.getpid()}")
+    try:
+        with open(tmp_path, "w") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _timeout_seconds(value: Any) -> int:
+    """Parse a keepalive timeout given as seconds or an nginx time string ("75s", "2m", "1h")."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = re.fullmatch(r"\s*(\d+)\s*([smh]?)\s*", str(value))
+    if not match:
+        raise ValueError(f"Invalid keepalive_timeout: {value!r}")
+    return int(match.group(1)) * {"": 1, "s": 1, "m": 60, "h": 3600}[match.group(2)]
+
+
+def get_upstream_name(proxy_pass_url: str) -> str:
+    """Name of the nginx upstream shared by all servers on the same backend scheme/host/port."""
+    parsed_url = urlparse(proxy_pass_url)
+    port = parsed_url.port or (443 if parsed_url.scheme == "https" else 80)
+    return "mcp_" + re.sub(r"[^A-Za-z0-9]", "_", f"{parsed_url.scheme}_{parsed_url.hostname}_{port}")
+
+
+# Auth subrequest and header forwarding shared by per-server and dynamic location blocks
+_AUTH_REQUEST_SETTINGS = """
+        # Authenticate request - pass entire request to auth server
+        auth_request /validate;
+        
+        # Capture auth server response headers for forwarding
+        auth_request_set $auth_user $upstream_http_x_user;
+        auth_request_set $auth_username $upstream_http_x_username;
+        auth_request_set $auth_client_id $upstream_http_x_client_id;
+        auth_request_set $auth_scopes $upstream_http_x_scopes;
+        auth_request_set $auth_method $upstream_http_x_auth_method;
+        auth_request_set $auth_server_name $upstream_http_x_server_name;
+        auth_request_set $auth_tool_name $upstream_http_x_tool_name;
+        """
+
+_FORWARDED_HEADER_SETTINGS = """
+        proxy_set_header X-Real-IP $remote_addr;
+        proxy_set_header X-Forwarded-For $proxy_add_x_forwarded_for;
+        proxy_set_header X-Forwarded-Proto $scheme;
+        
+        # Add original URL for auth server scope validation
+        proxy_set_header X-Original-URL $scheme://$host$request_uri;
+        
+        # Pass through the original authentication headers
+        proxy_set_header Authorization $http_authorization;
+        proxy_set_header X-Authorization $http_x_authorization;
+        proxy_set_header X-User-Pool-Id $http_x_user_pool_id;
+        proxy_set_header X-Client-Id $http_x_client_id;
+        proxy_set_header X-Region $http_x_region;
+
+        
+        # Forward auth server response headers to backend
+        proxy_set_header X-User $auth_user;
+        proxy_set_header X-Username $auth_username;
+        proxy_set_header X-Client-Id-Auth $auth_client_id;
+        proxy_set_header X-Scopes $auth_scopes;
+        proxy_set_header X-Auth-Method $auth_method;
+        proxy_set_header X-Server-Name $auth_server_name;
+        proxy_set_header X-Tool-Name $auth_tool_name;
+        
+        # Auth cache key is only meant for the /validate subrequest
+        proxy_set_header X-Auth-Cache-Key "";
+        
+        # Pass all original client headers
+        proxy_pass_request_headers on;
+        
+        # Handle auth errors
+        error_page 401 = @auth_error;
+        error_page 403 = @forbidden_error;"""
+
+# auth_request cache. capture_body.lua sets X-Auth-Cache-Key (credentials hash, server,
+# JSON-RPC method and tool) only for cacheable calls; entries live for the X-Accel-Expires
+# returned by the auth server, which never exceeds the token's remaining lifetime.
+_AUTH_CACHE_ZONE = """proxy_cache_path {path} levels=1:2 keys_zone=auth_cache:10m max_size=100m inactive=10m use_temp_path=off;
+
+# Requests without a cache key always go to the auth server
+map $http_x_auth_cache_key $auth_cache_skip {{
+    ""      1;
+    default 0;
+}}"""
+
+_AUTH_CACHE_SETTINGS = """
+        # Reuse validation results for repeated calls with the same token, server and method
+        proxy_cache auth_cache;
+        proxy_cache_key $http_x_auth_cache_key;
+        proxy_cache_bypass $auth_cache_skip;
+        proxy_no_cache $auth_cache_skip;
+        proxy_cache_lock on;"""
+
+# Gateway cache for idempotent listing calls. capture_body.lua picks out cacheable requests,
+# response_cache.lua answers hits after auth_request (keyed by server, method, cursor, scope
+# set and $mcp_cache_version) and response_cache_store.lua stores the results of misses.
+_RESPONSE_CACHE_SETTINGS = """
+        # Serve repeated tools/list, resources/list and prompts/list calls from the gateway
+        set $mcp_cache_ttl {ttl};
+        access_by_lua_file /etc/nginx/lua/response_cache.lua;
+        body_filter_by_lua_file /etc/nginx/lua/response_cache_store.lua;"""
+
+# Variables filled in by dynamic_route.lua when a request matches a pushed route
+_DYNAMIC_ROUTING_HOOK = """
+        # Dynamic MCP routing: look the path up in the mcp_routes shared dict
+        set $mcp_target "";
+        set $mcp_host $host;
+        set $mcp_ssl_name "";
+        set $mcp_connection "";
+        set $mcp_route_key "";
+        set $mcp_base "";
+        set $mcp_pinned_base "";
+        set $mcp_cache_version "";
+        rewrite_by_lua_file /etc/nginx/lua/dynamic_route.lua;"""
+
+
+def get_server_upstream_name(path: str) -> str:
+    """Name of the dedicated upstream of a multi-instance server."""
+    return "mcp_srv_" + re.sub(r"[^A-Za-z0-9]", "_", path.strip("/"))
+
+
+def get_response_cache_version(server_info: Dict[str, Any]) -> Optional[str]:
+    """Version of a server's cached listing responses, or None when response caching is off.
+
+    Derived from the tool-list hash, so a tool list change seen by the health
+    monitor moves the server to a fresh set of cache keys.
+    """
+    if not settings.nginx_response_cache_enabled:
+        return None
+    from ..health.service import compute_tool_list_hash
+    return compute_tool_list_hash(server_info.get("tool_list"))[:16]
+
+
+def _host_port(parsed_url) -> str:
+    return f"{parsed_url.hostname}:{parsed_url.port or (443 if parsed_url.scheme == 'https' else 80)}"
+
+
 class NginxConfigService:
     """Service for generating Nginx configuration for registered servers."""
     
@@ -22,16 +197,91 @@ class NginxConfigService:
         else:
             # Fallback for local development
             self.nginx_template_path = Path("docker/nginx_rev_proxy.conf")
-        
+
+        # Template is cached in memory and re-read only when its mtime changes
+        self._template_content: Optional[str] = None
+        self._template_mtime: Optional[float] = None
+
+        # Rendered location blocks keyed by (path, proxy_pass_url, transports, health status)
+        self._location_block_cache: Dict[Tuple, List[str]] = {}
+
+        # Hash of the last config written and reloaded; None forces the next write
+        self._last_applied_hash: Optional[str] = None
+        self._checked_existing_config = False
+
+        # Reconcile loop: reload requests are coalesced and applied from a single task
+        self._reconcile_task: Optional[asyncio.Task] = None
+        self._reconcile_requested: Optional[asyncio.Event] = None
+        self._pending_reasons: Set[str] = set()
+        self._last_reconcile_time: Optional[float] = None
+
+        # Recent nginx command results, newest last
+        self.command_events: deque = deque(maxlen=50)
+
+        # Whether the applied config routes through the shared dict (dynamic routing mode)
+        self.dynamic_routing_active = False
+
+        # Retry of a failed route push, backed off exponentially while the admin endpoint is down
+        self._route_push_failures = 0
+        self._route_push_retry: Optional[asyncio.TimerHandle] = None
+
+        # Public DNS for server_name, resolved once and kept fresh off the config hot path
+        self._public_dns: Optional[str] = None
+        self._public_dns_task: Optional[asyncio.Task] = None
+
+    async def resolve_public_dns(self) -> str:
+        """Resolve the public DNS name: the configured override, else the EC2 metadata service.
+
+        A failed lookup keeps the previously resolved name.
+        """
+        if settings.ec2_public_dns:
+            public_dns = settings.ec2_public_dns
+        else:
+            public_dns = await self.get_ec2_public_dns() or self._public_dns or ""
+        self._public_dns = public_dns
+        return public_dns
+
+    async def start_public_dns_refresh(self):
+        """Resolve the public DNS now and keep refreshing it in the background."""
+        await self.resolve_public_dns()
+        if settings.ec2_public_dns or settings.ec2_public_dns_refresh_seconds <= 0:
+            return
+        if self._public_dns_task is None or self._public_dns_task.done():
+            self._public_dns_task = asyncio.create_task(self._public_dns_refresh_loop())
+
+    async def stop_public_dns_refresh(self):
+        """Stop the background public DNS refresh."""
+        if self._public_dns_task is not None:
+            self._public_dns_task.cancel()
+            try:
+                await self._public_dns_task
+            except asyncio.CancelledError:
+                pass
+            self._public_dns_task = None
+
+    async def _public_dns_refresh_loop(self):
+        while True:
+            await asyncio.sleep(settings.ec2_public_dns_refresh_seconds)
+            previous = self._public_dns
+            try:
+                public_dns = await self.resolve_public_dns()
+            except Exception as e:
+                logger.warning(f"Public DNS refresh failed: {e}")
+                continue
+            if public_dns != previous:
+                logger.info(f"Public DNS changed from {previous!r} to {public_dns!r}")
+                self.request_reconcile("public DNS change")
+
     async def get_ec2_public_dns(self) -> str:
         """Fetch EC2 public DNS from metadata service."""
+        metadata_url = settings.ec2_metadata_url.rstrip("/")
         try:
             # EC2 Instance Metadata Service v2 (IMDSv2) 
             # First get session token
             async with httpx.AsyncClient() as client:
                 # Get session token
                 token_response = await client.put(
-                    "http://169.254.169.254/latest/api/token",
+                    f"{metadata_url}/latest/api/token",
                     headers={"X-aws-ec2-metadata-token-ttl-seconds": "21600"},
                     timeout=2.0
                 )
@@ -41,7 +291,7 @@ class NginxConfigService:
                     
                     # Get public hostname using the token
                     dns_response = await client.get(
-                        "http://169.254.169.254/latest/meta-data/public-hostname",
+                        f"{metadata_url}/latest/meta-data/public-hostname",
                         headers={"X-aws-ec2-metadata-token": token},
                         timeout=2.0
                     )
@@ -61,14 +311,7 @@ class NginxConfigService:
             logger.warning("Cannot connect to EC2 metadata service - likely not running on EC2")
         except Exception as e:
             logger.warning(f"Error fetching EC2 public DNS: {e}")
-            
-        # Fallback: try environment variable or return empty string
-        import os
-        fallback_dns = os.environ.get('EC2_PUBLIC_DNS', '')
-        if fallback_dns:
-            logger.info(f"Using EC2_PUBLIC_DNS environment variable: {fallback_dns}")
-            return fallback_dns
-        
+
         logger.info("No EC2 public DNS available, using empty string")
         return ""
 
@@ -89,76 +332,461 @@ class NginxConfigService:
             logger.error(f"Failed to generate Nginx configuration: {e}", exc_info=True)
             return False
         
+    def _read_template(self) -> str:
+        """Return the template, re-reading it from disk only when it changed."""
+        mtime = self.nginx_template_path.stat().st_mtime
+        if self._template_content is None or mtime != self._template_mtime:
+            with open(self.nginx_template_path, "r") as f:
+                self._template_content = f.read()
+            self._template_mtime = mtime
+        return self._template_content
+
+    @staticmethod
+    def _location_block_key(path: str, server_info: Dict[str, Any], health_status: str) -> Tuple:
+        return (
+            path,
+            server_info.get("proxy_pass_url"),
+            tuple(server_info.get("supported_transports") or ()),
+            str(health_status),
+            tuple((endpoint.url, endpoint.weight) for endpoint in get_server_endpoints(server_info)),
+            server_info.get("load_balancing"),
+            get_response_cache_version(server_info),
+        )
+
+    @staticmethod
+    def _routed_endpoints(
+        server_info: Dict[str, Any], endpoint_health: Optional[Dict[str, str]] = None
+    ) -> List[Tuple[ServerEndpoint, int]]:
+        """Endpoints that receive traffic, with their effective weight.
+
+        Endpoints whose last probe failed are left out. While some endpoints are
+        degraded (slow) and others are not, the weights of the fast ones are
+        multiplied by nginx_degraded_endpoint_weight_divisor, so degraded ones
+        keep serving, with a proportionally smaller share of new requests.
+        """
+        endpoints = get_server_endpoints(server_info)
+        if len(endpoints) <= 1 or not endpoint_health:
+            return [(endpoint, endpoint.weight) for endpoint in endpoints]
+
+        statuses = {endpoint.url: endpoint_health.get(endpoint.url, HealthStatus.HEALTHY) for endpoint in endpoints}
+        # With every instance failing the server is unhealthy and not routed anyway
+        routed = [endpoint for endpoint in endpoints if HealthStatus.is_healthy(statuses[endpoint.url])] or endpoints
+        degraded = {endpoint.url for endpoint in routed if statuses[endpoint.url] == HealthStatus.DEGRADED}
+        if not degraded or len(degraded) == len(routed):
+            return [(endpoint, endpoint.weight) for endpoint in routed]
+        factor = max(1, settings.nginx_degraded_endpoint_weight_divisor)
+        return [
+            (endpoint, endpoint.weight if endpoint.url in degraded else endpoint.weight * factor)
+            for endpoint in routed
+        ]
+
+    def _get_location_blocks(self, path: str, server_info: Dict[str, Any], health_status: str) -> List[str]:
+        """Location blocks for one server, memoized on the inputs that affect their rendering."""
+        proxy_pass_url = server_info.get("proxy_pass_url")
+        key = self._location_block_key(path, server_info, health_status)
+        blocks = self._location_block_cache.get(key)
+        if blocks is not None:
+            return blocks
+
+        # Include servers that are healthy or just have expired auth (server is up)
+        if HealthStatus.is_healthy(health_status):
+            # Generate transport-aware location blocks
+            # Degraded servers render exactly like healthy ones, so a latency flip never reloads nginx
+            blocks = self._generate_transport_location_blocks(path, server_info)
+            logger.debug(f"Added location blocks for healthy service: {path} (status: {health_status})")
+        else:
+            # Add commented out block for unhealthy services
+            blocks = [f"""
+#    location {path}/ {{
+#        # Service currently unhealthy (status: {health_status})
+#        # Proxy to MCP server
+#        proxy_pass {proxy_pass_url};
+#        proxy_http_version 1.1;
+#        proxy_set_header Host $host;
+#        proxy_set_header X-Real-IP $remote_addr;
+#        proxy_set_header X-Forwarded-For $proxy_add_x_forwarded_for;
+#        proxy_set_header X-Forwarded-Proto $scheme;
+#    }}"""]
+            logger.debug(f"Added commented location block for unhealthy service {path} (status: {health_status})")
+
+        self._location_block_cache[key] = blocks
+        return blocks
+
+    def _config_unchanged(self, config_hash: str) -> bool:
+        """Check the rendered config hash against the last applied one (or the file on disk at startup)."""
+        if not self._checked_existing_config:
+            # A config left by a previous run is what nginx is serving (or will load on start)
+            self._checked_existing_config = True
+            try:
+                with open(settings.nginx_config_path, "rb") as f:
+                    self._last_applied_hash = hashlib.sha256(f.read()).hexdigest()
+            except OSError:
+                pass
+        return config_hash == self._last_applied_hash
+
     async def generate_config_async(self, servers: Dict[str, Dict[str, Any]]) -> bool:
-        """Generate Nginx configuration with EC2 DNS and dynamic location blocks."""
+        """Generate Nginx configuration with EC2 DNS and dynamic location blocks.
+
+        The config is only written, and nginx only reloaded, when the rendered
+        output differs from what was last applied.
+        """
         try:
             # Read template
             if not self.nginx_template_path.exists():
                 logger.warning(f"Nginx template not found at {self.nginx_template_path}")
                 return False
                 
-            with open(self.nginx_template_path, "r") as f:
-                template_content = f.read()
+            template_content = self._read_template()
             
             # Get health service to check server health
             from ..health.service import health_service
+
+            # In dynamic mode routes live in nginx's shared dict and the config only
+            # carries the generic location, so toggles and health changes never reload.
+            # If the routes cannot be pushed, fall back to per-server location blocks.
+            self.dynamic_routing_active = (
+                settings.nginx_routing_mode == "dynamic" and await self.push_routes(servers)
+            )
             
             # Generate location blocks for enabled and healthy servers with transport support
             location_blocks = []
-            for path, server_info in servers.items():
-                proxy_pass_url = server_info.get("proxy_pass_url")
-                if proxy_pass_url:
-                    # Check if server is healthy (including auth-expired which is still reachable)
-                    health_status = health_service.server_health_status.get(path, HealthStatus.UNKNOWN)
-                    
-                    # Include servers that are healthy or just have expired auth (server is up)
-                    if HealthStatus.is_healthy(health_status):
-                        # Generate transport-aware location blocks
-                        transport_blocks = self._generate_transport_location_blocks(path, server_info)
-                        location_blocks.extend(transport_blocks)
-                        logger.debug(f"Added location blocks for healthy service: {path}")
-                    else:
-                        # Add commented out block for unhealthy services
-                        commented_block = f"""
-#    location {path}/ {{
-#        # Service currently unhealthy (status: {health_status})
-#        # Proxy to MCP server
-#        proxy_pass {proxy_pass_url};
-#        proxy_http_version 1.1;
-#        proxy_set_header Host $host;
-#        proxy_set_header X-Real-IP $remote_addr;
-#        proxy_set_header X-Forwarded-For $proxy_add_x_forwarded_for;
-#        proxy_set_header X-Forwarded-Proto $scheme;
-#    }}"""
-                        location_blocks.append(commented_block)
-                        logger.debug(f"Added commented location block for unhealthy service {path} (status: {health_status})")
+            routed_servers = {}
+            if self.dynamic_routing_active:
+                location_blocks.append(self._create_dynamic_location_block())
+            else:
+                previous_cache = self._location_block_cache
+                self._location_block_cache = {}
+                for path, server_info in servers.items():
+                    if server_info.get("proxy_pass_url"):
+                        health_status = health_service.server_health_status.get(path, HealthStatus.UNKNOWN)
+                        key = self._location_block_key(path, server_info, health_status)
+                        # Carry over memoized blocks still in use; entries for removed servers are dropped
+                        if key in previous_cache:
+                            self._location_block_cache[key] = previous_cache[key]
+                        location_blocks.extend(self._get_location_blocks(path, server_info, health_status))
+                        if HealthStatus.is_healthy(health_status):
+                            routed_servers[path] = server_info
+
+            # Upstreams only for routed servers: nginx resolves upstream hosts at load time
+            upstream_blocks = self._generate_upstream_blocks(
+                routed_servers,
+                {path: health_service.endpoint_health.get(path) for path in routed_servers},
+            )
             
-            # Fetch EC2 public DNS
-            ec2_public_dns = await self.get_ec2_public_dns()
+            # Public DNS is resolved at startup and refreshed in the background
+            ec2_public_dns = self._public_dns
+            if ec2_public_dns is None:
+                ec2_public_dns = await self.resolve_public_dns()
             
             # Replace placeholders in template
-            config_content = template_content.replace("{{LOCATION_BLOCKS}}", "\n".join(location_blocks))
+            config_content = template_content.replace("{{UPSTREAM_BLOCKS}}", "\n".join(upstream_blocks))
+            config_content = config_content.replace("{{LOCATION_BLOCKS}}", "\n".join(location_blocks))
             config_content = config_content.replace("{{EC2_PUBLIC_DNS}}", ec2_public_dns)
+            config_content = config_content.replace(
+                "{{DYNAMIC_ROUTING_HOOK}}", _DYNAMIC_ROUTING_HOOK if self.dynamic_routing_active else ""
+            )
+            if settings.nginx_auth_cache_enabled:
+                auth_cache_zone = _AUTH_CACHE_ZONE.format(path=settings.nginx_auth_cache_path)
+                auth_cache_settings = _AUTH_CACHE_SETTINGS
+            else:
+                auth_cache_zone = auth_cache_settings = ""
+            config_content = config_content.replace("{{AUTH_CACHE_ZONE}}", auth_cache_zone)
+            config_content = config_content.replace("{{AUTH_CACHE_SETTINGS}}", auth_cache_settings)
+
+            config_hash = hashlib.sha256(config_content.encode("utf-8")).hexdigest()
+            if self._config_unchanged(config_hash):
+                logger.debug("Nginx configuration unchanged, skipping write and reload")
+                return True
             
-            # Write config file
-            with open(settings.nginx_config_path, "w") as f:
-                f.write(config_content)
+            # Keep the current config so it can be restored if validation fails
+            try:
+                with open(settings.nginx_config_path, "r") as f:
+                    previous_content: Optional[str] = f.read()
+            except OSError:
+                previous_content = None
+
+            # Write config file (atomically, so nginx never reads a partial file)
+            _write_file_atomic(Path(settings.nginx_config_path), config_content)
                 
-            logger.info(f"Generated Nginx configuration with {len(location_blocks)} location blocks and EC2 DNS: {ec2_public_dns}")
+            logger.info(f"Generated Nginx configuration with {len(location_blocks)} location blocks, {len(upstream_blocks)} upstreams and EC2 DNS: {ec2_public_dns}")
+
+            if not await self.validate_nginx_config():
+                if previous_content is not None:
+                    _write_file_atomic(Path(settings.nginx_config_path), previous_content)
+                    logger.error("Restored previous Nginx configuration after failed validation")
+                self._last_applied_hash = None
+                return False
             
             # Automatically reload nginx after generating config
-            self.reload_nginx()
+            # A failed reload leaves the hash unset so the next generation retries
+            reload_result = await self.reload_nginx_async()
+            self._last_applied_hash = config_hash if reload_result.success else None
             
             return True
             
         except Exception as e:
+            self._last_applied_hash = None
             logger.error(f"Failed to generate Nginx configuration: {e}", exc_info=True)
             return False
             
+    async def _run_nginx_command(self, *args: str) -> NginxCommandResult:
+        """Run nginx with the given arguments without blocking the event loop."""
+        command = " ".join(("nginx",) + args)
+        started = perf_counter()
+        result = {"command": command, "success": False}
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "nginx", *args,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(
+                    process.communicate(), timeout=settings.nginx_command_timeout_seconds
+                )
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                result["timed_out"] = True
+            else:
+                result.update(
+                    returncode=process.returncode,
+                    success=process.returncode == 0,
+                    stdout=stdout.decode(errors="replace").strip(),
+                    stderr=stderr.decode(errors="replace").strip(),
+                )
+        except FileNotFoundError:
+            result["nginx_missing"] = True
+
+        event = NginxCommandResult(
+            **result,
+            duration_ms=round((perf_counter() - started) * 1000.0, 2),
+            timestamp=datetime.now(timezone.utc).isoformat(),
+        )
+        self.command_events.append(event)
+        return event
+
+    async def validate_nginx_config(self) -> bool:
+        """Run `nginx -t`. Returns True if valid or nginx is not installed."""
+        result = await self._run_nginx_command("-t")
+        if result.nginx_missing:
+            logger.warning("Nginx not found - skipping configuration test")
+            return True
+        if result.timed_out:
+            logger.error(f"Nginx configuration test timed out after {settings.nginx_command_timeout_seconds}s")
+        elif not result.success:
+            logger.error(f"Nginx configuration test failed: {result.stderr}")
+        return result.success
+
+    async def reload_nginx_async(self) -> NginxCommandResult:
+        """Signal nginx to reload without blocking the event loop."""
+        result = await self._run_nginx_command("-s", "reload")
+        if result.success:
+            logger.info(f"Nginx configuration reloaded successfully ({result.duration_ms} ms)")
+        elif result.nginx_missing:
+            logger.warning("Nginx not found - skipping reload")
+        elif result.timed_out:
+            logger.error(f"Nginx reload timed out after {settings.nginx_command_timeout_seconds}s")
+        else:
+            logger.error(f"Failed to reload Nginx: {result.stderr}")
+        return result
+
+    def get_command_events(self) -> List[Dict[str, Any]]:
+        """Recent nginx command results, newest first."""
+        return [event.model_dump() for event in reversed(self.command_events)]
+
+    def request_reconcile(self, reason: str = "") -> None:
+        """Ask for nginx config to be brought in line with the current server and health state.
+
+        Requests are coalesced: the reconcile loop waits for the debounce window,
+        honours the minimum interval between reloads, then renders from the latest
+        state, so any number of requests in a burst results in at most one reload.
+        Safe to call from sync code running on the event loop.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (e.g. scripts): apply immediately
+            self.generate_config(self._get_enabled_servers())
+            return
+
+        if self._reconcile_requested is None:
+            self._reconcile_requested = asyncio.Event()
+        if reason:
+            self._pending_reasons.add(reason)
+        self._reconcile_requested.set()
+
+        if self._reconcile_task is None or self._reconcile_task.done():
+            self._reconcile_task = asyncio.create_task(self._reconcile_loop())
+
+    async def stop_reconciler(self):
+        """Stop the reconcile loop."""
+        if self._route_push_retry is not None:
+            self._route_push_retry.cancel()
+            self._route_push_retry = None
+        if self._reconcile_task is not None:
+            self._reconcile_task.cancel()
+            try:
+                await self._reconcile_task
+            except asyncio.CancelledError:
+                pass
+            self._reconcile_task = None
+
+    async def _reconcile_loop(self):
+        while True:
+            await self._reconcile_requested.wait()
+
+            # Let a burst of requests settle before rendering
+            await asyncio.sleep(settings.nginx_reload_debounce_seconds)
+            # Route pushes don't reload nginx, so only the file generator is rate limited
+            if self._last_reconcile_time is not None and not self.dynamic_routing_active:
+                wait = self._last_reconcile_time + settings.nginx_reload_min_interval_seconds - monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+
+            # Requests arriving from here on trigger another pass with newer state
+            self._reconcile_requested.clear()
+            reasons = ", ".join(sorted(self._pending_reasons)) or "unspecified"
+            self._pending_reasons.clear()
+            self._last_reconcile_time = monotonic()
+
+            try:
+                logger.info(f"Reconciling Nginx configuration ({reasons})")
+                await self.generate_config_async(self._get_enabled_servers())
+            except Exception as e:
+                logger.error(f"Nginx reconcile failed: {e}", exc_info=True)
+
+            if settings.nginx_routing_mode == "dynamic" and not self.dynamic_routing_active:
+                # Serving the file fallback (e.g. nginx not up yet): keep retrying the push
+                self._schedule_route_push_retry()
+            elif self._route_push_failures:
+                logger.info(f"Dynamic routing restored after {self._route_push_failures} failed route pushes")
+                self._route_push_failures = 0
+                if self._route_push_retry is not None:
+                    self._route_push_retry.cancel()
+                    self._route_push_retry = None
+
+    def _schedule_route_push_retry(self):
+        """Request another reconcile after a failed route push, doubling the delay up to the cap."""
+        delay = min(
+            settings.nginx_route_push_retry_seconds * 2 ** min(self._route_push_failures, 16),
+            settings.nginx_route_push_retry_max_seconds,
+        )
+        self._route_push_failures += 1
+        if self._route_push_retry is not None:
+            self._route_push_retry.cancel()
+        logger.warning(
+            f"Dynamic routing unavailable, retrying route push in {delay:.1f}s (failure {self._route_push_failures})"
+        )
+        self._route_push_retry = asyncio.get_running_loop().call_later(
+            delay, self.request_reconcile, "dynamic routing unavailable"
+        )
+
+    def build_route_table(self, servers: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Routes for dynamic mode, keyed by server path without its trailing slash.
+
+        Each entry mirrors what the per-server location block would do: "prefix" is
+        the location path that gets replaced by "uri" (None passes the request URI
+        through unchanged, like a proxy_pass without a URI part).
+        """
+        from ..health.service import health_service
+
+        routes = {}
+        for path, server_info in servers.items():
+            proxy_pass_url = server_info.get("proxy_pass_url")
+            if not proxy_pass_url:
+                continue
+            endpoints = self._routed_endpoints(server_info, health_service.endpoint_health.get(path))
+            if len(endpoints) > 1 or server_info.get("endpoints"):
+                # All instances share the MCP path of the first one
+                proxy_pass_url = endpoints[0][0].url
+            parsed_url = urlparse(proxy_pass_url)
+            health_status = health_service.server_health_status.get(path, HealthStatus.UNKNOWN)
+            transports = server_info.get("supported_transports", ["streamable-http"])
+            routes[path.rstrip("/") or path] = {
+                "prefix": path,
+                "base": f"{parsed_url.scheme}://{parsed_url.netloc}",
+                "endpoints": [
+                    {"base": f"{urlparse(e.url).scheme}://{urlparse(e.url).netloc}", "weight": weight}
+                    for e, weight in endpoints
+                ],
+                "uri": parsed_url.path or None,
+                "host": self._get_host_header(parsed_url),
+                "ssl_name": parsed_url.hostname,
+                "transport": self._select_transport_type(path, transports),
+                "healthy": HealthStatus.is_healthy(health_status),
+                "cache_version": get_response_cache_version(server_info),
+            }
+        return routes
+
+    async def push_routes(self, servers: Dict[str, Dict[str, Any]]) -> bool:
+        """Replace the route table in nginx's shared dict through the local admin endpoint."""
+        routes = self.build_route_table(servers)
+        version = hashlib.sha256(
+            json.dumps(routes, sort_keys=True).encode("utf-8")
+        ).hexdigest()[:16]
+        try:
+            async with httpx.AsyncClient(timeout=2.0) as client:
+                response = await client.put(
+                    settings.nginx_admin_url, json={"version": version, "routes": routes}
+                )
+            if response.status_code != 200:
+                logger.warning(f"Nginx route push rejected: HTTP {response.status_code} {response.text}")
+                return False
+        except httpx.HTTPError as e:
+            logger.warning(f"Nginx route admin endpoint unavailable ({e}), using file-based routing")
+            return False
+        logger.info(f"Pushed {len(routes)} routes to nginx (version {version})")
+        return True
+
+    def _create_dynamic_location_block(self) -> str:
+        """The single location that proxies every MCP server in dynamic routing mode.
+
+        dynamic_route.lua (hooked into `location /`) matches the path against the
+        shared dict, fills in the $mcp_* variables and jumps here.
+        """
+        return f"""
+    location @mcp_dynamic {{
+        # Capture request body for auth validation using Lua
+        rewrite_by_lua_file /etc/nginx/lua/capture_body.lua;
+{_AUTH_REQUEST_SETTINGS}
+        # Proxy to the MCP server resolved from the route table
+        resolver {settings.nginx_dns_resolver} valid=30s ipv6=off;
+        proxy_pass $mcp_target;
+        proxy_http_version 1.1;
+        proxy_ssl_server_name on;
+        proxy_ssl_name $mcp_ssl_name;
+        proxy_set_header Host $mcp_host;{_FORWARDED_HEADER_SETTINGS}
+
+        # Keep MCP sessions of multi-instance servers on their instance
+        header_filter_by_lua_file /etc/nginx/lua/session_learn.lua;{self._response_cache_settings()}
+
+        # Transport configuration ($mcp_connection is empty for streamable-http)
+        proxy_buffering off;
+        proxy_cache off;
+        proxy_set_header Connection $mcp_connection;
+        proxy_set_header Upgrade $http_upgrade;
+    }}"""
+
+    @staticmethod
+    def _response_cache_settings(cache_version: Optional[str] = None) -> str:
+        """Response cache directives for a location; cache_version pins the server's version."""
+        if not settings.nginx_response_cache_enabled:
+            return ""
+        version_setting = f"""
+        set $mcp_cache_version "{cache_version}";""" if cache_version else ""
+        return version_setting + _RESPONSE_CACHE_SETTINGS.format(ttl=settings.nginx_response_cache_ttl_seconds)
+
+    def _get_enabled_servers(self) -> Dict[str, Dict[str, Any]]:
+        from ..services.server_service import server_service
+        return {
+            path: server_service.get_server_info(path)
+            for path in server_service.get_enabled_services()
+        }
+
     def reload_nginx(self) -> bool:
-        """Reload Nginx configuration (if running in appropriate environment)."""
+        """Reload Nginx configuration (synchronous version for non-async contexts)."""
         try:
-            import subprocess
             result = subprocess.run(["nginx", "-s", "reload"], capture_output=True, text=True)
             if result.returncode == 0:
                 logger.info("Nginx configuration reloaded successfully")
@@ -174,6 +802,80 @@ class NginxConfigService:
             return False
 
 
+    def _get_keepalive_settings(self, path: str, server_info: Dict[str, Any]) -> Tuple[int, int, int]:
+        """(keepalive, keepalive_requests, keepalive_timeout seconds) from the server JSON or the defaults."""
+        try:
+            return (
+                int(server_info.get("keepalive") or settings.nginx_upstream_keepalive),
+                int(server_info.get("keepalive_requests") or settings.nginx_upstream_keepalive_requests),
+                _timeout_seconds(server_info.get("keepalive_timeout") or settings.nginx_upstream_keepalive_timeout_seconds),
+            )
+        except ValueError as e:
+            logger.warning(f"Server {path}: ignoring invalid keepalive settings ({e}), using defaults")
+            return (
+                settings.nginx_upstream_keepalive,
+                settings.nginx_upstream_keepalive_requests,
+                settings.nginx_upstream_keepalive_timeout_seconds,
+            )
+
+    def _generate_upstream_blocks(
+        self,
+        servers: Dict[str, Dict[str, Any]],
+        endpoint_health: Optional[Dict[str, Optional[Dict[str, str]]]] = None,
+    ) -> List[str]:
+        """Generate keepalive upstreams: one per backend host, plus one per multi-instance server.
+
+        Keepalive settings come from the server JSON (keepalive, keepalive_requests,
+        keepalive_timeout) and fall back to the registry defaults. When several
+        servers share a backend, the largest value of each setting wins.
+
+        Servers with several endpoints get a dedicated weighted upstream, balanced
+        with least_conn or a consistent hash on the MCP session, from which
+        endpoints failing their health probe are left out and in which degraded
+        endpoints are weighted down.
+        """
+        endpoint_health = endpoint_health or {}
+        upstreams: Dict[str, Dict[str, Any]] = {}
+        for path in sorted(servers):
+            server_info = servers[path]
+            keepalive, keepalive_requests, keepalive_timeout = self._get_keepalive_settings(path, server_info)
+
+            if len(get_server_endpoints(server_info)) > 1:
+                endpoints = self._routed_endpoints(server_info, endpoint_health.get(path))
+                balancing = "hash $mcp_session_key consistent" if server_info.get("load_balancing") == "hash" else "least_conn"
+                upstreams[get_server_upstream_name(path)] = {
+                    "balancing": balancing,
+                    "servers": [f"{_host_port(urlparse(e.url))} weight={weight}" for e, weight in endpoints],
+                    "keepalive": keepalive,
+                    "keepalive_requests": keepalive_requests,
+                    "keepalive_timeout": keepalive_timeout,
+                }
+                continue
+
+            proxy_pass_url = server_info["proxy_pass_url"]
+            upstream = upstreams.setdefault(get_upstream_name(proxy_pass_url), {
+                "balancing": None,
+                "servers": [_host_port(urlparse(proxy_pass_url))],
+                "keepalive": 0,
+                "keepalive_requests": 0,
+                "keepalive_timeout": 0,
+            })
+            upstream["keepalive"] = max(upstream["keepalive"], keepalive)
+            upstream["keepalive_requests"] = max(upstream["keepalive_requests"], keepalive_requests)
+            upstream["keepalive_timeout"] = max(upstream["keepalive_timeout"], keepalive_timeout)
+
+        blocks = []
+        for name, upstream in upstreams.items():
+            balancing = f"\n    {upstream['balancing']};" if upstream["balancing"] else ""
+            server_lines = "".join(f"\n    server {server};" for server in upstream["servers"])
+            blocks.append(f"""
+upstream {name} {{{balancing}{server_lines}
+    keepalive {upstream['keepalive']};
+    keepalive_requests {upstream['keepalive_requests']};
+    keepalive_timeout {upstream['keepalive_timeout']}s;
+}}""")
+        return blocks
+
     def _generate_transport_location_blocks(self, path: str, server_info: Dict[str, Any]) -> list:
         """Generate nginx location blocks for different transport types."""
         blocks = []
@@ -183,7 +885,34 @@ class NginxConfigService:
         # Use the proxy_pass_url exactly as specified in the JSON file
         # Users are responsible for including /mcp, /sse, or any other path in the URL
         proxy_url = proxy_pass_url
+        transport_type = self._select_transport_type(path, supported_transports)
+        
+        # Create a single location block for this server
+        # The proxy_pass URL is used exactly as provided in the server configuration
+        logger.info(f"Server {path}: Using proxy_pass URL as configured: {proxy_url}")
         
+        if len(get_server_endpoints(server_info)) > 1:
+            # Multi-instance server: proxy through its own balanced upstream. Without a
+            # shared session store, streamable-http sessions stay on the instance that
+            # created them (hash balancing already keys on the session).
+            endpoints = get_server_endpoints(server_info)
+            session_affinity = transport_type == "streamable-http" and server_info.get("load_balancing") != "hash"
+            block = self._create_location_block(
+                path, endpoints[0].url, transport_type,
+                upstream=get_server_upstream_name(path), session_affinity=session_affinity,
+                cache_version=get_response_cache_version(server_info),
+            )
+        else:
+            block = self._create_location_block(
+                path, proxy_url, transport_type, cache_version=get_response_cache_version(server_info)
+            )
+        blocks.append(block)
+        
+        return blocks
+
+    @staticmethod
+    def _select_transport_type(path: str, supported_transports: List[str]) -> str:
+        """Pick the transport a server is proxied with."""
         # Determine transport type based on supported_transports
         if not supported_transports:
             # Default to streamable-http if no transports specified
@@ -205,84 +934,75 @@ class NginxConfigService:
             # Default to streamable-http if unknown transport
             transport_type = "streamable-http"
             logger.info(f"Server {path}: Unknown transport types {supported_transports}, defaulting to streamable-http")
-        
-        # Create a single location block for this server
-        # The proxy_pass URL is used exactly as provided in the server configuration
-        logger.info(f"Server {path}: Using proxy_pass URL as configured: {proxy_url}")
-        
-        block = self._create_location_block(path, proxy_url, transport_type)
-        blocks.append(block)
-        
-        return blocks
+        return transport_type
 
 
-    def _create_location_block(self, path: str, proxy_pass_url: str, transport_type: str) -> str:
-        """Create a single nginx location block with transport-specific configuration."""
-        
-        # Extract hostname from proxy_pass_url for external services
-        parsed_url = urlparse(proxy_pass_url)
+    @staticmethod
+    def _get_host_header(parsed_url) -> Optional[str]:
+        """Host header to send upstream, or None to preserve the client's host."""
         upstream_host = parsed_url.netloc
-        
+
         # Determine whether to use upstream hostname or preserve original host
         # For external services (https), use the upstream hostname
         # For internal services (http without dots in hostname), preserve original host
         if parsed_url.scheme == 'https' or '.' in upstream_host:
             # External service - use upstream hostname
-            host_header = upstream_host
-            logger.info(f"Using upstream hostname for Host header: {host_header}")
-        else:
-            # Internal service - preserve original host
-            host_header = '$host'
-            logger.info(f"Using original host for Host header: $host")
-        
-        # Common proxy settings
-        common_settings = f"""
-        # Authenticate request - pass entire request to auth server
-        auth_request /validate;
-        
-        # Capture auth server response headers for forwarding
-        auth_request_set $auth_user $upstream_http_x_user;
-        auth_request_set $auth_username $upstream_http_x_username;
-        auth_request_set $auth_client_id $upstream_http_x_client_id;
-        auth_request_set $auth_scopes $upstream_http_x_scopes;
-        auth_request_set $auth_method $upstream_http_x_auth_method;
-        auth_request_set $auth_server_name $upstream_http_x_server_name;
-        auth_request_set $auth_tool_name $upstream_http_x_tool_name;
-        
-        # Proxy to MCP server
-        proxy_pass {proxy_pass_url};
-        proxy_http_version 1.1;
-        proxy_set_header Host {host_header};
-        proxy_set_header X-Real-IP $remote_addr;
-        proxy_set_header X-Forwarded-For $proxy_add_x_forwarded_for;
-        proxy_set_header X-Forwarded-Proto $scheme;
-        
-        # Add original URL for auth server scope validation
-        proxy_set_header X-Original-URL $scheme://$host$request_uri;
-        
-        # Pass through the original authentication headers
-        proxy_set_header Authorization $http_authorization;
-        proxy_set_header X-Authorization $http_x_authorization;
-        proxy_set_header X-User-Pool-Id $http_x_user_pool_id;
-        proxy_set_header X-Client-Id $http_x_client_id;
-        proxy_set_header X-Region $http_x_region;
+            logger.info(f"Using upstream hostname for Host header: {upstream_host}")
+            return upstream_host
+        # Internal service - preserve original host
+        logger.info(f"Using original host for Host header: $host")
+        return None
 
+    def _create_location_block(
+        self,
+        path: str,
+        proxy_pass_url: str,
+        transport_type: str,
+        upstream: Optional[str] = None,
+        session_affinity: bool = False,
+        cache_version: Optional[str] = None,
+    ) -> str:
+        """Create a single nginx location block with transport-specific configuration.
+
+        upstream overrides the per-host upstream (multi-instance servers). With
+        session_affinity, requests carrying a known Mcp-Session-Id are sent to the
+        instance that issued it, learned from responses into a shared dict.
+        cache_version enables the listing response cache (streamable-http only).
+        """
         
-        # Forward auth server response headers to backend
-        proxy_set_header X-User $auth_user;
-        proxy_set_header X-Username $auth_username;
-        proxy_set_header X-Client-Id-Auth $auth_client_id;
-        proxy_set_header X-Scopes $auth_scopes;
-        proxy_set_header X-Auth-Method $auth_method;
-        proxy_set_header X-Server-Name $auth_server_name;
-        proxy_set_header X-Tool-Name $auth_tool_name;
-        
-        # Pass all original client headers
-        proxy_pass_request_headers on;
+        # Extract hostname from proxy_pass_url for external services
+        parsed_url = urlparse(proxy_pass_url)
+        host_header = self._get_host_header(parsed_url) or '$host'
+
+        # Proxy through the backend's keepalive upstream, keeping the configured URI as-is
+        upstream_name = upstream or get_upstream_name(proxy_pass_url)
+        upstream_pass_url = f"{parsed_url.scheme}://{upstream_name}{parsed_url.path}"
+        if parsed_url.query:
+            upstream_pass_url += f"?{parsed_url.query}"
+        if session_affinity:
+            # proxy_pass with a variable passes the URI unchanged, so map the prefix explicitly
+            uri_rewrite = f"""
+        rewrite "^{re.escape(path)}(.*)$" {parsed_url.path}$1 break;""" if parsed_url.path else ""
+            proxy_target = f"""
+        set_by_lua_file $mcp_peer /etc/nginx/lua/session_peer.lua {upstream_name};{uri_rewrite}
+        header_filter_by_lua_file /etc/nginx/lua/session_learn.lua;
+        proxy_pass {parsed_url.scheme}://$mcp_peer;"""
+        else:
+            proxy_target = f"""
+        proxy_pass {upstream_pass_url};"""
+        if parsed_url.scheme == 'https':
+            # SNI must carry the real hostname, not the upstream name
+            ssl_settings = f"""
+        proxy_ssl_server_name on;
+        proxy_ssl_name {parsed_url.hostname};"""
+        else:
+            ssl_settings = ""
         
-        # Handle auth errors
-        error_page 401 = @auth_error;
-        error_page 403 = @forbidden_error;"""
+        # Common proxy settings
+        common_settings = f"""{_AUTH_REQUEST_SETTINGS}
+        # Proxy to MCP server ({proxy_pass_url}){proxy_target}
+        proxy_http_version 1.1;{ssl_settings}
+        proxy_set_header Host {host_header};{_FORWARDED_HEADER_SETTINGS}"""
         
         # Transport-specific settings
         if transport_type == "sse":
@@ -305,6 +1025,8 @@ class NginxConfigService:
         # HTTP transport configuration
         proxy_buffering off;
         proxy_set_header Connection "";"""
+            if cache_version:
+                transport_settings += self._response_cache_settings(cache_version)
         
         else:  # direct
             transport_settings = """
@@ -3,6 +3,12 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime
 
 
+class ServerEndpoint(BaseModel):
+    """One backend instance of a (possibly multi-instance) MCP server."""
+    url: str = Field(..., description="Backend URL of this instance, including the MCP path")
+    weight: int = Field(default=1, ge=1, description="Relative share of new sessions sent to this instance")
+
+
 class ServerInfo(BaseModel):
     """Server information model."""
     server_name: str
@@ -20,6 +26,22 @@ class ServerInfo(BaseModel):
     supported_transports: List[str] = Field(default_factory=lambda: ["streamable-http"], description="List of supported transports")
     mcp_endpoint: Optional[str] = Field(default=None, description="Custom /mcp endpoint path")
     sse_endpoint: Optional[str] = Field(default=None, description="Custom /sse endpoint path")
+    keepalive: Optional[int] = Field(default=None, description="Idle upstream connections nginx keeps per worker")
+    keepalive_requests: Optional[int] = Field(default=None, description="Requests served per upstream connection before it is closed")
+    keepalive_timeout: Optional[str] = Field(default=None, description="Idle timeout for upstream connections, e.g. '60s'")
+    endpoints: List[ServerEndpoint] = Field(default_factory=list, description="Backend instances; proxy_pass_url is the only instance when empty")
+    load_balancing: str = Field(default="least_conn", description="Balancing across endpoints: least_conn (sessions pinned to their instance) or hash (on Mcp-Session-Id)")
+
+
+def get_server_endpoints(server_info: Dict[str, Any]) -> List[ServerEndpoint]:
+    """Backend instances of a server; a server without endpoints has just its proxy_pass_url."""
+    endpoints = [
+        ServerEndpoint(**endpoint) if isinstance(endpoint, dict) else endpoint
+        for endpoint in server_info.get("endpoints") or []
+    ]
+    if not endpoints and server_info.get("proxy_pass_url"):
+        endpoints = [ServerEndpoint(url=server_info["proxy_pass_url"])]
+    return endpoints
 
 
 class ToolDescription(BaseModel):
@@ -0,0 +1,197 @@
+import logging
+import math
+from array import array
+from datetime import datetime, timezone
+from time import time
+from typing import Dict, List, Optional
+
+from ..core.config import settings
+from registry.constants import HealthStatus
+
+logger = logging.getLogger(__name__)
+
+
+# Compact per-sample status codes stored in the ring buffer
+STATUS_CODE_DOWN = 0
+STATUS_CODE_UP_WITH_ISSUES = 1  # Reachable, but e.g. auth expired
+STATUS_CODE_UP = 2
+
+
+def status_to_code(status: str) -> int:
+    """Map a health status string to a compact status code."""
+    if status == HealthStatus.HEALTHY:
+        return STATUS_CODE_UP
+    if HealthStatus.is_healthy(status):
+        return STATUS_CODE_UP_WITH_ISSUES
+    return STATUS_CODE_DOWN
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = math.ceil(percentile / 100.0 * len(sorted_values))
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 2) if value is not None else None
+
+
+class ServiceHealthHistory:
+    """Array-backed ring buffer of probe samples plus downsampled rollups for one service."""
+
+    def __init__(self, capacity: int, rollup_interval_seconds: int, rollup_capacity: int):
+        self.capacity = capacity
+        self.timestamps = array('d', bytes(8 * capacity))
+        self.latencies_ms = array('f', bytes(4 * capacity))
+        self.status_codes = array('b', bytes(capacity))
+        self._next_index = 0
+        self._size = 0
+
+        # Rollups: one bucket per rollup interval, also kept in ring buffers
+        self.rollup_interval_seconds = rollup_interval_seconds
+        self.rollup_capacity = rollup_capacity
+        self.rollup_starts = array('d', bytes(8 * rollup_capacity))
+        self.rollup_counts = array('I', bytes(4 * rollup_capacity))
+        self.rollup_up_counts = array('I', bytes(4 * rollup_capacity))
+        self.rollup_latency_sums = array('d', bytes(8 * rollup_capacity))
+        self.rollup_latency_max = array('f', bytes(4 * rollup_capacity))
+        self._rollup_index = -1
+        self._rollup_size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def record(self, timestamp: float, latency_ms: float, status_code: int):
+        """Record one probe sample, overwriting the oldest when full."""
+        i = self._next_index
+        self.timestamps[i] = timestamp
+        self.latencies_ms[i] = latency_ms
+        self.status_codes[i] = status_code
+        self._next_index = (i + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+        self._record_rollup(timestamp, latency_ms, status_code)
+
+    def _record_rollup(self, timestamp: float, latency_ms: float, status_code: int):
+        """Fold a sample into the current rollup bucket, opening a new one if needed."""
+        bucket_start = timestamp - (timestamp % self.rollup_interval_seconds)
+        r = self._rollup_index
+        if r < 0 or self.rollup_starts[r] != bucket_start:
+            r = (r + 1) % self.rollup_capacity
+            self._rollup_index = r
+            self._rollup_size = min(self._rollup_size + 1, self.rollup_capacity)
+            self.rollup_starts[r] = bucket_start
+            self.rollup_counts[r] = 0
+            self.rollup_up_counts[r] = 0
+            self.rollup_latency_sums[r] = 0.0
+            self.rollup_latency_max[r] = 0.0
+
+        self.rollup_counts[r] += 1
+        if status_code != STATUS_CODE_DOWN:
+            self.rollup_up_counts[r] += 1
+        self.rollup_latency_sums[r] += latency_ms
+        if latency_ms > self.rollup_latency_max[r]:
+            self.rollup_latency_max[r] = latency_ms
+
+    def _iter_sample_indexes(self):
+        """Yield sample indexes from oldest to newest."""
+        start = (self._next_index - self._size) % self.capacity
+        for offset in range(self._size):
+            yield (start + offset) % self.capacity
+
+    def summarize(self, since: float) -> Dict:
+        """Summarize raw samples recorded at or after the given timestamp."""
+        latencies = []
+        up_count = 0
+        for i in self._iter_sample_indexes():
+            if self.timestamps[i] < since:
+                continue
+            latencies.append(self.latencies_ms[i])
+            if self.status_codes[i] != STATUS_CODE_DOWN:
+                up_count += 1
+
+        sample_count = len(latencies)
+        latencies.sort()
+        return {
+            "samples": sample_count,
+            "uptime_percent": round(100.0 * up_count / sample_count, 3) if sample_count else None,
+            "latency_ms": {
+                "p50": _round(_percentile(latencies, 50)),
+                "p95": _round(_percentile(latencies, 95)),
+                "p99": _round(_percentile(latencies, 99)),
+                "avg": _round(sum(latencies) / sample_count) if sample_count else None,
+                "max": _round(latencies[-1]) if latencies else None,
+            },
+        }
+
+    def get_rollups(self, since: float) -> List[Dict]:
+        """Return rollup buckets starting at or after the given timestamp, oldest first."""
+        rollups = []
+        start = (self._rollup_index - self._rollup_size + 1) % self.rollup_capacity
+        for offset in range(self._rollup_size):
+            r = (start + offset) % self.rollup_capacity
+            if self.rollup_starts[r] + self.rollup_interval_seconds <= since:
+                continue
+            count = self.rollup_counts[r]
+            rollups.append({
+                "start_iso": datetime.fromtimestamp(self.rollup_starts[r], tz=timezone.utc).isoformat(),
+                "samples": count,
+                "uptime_percent": round(100.0 * self.rollup_up_counts[r] / count, 3) if count else None,
+                "avg_latency_ms": _round(self.rollup_latency_sums[r] / count) if count else None,
+                "max_latency_ms": _round(self.rollup_latency_max[r]),
+            })
+        return rollups
+
+
+class HealthHistoryStore:
+    """Per-service health history with configurable retention and rollups."""
+
+    def __init__(
+        self,
+        max_samples: Optional[int] = None,
+        retention_seconds: Optional[int] = None,
+        rollup_interval_seconds: Optional[int] = None,
+        rollup_retention_seconds: Optional[int] = None,
+    ):
+        self.max_samples = max_samples or settings.health_history_max_samples
+        self.retention_seconds = retention_seconds or settings.health_history_retention_seconds
+        self.rollup_interval_seconds = rollup_interval_seconds or settings.health_history_rollup_interval_seconds
+        rollup_retention = rollup_retention_seconds or settings.health_history_rollup_retention_seconds
+        self.rollup_capacity = max(1, rollup_retention // self.rollup_interval_seconds)
+        self._histories: Dict[str, ServiceHealthHistory] = {}
+
+    def record(self, service_path: str, latency_ms: float, status: str, timestamp: Optional[float] = None):
+        """Record a probe result for a service."""
+        history = self._histories.get(service_path)
+        if history is None:
+            history = ServiceHealthHistory(self.max_samples, self.rollup_interval_seconds, self.rollup_capacity)
+            self._histories[service_path] = history
+        history.record(timestamp if timestamp is not None else time(), latency_ms, status_to_code(status))
+
+    def has_history(self, service_path: str) -> bool:
+        return service_path in self._histories
+
+    def remove(self, service_path: str):
+        self._histories.pop(service_path, None)
+
+    def get_history(self, service_path: str, window_seconds: Optional[int] = None, include_rollups: bool = True) -> Optional[Dict]:
+        """Get latency percentiles, uptime and rollups for a service over a time window."""
+        history = self._histories.get(service_path)
+        if history is None:
+            return None
+
+        now = time()
+        window = window_seconds or self.retention_seconds
+        # Raw samples only cover the retention period; rollups can reach further back
+        raw_window = min(window, self.retention_seconds)
+        result = {
+            "service_path": service_path,
+            "window_seconds": raw_window,
+            **history.summarize(now - raw_window),
+        }
+        if include_rollups:
+            result["rollup_interval_seconds"] = self.rollup_interval_seconds
+            result["rollups"] = history.get_rollups(now - window)
+        return result
@@ -0,0 +1,185 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Dict, Iterator, Optional
+
+import httpx
+
+from ..core.config import settings
+from registry.constants import HealthStatus
+
+logger = logging.getLogger(__name__)
+
+
+# Timings of the probe running in the current task (each health check runs in its own task)
+_current_probe: ContextVar[Optional["ProbeTimings"]] = ContextVar("current_probe", default=None)
+
+_CONNECT_STARTED_EVENTS = {
+    "connection.connect_tcp.started",
+    "connection.connect_unix_socket.started",
+    "connection.start_tls.started",
+}
+_CONNECT_COMPLETE_EVENTS = {
+    "connection.connect_tcp.complete",
+    "connection.connect_unix_socket.complete",
+    "connection.start_tls.complete",
+}
+
+
+def _ms(start: Optional[float], end: Optional[float]) -> Optional[float]:
+    if start is None or end is None:
+        return None
+    return (end - start) * 1000.0
+
+
+class ProbeTimings:
+    """Connect, time-to-first-byte and total latency of a single health probe.
+
+    Filled in from httpcore trace events. A probe may issue several requests
+    (e.g. auth retry, SSE fallback); connect time accumulates across them and
+    TTFB is taken from the first response headers received. Connect time is
+    None when the probe reused a pooled connection.
+    """
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.finished: Optional[float] = None
+        self.connect_seconds = 0.0
+        self.connected = False
+        self.first_byte: Optional[float] = None
+        self._connect_started: Optional[float] = None
+
+    async def trace(self, event_name: str, info: Dict):
+        """httpcore trace callback."""
+        if event_name in _CONNECT_STARTED_EVENTS:
+            self._connect_started = perf_counter()
+        elif event_name in _CONNECT_COMPLETE_EVENTS:
+            # TCP connect and TLS handshake both count towards connect time
+            if self._connect_started is not None:
+                self.connect_seconds += perf_counter() - self._connect_started
+                self._connect_started = None
+                self.connected = True
+        elif event_name.endswith(".receive_response_headers.complete") and self.first_byte is None:
+            self.first_byte = perf_counter()
+
+    def finish(self):
+        if self.finished is None:
+            self.finished = perf_counter()
+
+    @property
+    def connect_ms(self) -> Optional[float]:
+        return self.connect_seconds * 1000.0 if self.connected else None
+
+    @property
+    def ttfb_ms(self) -> Optional[float]:
+        return _ms(self.started, self.first_byte)
+
+    @property
+    def total_ms(self) -> float:
+        return _ms(self.started, self.finished or perf_counter())
+
+    def to_dict(self) -> Dict:
+        return {
+            "connect": _round(self.connect_ms),
+            "ttfb": _round(self.ttfb_ms),
+            "total": _round(self.total_ms),
+        }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 2) if value is not None else None
+
+
+@contextmanager
+def probe() -> Iterator[ProbeTimings]:
+    """Time a probe in the current task, tracing its requests until the block exits."""
+    timings = ProbeTimings()
+    token = _current_probe.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_probe.reset(token)
+
+
+async def attach_probe_trace(request: httpx.Request):
+    """httpx request event hook that wires the current probe's trace callback."""
+    timings = _current_probe.get()
+    if timings is not None:
+        request.extensions["trace"] = timings.trace
+
+
+class LatencyTracker:
+    """Per-service EWMA of probe latencies and SLO-based degraded classification."""
+
+    def __init__(
+        self,
+        alpha: Optional[float] = None,
+        total_threshold_ms: Optional[float] = None,
+        ttfb_threshold_ms: Optional[float] = None,
+        recovery_ratio: Optional[float] = None,
+    ):
+        self.alpha = alpha or settings.health_latency_ewma_alpha
+        self.total_threshold_ms = total_threshold_ms or settings.health_degraded_total_latency_ms
+        self.ttfb_threshold_ms = ttfb_threshold_ms or settings.health_degraded_ttfb_ms
+        self.recovery_ratio = recovery_ratio or settings.health_degraded_recovery_ratio
+        self._ewma: Dict[str, Dict[str, float]] = {}
+        self._last: Dict[str, Dict] = {}
+
+    def _update(self, ewma: Dict[str, float], key: str, value: Optional[float]):
+        if value is None:
+            return
+        previous = ewma.get(key)
+        ewma[key] = value if previous is None else self.alpha * value + (1 - self.alpha) * previous
+
+    def observe(self, service_path: str, timings: ProbeTimings):
+        """Fold a successful probe's timings into the service EWMA."""
+        ewma = self._ewma.setdefault(service_path, {})
+        self._update(ewma, "connect", timings.connect_ms)
+        self._update(ewma, "ttfb", timings.ttfb_ms)
+        self._update(ewma, "total", timings.total_ms)
+        self._last[service_path] = timings.to_dict()
+
+    def classify(self, service_path: str, status: str, previous_status: Optional[str] = None) -> str:
+        """Downgrade a healthy status to degraded when EWMA latency breaks the SLO.
+
+        Services already degraded only recover once latency drops below
+        threshold * recovery_ratio, so a service hovering at the threshold
+        does not flap (and trigger nginx reloads) on every check.
+        """
+        if status != HealthStatus.HEALTHY:
+            return status
+
+        ewma = self._ewma.get(service_path)
+        if not ewma:
+            return status
+
+        ratio = self.recovery_ratio if previous_status == HealthStatus.DEGRADED else 1.0
+        total = ewma.get("total")
+        ttfb = ewma.get("ttfb")
+        if total is not None and total > self.total_threshold_ms * ratio:
+            return HealthStatus.DEGRADED
+        if ttfb is not None and ttfb > self.ttfb_threshold_ms * ratio:
+            return HealthStatus.DEGRADED
+        return status
+
+    def get_latency(self, service_path: str) -> Optional[Dict]:
+        """Latest probe timings and EWMA for a service, in milliseconds."""
+        if service_path not in self._ewma:
+            return None
+        return {
+            "last": self._last.get(service_path),
+            "ewma": {key: _round(value) for key, value in self._ewma[service_path].items()},
+        }
+
+    def load_latency(self, service_path: str, latency: Dict):
+        """Replace a service's latency state with one reported by the health worker."""
+        self._ewma[service_path] = {key: value for key, value in latency["ewma"].items() if value is not None}
+        self._last[service_path] = latency.get("last")
+
+    def get_ewma_total(self, service_path: str) -> Optional[float]:
+        return self._ewma.get(service_path, {}).get("total")
+
+    def remove(self, service_path: str):
+        self._ewma.pop(service_path, None)
+        self._last.pop(service_path, None)
@@ -1,6 +1,10 @@
 import asyncio
+import hashlib
+import json
 import logging
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from itsdangerous import URLSafeTimedSerializer, SignatureExpired, BadSignature
 
 from .service import health_service
@@ -100,15 +104,161 @@ async def websocket_endpoint(websocket: WebSocket):
 
 
 @router.get("/ws/health_status")
-async def health_status_http():
+async def health_status_http(request: Request, response: Response):
     """HTTP endpoint that returns the same health status data as the WebSocket endpoint.
     
     This handles cases where health checks are done via HTTP GET instead of WebSocket.
+    Responses carry an ETag so pollers (and nginx) can revalidate with If-None-Match
+    and get a bodyless 304 while nothing has changed.
     """
-    return health_service.get_all_health_status()
+    status_data = health_service.get_all_health_status()
+    etag = _compute_etag(status_data)
+
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return status_data
+
+
+@router.get("/events/health_status")
+async def health_status_events(request: Request):
+    """Server-Sent Events stream of health status changes.
+
+    Read-only alternative to the WebSocket endpoint backed by the same change feed.
+    The first event is a full snapshot unless the client resumes with a Last-Event-ID
+    that is still in the feed, in which case only the missed changes are replayed.
+    """
+    username = _get_session_username(request.cookies.get(settings.session_cookie_name))
+    if not username:
+        return Response(status_code=401, content="Authentication required")
+
+    last_event_id = _parse_last_event_id(
+        request.headers.get("last-event-id") or request.query_params.get("last_event_id")
+    )
+    logger.info(f"SSE health stream opened by {username} (last_event_id={last_event_id})")
+
+    return StreamingResponse(
+        _health_event_stream(request, last_event_id),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Tell nginx not to buffer the stream so events are flushed immediately
+            "X-Accel-Buffering": "no",
+        },
+    )
 
 
 @router.get("/ws/stats")
 async def websocket_stats():
     """Get WebSocket performance statistics for monitoring."""
-    return health_service.get_websocket_stats() 
\ No newline at end of file
+    return health_service.get_websocket_stats()
+
+
+@router.get("/nginx/events")
+async def nginx_command_events():
+    """Get recent nginx validation and reload results."""
+    from ..core.nginx_service import nginx_service
+    return {"events": nginx_service.get_command_events()}
+
+
+@router.get("/{service_path:path}/history")
+async def health_history(
+    service_path: str,
+    window_seconds: Optional[int] = Query(None, gt=0, description="Time window to summarize, defaults to full retention"),
+):
+    """Get probe latency percentiles (p50/p95/p99), uptime percentage and rollups for a service."""
+    if not service_path.startswith('/'):
+        service_path = '/' + service_path
+
+    history = health_service.get_health_history(service_path, window_seconds)
+    if history is None:
+        # Registered paths may be stored with or without a trailing slash
+        alternate_path = service_path.rstrip('/') if service_path.endswith('/') else service_path + '/'
+        history = health_service.get_health_history(alternate_path, window_seconds)
+    if history is None:
+        raise HTTPException(status_code=404, detail=f"No health history for service '{service_path}'")
+    return history
+
+
+def _compute_etag(data: dict) -> str:
+    """Compute a weak ETag from the JSON representation of the data."""
+    payload = json.dumps(data, sort_keys=True, default=str).encode()
+    return f'W/"{hashlib.sha1(payload).hexdigest()}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header value against the current ETag."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison: W/"x" and "x" are equivalent for If-None-Match
+    bare_etag = etag.removeprefix("W/")
+    return "*" in candidates or any(tag.removeprefix("W/") == bare_etag for tag in candidates)
+
+
+def _get_session_username(session_cookie: Optional[str]) -> Optional[str]:
+    """Return the username from a valid session cookie, or None."""
+    if not session_cookie:
+        return None
+    try:
+        session_data = signer.loads(session_cookie, max_age=settings.session_max_age_seconds)
+        return session_data.get('username')
+    except (SignatureExpired, BadSignature) as e:
+        logger.warning(f"SSE authentication failed: {e}")
+        return None
+
+
+def _parse_last_event_id(value: Optional[str]) -> Optional[int]:
+    """Parse a Last-Event-ID value, ignoring anything that isn't a feed id."""
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+def _format_sse_event(event_id: int, data: dict) -> str:
+    """Format a single SSE frame."""
+    return f"id: {event_id}\nevent: health_status\ndata: {json.dumps(data)}\n\n"
+
+
+async def _health_event_stream(request: Request, last_event_id: Optional[int]):
+    """Yield SSE frames from the health change feed until the client disconnects."""
+    feed = health_service.change_feed
+    yield f"retry: {settings.sse_retry_ms}\n\n"
+
+    missed = feed.events_since(last_event_id) if last_event_id is not None else None
+    if missed is None:
+        # New client or resume point already evicted - start from a full snapshot
+        cursor = feed.last_event_id
+        yield _format_sse_event(cursor, health_service.get_all_health_status())
+    else:
+        cursor = last_event_id
+        for event_id, data in missed:
+            yield _format_sse_event(event_id, data)
+            cursor = event_id
+
+    while True:
+        if await request.is_disconnected():
+            break
+
+        # Only wait when caught up: events published while suspended in a yield
+        # have already swapped out the event this loop would otherwise wait on
+        if feed.last_event_id == cursor and not await feed.wait_for_event(
+            settings.sse_keepalive_interval_seconds
+        ):
+            # Comment frame keeps idle connections alive through proxies
+            yield ": keepalive\n\n"
+            continue
+
+        events = feed.events_since(cursor)
+        if events is None:
+            # Client fell behind the feed window - resynchronise with a snapshot
+            cursor = feed.last_event_id
+            yield _format_sse_event(cursor, health_service.get_all_health_status())
+            continue
+
+        for event_id, data in events:
+            yield _format_sse_event(event_id, data)
+            cursor = event_id
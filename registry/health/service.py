@@ -1,15 +1,19 @@
 import json
 import asyncio
+import hashlib
 import logging
 import httpx
 from datetime import datetime, timezone
-from typing import Dict, Set, Optional, Tuple
+from typing import Awaitable, Callable, Dict, List, Set, Optional, Tuple
 from fastapi import WebSocket, WebSocketDisconnect
 from collections import defaultdict, deque
 from time import time
 
 from ..core.config import settings
+from ..core.schemas import get_server_endpoints
 from registry.constants import HealthStatus
+from .history import HealthHistoryStore
+from .latency import LatencyTracker, ProbeTimings, attach_probe_trace, probe
 
 logger = logging.getLogger(__name__)
 
@@ -179,18 +183,85 @@ class HighPerformanceWebSocketManager:
         }
 
 
+class HealthChangeFeed:
+    """Bounded, ordered feed of health status changes shared by push transports.
+
+    Every published change gets a monotonically increasing event id so that
+    Server-Sent Events clients can resume with Last-Event-ID after a reconnect.
+    """
+
+    def __init__(self, max_events: int = 500):
+        self.events: deque = deque(maxlen=max_events)  # (event_id, data) tuples
+        self.last_event_id = 0
+        self._new_event = asyncio.Event()
+
+    def publish(self, data: Dict) -> int:
+        """Append a change to the feed and wake up all waiting subscribers."""
+        self.last_event_id += 1
+        self.events.append((self.last_event_id, data))
+
+        # Swap the event so that waiters woken now don't spin on a set flag
+        new_event, self._new_event = self._new_event, asyncio.Event()
+        new_event.set()
+        return self.last_event_id
+
+    def events_since(self, event_id: int) -> Optional[list]:
+        """Return events published after event_id, or None if they were already evicted."""
+        if event_id == self.last_event_id:
+            return []
+        # Ids from the future belong to a previous process; evicted ids can't be replayed
+        if event_id > self.last_event_id or not self.events or event_id < self.events[0][0] - 1:
+            return None
+        return [(eid, data) for eid, data in self.events if eid > event_id]
+
+    async def wait_for_event(self, timeout: float) -> bool:
+        """Wait until a new event is published. Returns False on timeout."""
+        try:
+            await asyncio.wait_for(self._new_event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+def compute_tool_list_hash(tool_list: Optional[List[Dict]]) -> str:
+    """Content hash of a tool list, stable across key order, used to detect schema changes."""
+    canonical = json.dumps(tool_list or [], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
 class HealthMonitoringService:
     """Optimized health monitoring service for high-scale WebSocket operations."""
-    
+
     def __init__(self):
         self.server_health_status: Dict[str, str] = {}
         self.server_last_check_time: Dict[str, datetime] = {}
-        
+
+        # Last probe status per endpoint of multi-instance servers: path -> {url: status}
+        self.endpoint_health: Dict[str, Dict[str, str]] = {}
+
         # High-performance WebSocket manager
         self.websocket_manager = HighPerformanceWebSocketManager()
-        
+
+        # Change feed for Server-Sent Events subscribers
+        self.change_feed = HealthChangeFeed(settings.health_change_feed_size)
+
+        # Per-service probe history for latency percentiles and uptime
+        self.history = HealthHistoryStore()
+
+        # Per-service latency EWMA used to classify slow-but-up services as degraded
+        self.latency_tracker = LatencyTracker()
+        # Same for the endpoints of multi-instance servers: path -> tracker keyed by endpoint URL
+        self.endpoint_latency: Dict[str, LatencyTracker] = {}
+
         # Background task management
         self.health_check_task: Optional[asyncio.Task] = None
+
+        # Optional out-of-process worker that runs the probes (see start_worker)
+        self.worker = None
+
+        # Single-flight tool list refresh: at most one fetch in flight per service
+        self._tool_refresh_tasks: Dict[str, asyncio.Task] = {}
+        self._tool_refresh_last_started: Dict[str, float] = {}
         
         # Performance optimizations
         self._cached_health_data: Dict = {}
@@ -206,6 +277,14 @@ class HealthMonitoringService:
         
         logger.info("Health monitoring service initialized!")
         
+    async def start_worker(self):
+        """Start the out-of-process health worker; periodic checks are then probed there."""
+        from .worker import HealthCheckWorker
+
+        worker = HealthCheckWorker()
+        await worker.start()
+        self.worker = worker
+
     async def shutdown(self):
         """Shutdown the health monitoring service."""
         # Cancel background tasks
@@ -215,6 +294,10 @@ class HealthMonitoringService:
                 await self.health_check_task
             except asyncio.CancelledError:
                 pass
+
+        if self.worker is not None:
+            await self.worker.stop()
+            self.worker = None
         
         # Close all WebSocket connections
         connections = list(self.websocket_manager.connections)
@@ -248,21 +331,22 @@ class HealthMonitoringService:
         await self.websocket_manager._send_initial_status_optimized(websocket)
             
     async def broadcast_health_update(self, service_path: Optional[str] = None):
-        """Broadcast health status updates to all connected WebSocket clients."""
-        if not self.websocket_manager.connections:
-            return
-            
+        """Broadcast health status updates to WebSocket clients and the SSE change feed."""
         from ..services.server_service import server_service
-        
+
         if service_path:
             # Single service update - get data efficiently
             server_info = server_service.get_server_info(service_path)
             if server_info:
                 health_data = self._get_service_health_data_fast(service_path, server_info)
-                await self.websocket_manager.broadcast_update(service_path, health_data)
+                self.change_feed.publish({service_path: health_data})
+                if self.websocket_manager.connections:
+                    await self.websocket_manager.broadcast_update(service_path, health_data)
         else:
-            # Full update - use cached data
-            await self.websocket_manager.broadcast_update()
+            # Full update - SSE subscribers get a fresh snapshot, WebSockets use cached data
+            self.change_feed.publish(self.get_all_health_status())
+            if self.websocket_manager.connections:
+                await self.websocket_manager.broadcast_update()
             
     def _get_cached_health_data(self) -> Dict:
         """Get cached health data to avoid expensive operations during WebSocket sends."""
@@ -306,7 +390,6 @@ class HealthMonitoringService:
     async def _perform_health_checks(self):
         """Perform health checks on all enabled services."""
         from ..services.server_service import server_service
-        import httpx
         
         enabled_services = server_service.get_enabled_services()
         if not enabled_services:
@@ -316,27 +399,19 @@ class HealthMonitoringService:
         if len(enabled_services) > 1:
             logger.debug(f"Performing health checks on {len(enabled_services)} enabled services")
         
-        # Track if any status changed to minimize broadcasts
-        status_changed = False
+        servers = {}
+        for service_path in enabled_services:
+            server_info = server_service.get_server_info(service_path)
+            if server_info and server_info.get("proxy_pass_url"):
+                servers[service_path] = server_info
+        if not servers:
+            return
         
-        # Perform actual health checks concurrently for better performance
-        async with httpx.AsyncClient(timeout=httpx.Timeout(settings.health_check_timeout_seconds)) as client:
-            # Batch process enabled services
-            check_tasks = []
-            for service_path in enabled_services:
-                server_info = server_service.get_server_info(service_path)
-                if server_info and server_info.get("proxy_pass_url"):
-                    check_tasks.append(self._check_single_service(client, service_path, server_info))
-            
-            # Execute all health checks concurrently
-            if check_tasks:
-                results = await asyncio.gather(*check_tasks, return_exceptions=True)
-                
-                # Check if any status changed
-                for result in results:
-                    if isinstance(result, bool) and result:  # True indicates status changed
-                        status_changed = True
-                        break
+        # Track if any status changed to minimize broadcasts
+        if self.worker is not None:
+            status_changed = await self._perform_health_checks_in_worker(servers)
+        else:
+            status_changed = await self.probe_services(servers)
             
         # Only broadcast if something actually changed
         if status_changed:
@@ -345,14 +420,81 @@ class HealthMonitoringService:
             # Regenerate nginx configuration when health status changes
             try:
                 from ..core.nginx_service import nginx_service
-                enabled_servers = {
-                    path: server_service.get_server_info(path) 
-                    for path in server_service.get_enabled_services()
-                }
-                await nginx_service.generate_config_async(enabled_servers)
-                logger.info("Nginx configuration regenerated due to health status changes")
+                nginx_service.request_reconcile("health status change")
             except Exception as e:
                 logger.error(f"Failed to regenerate nginx configuration after health status change: {e}")
+
+    async def probe_services(
+        self,
+        servers: Dict[str, Dict],
+        on_checked: Optional[Callable[[str, Dict], Awaitable[None]]] = None,
+    ) -> bool:
+        """Probe the given services concurrently and return True if any status changed."""
+        async with httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.health_check_timeout_seconds),
+            event_hooks={"request": [attach_probe_trace]},
+        ) as client:
+
+            async def check(service_path: str, server_info: Dict) -> bool:
+                changed = await self._check_single_service(client, service_path, server_info)
+                if on_checked is not None:
+                    await on_checked(service_path, server_info)
+                return changed
+
+            # Execute all health checks concurrently
+            results = await asyncio.gather(
+                *(check(path, info) for path, info in servers.items()),
+                return_exceptions=True,
+            )
+        return any(result is True for result in results)
+
+    async def _perform_health_checks_in_worker(self, servers: Dict[str, Dict]) -> bool:
+        """Run a check cycle in the worker process, applying deltas as they stream back."""
+        from .worker import HealthWorkerError
+
+        status_changed = False
+
+        async def apply(service_path: str, delta: Dict):
+            nonlocal status_changed
+            if self.apply_probe_delta(service_path, delta):
+                status_changed = True
+                await self.broadcast_health_update(service_path)
+
+        statuses = {path: self.server_health_status.get(path, HealthStatus.UNKNOWN) for path in servers}
+        latencies = {path: self.latency_tracker.get_latency(path) for path in servers}
+        try:
+            await self.worker.run_checks(servers, statuses, apply, latencies)
+        except HealthWorkerError as e:
+            logger.warning(f"Health worker unavailable ({e}), running checks in-process this cycle")
+            return await self.probe_services(servers) or status_changed
+        return status_changed
+
+    def apply_probe_delta(self, service_path: str, delta: Dict) -> bool:
+        """Apply a probe result produced by the health worker. Returns True if the status changed."""
+        from ..services.server_service import server_service
+
+        # The service may have been disabled while the probe was running
+        if not server_service.is_service_enabled(service_path):
+            return False
+
+        previous_status = self.server_health_status.get(service_path, HealthStatus.UNKNOWN)
+        new_status = delta["status"]
+        self.server_health_status[service_path] = new_status
+        self.server_last_check_time[service_path] = datetime.fromisoformat(delta["last_checked_iso"])
+        self.history.record(service_path, delta["probe_ms"], new_status, timestamp=delta["timestamp"])
+        if delta.get("latency"):
+            self.latency_tracker.load_latency(service_path, delta["latency"])
+        endpoints_changed = False
+        if delta.get("endpoints") is not None:
+            endpoints_changed = self.endpoint_health.get(service_path) != delta["endpoints"]
+            self.endpoint_health[service_path] = delta["endpoints"]
+
+        if delta.get("refresh_tools"):
+            server_info = server_service.get_server_info(service_path) or {}
+            if server_info.get("proxy_pass_url"):
+                self.schedule_tool_refresh(service_path, server_info["proxy_pass_url"])
+
+        return previous_status != new_status or endpoints_changed
             
     async def _check_single_service(self, client: httpx.AsyncClient, service_path: str, server_info: Dict) -> bool:
         """Check a single service and return True if status changed."""
@@ -361,35 +503,110 @@ class HealthMonitoringService:
         proxy_pass_url = server_info.get("proxy_pass_url")
         previous_status = self.server_health_status.get(service_path, HealthStatus.UNKNOWN)
         new_status = previous_status
-        
-        try:
-            # Try to reach the service endpoint using transport-aware checking
-            is_healthy, status_detail = await self._check_server_endpoint_transport_aware(client, proxy_pass_url, server_info)
+        endpoints_changed = False
+        with probe() as timings:
+            try:
+                # Try to reach the service endpoint using transport-aware checking
+                is_healthy, status_detail, endpoints_changed = await self._check_server_instances(
+                    client, service_path, proxy_pass_url, server_info
+                )
             
-            if is_healthy:
-                new_status = status_detail  # Could be "healthy" or "healthy-auth-expired"
+                timings.finish()
+                if is_healthy:
+                    # Could be "healthy" or "healthy-auth-expired", downgraded to "degraded" when slow
+                    self.latency_tracker.observe(service_path, timings)
+                    new_status = self.latency_tracker.classify(service_path, status_detail, previous_status)
                 
-                # If service transitioned to healthy (including auth-expired), fetch tool list (but don't block)
-                # Only do this for fully healthy status, not auth-expired
-                if previous_status != HealthStatus.HEALTHY and status_detail == HealthStatus.HEALTHY:
-                    asyncio.create_task(self._update_tools_background(service_path, proxy_pass_url))
-            else:
-                new_status = status_detail  # Detailed error message from transport check
+                    # If service transitioned to healthy (including auth-expired), fetch tool list (but don't block)
+                    # Only do this for fully healthy status, not auth-expired
+                    if previous_status not in (HealthStatus.HEALTHY, HealthStatus.DEGRADED) and status_detail == HealthStatus.HEALTHY:
+                        self.schedule_tool_refresh(service_path, proxy_pass_url)
+                else:
+                    new_status = status_detail  # Detailed error message from transport check
                 
-        except httpx.TimeoutException:
-            new_status = HealthStatus.UNHEALTHY_TIMEOUT
-        except httpx.ConnectError:
-            new_status = HealthStatus.UNHEALTHY_CONNECTION_ERROR
-        except Exception as e:
-            new_status = f"error: {type(e).__name__}"
+            except httpx.TimeoutException:
+                new_status = HealthStatus.UNHEALTHY_TIMEOUT
+            except httpx.ConnectError:
+                new_status = HealthStatus.UNHEALTHY_CONNECTION_ERROR
+            except Exception as e:
+                new_status = f"error: {type(e).__name__}"
         
         # Update status and timestamp
         self.server_health_status[service_path] = new_status
         self.server_last_check_time[service_path] = datetime.now(timezone.utc)
+        timings.finish()
+        self.history.record(service_path, timings.total_ms, new_status)
         
-        # Return True if status changed
-        return previous_status != new_status
+        # Return True if status changed (or an instance of a multi-instance server came or went)
+        return previous_status != new_status or endpoints_changed
+
+
+    async def _check_server_instances(
+        self, client: httpx.AsyncClient, service_path: str, proxy_pass_url: str, server_info: Dict
+    ) -> Tuple[bool, str, bool]:
+        """Transport-aware check of a server, probing every endpoint of multi-instance servers.
+
+        A multi-instance server is as healthy as its best endpoint; per-endpoint
+        statuses are kept in endpoint_health so nginx only balances across
+        instances that passed, and gives less traffic to degraded (slow) ones.
+        Returns (is_healthy, status_detail, endpoints_changed).
+        """
+        endpoints = get_server_endpoints(server_info)
+        if len(endpoints) <= 1:
+            is_healthy, status_detail = await self._check_server_endpoint_transport_aware(client, proxy_pass_url, server_info)
+            return is_healthy, status_detail, False
+
+        results = await asyncio.gather(
+            *(self._check_endpoint(client, service_path, endpoint.url, server_info) for endpoint in endpoints),
+            return_exceptions=True,
+        )
+        endpoint_health = {
+            endpoint.url: self._endpoint_status(result)
+            for endpoint, result in zip(endpoints, results)
+        }
+        endpoints_changed = self.endpoint_health.get(service_path) != endpoint_health
+        self.endpoint_health[service_path] = endpoint_health
+        if endpoints_changed:
+            logger.info(f"Endpoint health for {service_path}: {endpoint_health}")
+
+        for result in results:
+            if not isinstance(result, BaseException) and result[0]:
+                return result[0], result[1], endpoints_changed
+        # No instance is up: report the first failure like a single-instance check would
+        if isinstance(results[0], BaseException):
+            raise results[0]
+        return results[0][0], results[0][1], endpoints_changed
 
+    async def _check_endpoint(
+        self, client: httpx.AsyncClient, service_path: str, endpoint_url: str, server_info: Dict
+    ) -> Tuple[bool, str, str]:
+        """Check one endpoint of a multi-instance server.
+
+        Returns (is_healthy, status_detail, endpoint_status), where endpoint_status
+        is the detail downgraded to degraded when the endpoint's latency EWMA
+        breaks the SLO. Only total latency is tracked per endpoint: the probe's
+        connect and TTFB trace events go to the server-level timings.
+        """
+        timings = ProbeTimings()
+        is_healthy, status_detail = await self._check_server_endpoint_transport_aware(client, endpoint_url, server_info)
+        timings.finish()
+        if not is_healthy:
+            return is_healthy, status_detail, status_detail
+
+        tracker = self.endpoint_latency.setdefault(service_path, LatencyTracker())
+        tracker.observe(endpoint_url, timings)
+        previous_status = self.endpoint_health.get(service_path, {}).get(endpoint_url)
+        return is_healthy, status_detail, tracker.classify(endpoint_url, status_detail, previous_status)
+
+    @staticmethod
+    def _endpoint_status(result) -> str:
+        if not isinstance(result, BaseException):
+            return result[2]
+        if isinstance(result, httpx.TimeoutException):
+            return HealthStatus.UNHEALTHY_TIMEOUT
+        if isinstance(result, httpx.ConnectError):
+            return HealthStatus.UNHEALTHY_CONNECTION_ERROR
+        return f"error: {type(result).__name__}"
 
     def _build_headers_for_server(self, server_info: Dict) -> Dict[str, str]:
         """
@@ -708,6 +925,33 @@ class HealthMonitoringService:
         return False
 
         
+    def schedule_tool_refresh(self, service_path: str, proxy_pass_url: str, force: bool = False) -> Optional[asyncio.Task]:
+        """Start a background tool list refresh unless one is already running or ran recently.
+
+        Returns the in-flight task (new or existing), or None if the refresh was
+        skipped because the minimum refresh interval has not elapsed.
+        """
+        in_flight = self._tool_refresh_tasks.get(service_path)
+        if in_flight is not None and not in_flight.done():
+            logger.debug(f"Tool refresh already in flight for {service_path}, joining it")
+            return in_flight
+
+        last_started = self._tool_refresh_last_started.get(service_path)
+        if not force and last_started is not None and time() - last_started < settings.tool_refresh_min_interval_seconds:
+            logger.debug(f"Skipping tool refresh for {service_path}: refreshed {time() - last_started:.1f}s ago")
+            return None
+
+        self._tool_refresh_last_started[service_path] = time()
+        task = asyncio.create_task(self._update_tools_background(service_path, proxy_pass_url))
+        self._tool_refresh_tasks[service_path] = task
+
+        def _clear(finished: asyncio.Task):
+            if self._tool_refresh_tasks.get(service_path) is finished:
+                del self._tool_refresh_tasks[service_path]
+
+        task.add_done_callback(_clear)
+        return task
+
     async def _update_tools_background(self, service_path: str, proxy_pass_url: str):
         """Update tool list in the background without blocking health checks."""
         try:
@@ -719,15 +963,14 @@ class HealthMonitoringService:
             tool_list = await mcp_client_service.get_tools_from_server_with_server_info(proxy_pass_url, server_info)
             
             if tool_list is not None:
-                new_tool_count = len(tool_list)
                 current_server_info = server_service.get_server_info(service_path)
                 if current_server_info:
-                    current_tool_count = current_server_info.get("num_tools", 0)
-                    
-                    if current_tool_count != new_tool_count:
+                    # Compare schema content, not just the count, so renamed or changed tools are caught
+                    if compute_tool_list_hash(tool_list) != compute_tool_list_hash(current_server_info.get("tool_list")):
+                        logger.info(f"Tool list changed for {service_path} ({len(tool_list)} tools)")
                         updated_server_info = current_server_info.copy()
                         updated_server_info["tool_list"] = tool_list
-                        updated_server_info["num_tools"] = new_tool_count
+                        updated_server_info["num_tools"] = len(tool_list)
                         
                         server_service.update_server(service_path, updated_server_info)
                         
@@ -749,8 +992,30 @@ class HealthMonitoringService:
         
         return data
 
-    async def perform_immediate_health_check(self, service_path: str) -> tuple[str, datetime | None]:
-        """Perform an immediate health check for a single service."""
+    def get_health_history(self, service_path: str, window_seconds: Optional[int] = None) -> Optional[Dict]:
+        """Get latency percentiles, uptime and rollups for a service."""
+        return self.history.get_history(service_path, window_seconds)
+
+    def forget_service(self, service_path: str):
+        """Drop the probe history and latency state of a service that was disabled or (re-)registered.
+
+        A service enabled again, or registered anew at the same path, then starts
+        from a clean history and EWMA instead of inheriting samples (and a
+        degraded classification) from its previous life.
+        """
+        self.history.remove(service_path)
+        self.latency_tracker.remove(service_path)
+        self.endpoint_latency.pop(service_path, None)
+        self.endpoint_health.pop(service_path, None)
+
+    async def perform_immediate_health_check(
+        self, service_path: str, force_tool_refresh: bool = False
+    ) -> tuple[str, datetime | None]:
+        """Perform an immediate health check for a single service.
+
+        force_tool_refresh fetches the tool list of a healthy service even if it
+        was refreshed within the minimum refresh interval (manual refresh).
+        """
         from ..services.server_service import server_service
         import httpx
         
@@ -774,50 +1039,57 @@ class HealthMonitoringService:
         logger.info(f"Setting status to '{HealthStatus.CHECKING}' for {service_path} ({proxy_pass_url})...")
         previous_status = self.server_health_status.get(service_path, HealthStatus.UNKNOWN)
         self.server_health_status[service_path] = HealthStatus.CHECKING
-
-        try:
-            async with httpx.AsyncClient(timeout=httpx.Timeout(settings.health_check_timeout_seconds)) as client:
-                # Use transport-aware endpoint checking
-                is_healthy, status_detail = await self._check_server_endpoint_transport_aware(client, proxy_pass_url, server_info)
+        endpoints_changed = False
+        with probe() as timings:
+            try:
+                async with httpx.AsyncClient(
+                    timeout=httpx.Timeout(settings.health_check_timeout_seconds),
+                    event_hooks={"request": [attach_probe_trace]},
+                ) as client:
+                    # Use transport-aware endpoint checking
+                    is_healthy, status_detail, endpoints_changed = await self._check_server_instances(
+                        client, service_path, proxy_pass_url, server_info
+                    )
                 
-                if is_healthy:
-                    current_status = status_detail  # Could be "healthy" or "healthy-auth-expired"
-                    logger.info(f"Health check successful for {service_path} ({proxy_pass_url}): {status_detail}")
+                    timings.finish()
+                    if is_healthy:
+                        # Could be "healthy" or "healthy-auth-expired", downgraded to "degraded" when slow
+                        self.latency_tracker.observe(service_path, timings)
+                        current_status = self.latency_tracker.classify(service_path, status_detail, previous_status)
+                        logger.info(f"Health check successful for {service_path} ({proxy_pass_url}): {current_status} {timings.to_dict()}")
                     
-                    # Schedule tool list fetch in background only for fully healthy status
-                    if status_detail == "healthy":
-                        asyncio.create_task(self._update_tools_background(service_path, proxy_pass_url))
-                    elif status_detail == "healthy-auth-expired":
-                        logger.warning(f"Auth token expired for {service_path} but server is reachable")
+                        # Schedule tool list fetch in background only for fully healthy status
+                        if status_detail == "healthy":
+                            self.schedule_tool_refresh(service_path, proxy_pass_url, force=force_tool_refresh)
+                        elif status_detail == "healthy-auth-expired":
+                            logger.warning(f"Auth token expired for {service_path} but server is reachable")
                         
-                else:
-                    current_status = status_detail  # Detailed error from transport check
-                    logger.info(f"Health check failed for {service_path} ({proxy_pass_url}): {status_detail}")
+                    else:
+                        current_status = status_detail  # Detailed error from transport check
+                        logger.info(f"Health check failed for {service_path} ({proxy_pass_url}): {status_detail}")
                     
-        except httpx.TimeoutException:
-            current_status = "unhealthy: timeout"
-            logger.info(f"Health check timeout for {service_path}")
-        except httpx.ConnectError:
-            current_status = "error: connection failed"
-            logger.info(f"Health check connection failed for {service_path}")
-        except Exception as e:
-            current_status = f"error: {type(e).__name__}"
-            logger.error(f"ERROR: Unexpected error during health check for {service_path}: {e}")
+            except httpx.TimeoutException:
+                current_status = "unhealthy: timeout"
+                logger.info(f"Health check timeout for {service_path}")
+            except httpx.ConnectError:
+                current_status = "error: connection failed"
+                logger.info(f"Health check connection failed for {service_path}")
+            except Exception as e:
+                current_status = f"error: {type(e).__name__}"
+                logger.error(f"ERROR: Unexpected error during health check for {service_path}: {e}")
 
         # Update the status
         self.server_health_status[service_path] = current_status
+        timings.finish()
+        self.history.record(service_path, timings.total_ms, current_status)
         logger.info(f"Final health status for {service_path}: {current_status}")
 
         # Regenerate nginx configuration if status changed
-        if previous_status != current_status:
+        if previous_status != current_status or endpoints_changed:
             try:
                 from ..core.nginx_service import nginx_service
-                enabled_servers = {
-                    path: server_service.get_server_info(path) 
-                    for path in server_service.get_enabled_services()
-                }
-                await nginx_service.generate_config_async(enabled_servers)
-                logger.info(f"Nginx configuration regenerated due to status change for {service_path}: {previous_status} -> {current_status}")
+                nginx_service.request_reconcile(f"health status change: {service_path}")
+                logger.info(f"Nginx reconcile requested due to status change for {service_path}: {previous_status} -> {current_status}")
             except Exception as e:
                 logger.error(f"Failed to regenerate nginx configuration after immediate health check: {e}")
 
@@ -856,7 +1128,9 @@ class HealthMonitoringService:
         return {
             "status": status,
             "last_checked_iso": last_checked_iso,
-            "num_tools": num_tools
+            "num_tools": num_tools,
+            "latency_ms": self.latency_tracker.get_latency(service_path),
+            "endpoints": self.endpoint_health.get(service_path),
         }
 
 
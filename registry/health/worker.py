@@ -0,0 +1,237 @@
+"""
+Out-of-process health check worker.
+
+The API process starts the worker as a child process (``python -m
+registry.health.worker``) and talks to it over its stdin/stdout pipes using
+JSON lines. Each check cycle the API sends the enabled servers and their
+current status and latency state; the worker probes them with its own HealthMonitoringService
+and event loop, streaming one delta per service as soon as its probe finishes.
+The API loop only applies those deltas, so probing and probe response parsing
+never compete with API and WebSocket traffic.
+
+Protocol (one JSON object per line):
+    API -> worker: {"id": 1, "type": "check", "servers": {...}, "statuses": {...}, "latencies": {...}}
+                   {"type": "shutdown"}
+    worker -> API: {"id": 1, "type": "delta", "path": "/svc", "delta": {...}}
+                   {"id": 1, "type": "done"}
+"""
+import asyncio
+import json
+import logging
+import sys
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Large enough for a full fleet check request; tool lists are never sent
+_STREAM_LIMIT_BYTES = 16 * 1024 * 1024
+
+
+class HealthWorkerError(RuntimeError):
+    """Raised when the health worker process is unavailable or misbehaves."""
+
+
+class HealthCheckWorker:
+    """API-side handle for the out-of-process health check worker."""
+
+    def __init__(self):
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self._lock = asyncio.Lock()
+        self._request_id = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    async def start(self):
+        """Start the worker process if it is not already running."""
+        if self.is_running:
+            return
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "registry.health.worker",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            limit=_STREAM_LIMIT_BYTES,
+        )
+        logger.info(f"Health check worker started (pid {self.process.pid})")
+
+    async def stop(self, timeout: float = 5.0):
+        """Ask the worker to exit, killing it if it does not within the timeout."""
+        if not self.is_running:
+            return
+        process = self.process
+        try:
+            process.stdin.write(b'{"type": "shutdown"}\n')
+            await process.stdin.drain()
+            await asyncio.wait_for(process.wait(), timeout=timeout)
+        except (asyncio.TimeoutError, BrokenPipeError, ConnectionResetError):
+            process.kill()
+            await process.wait()
+        logger.info("Health check worker stopped")
+
+    async def run_checks(
+        self,
+        servers: Dict[str, Dict],
+        statuses: Dict[str, str],
+        on_delta: Callable[[str, Dict], Awaitable[None]],
+        latencies: Optional[Dict[str, Optional[Dict]]] = None,
+    ):
+        """Run one check cycle in the worker, awaiting on_delta for each service as results stream in."""
+        async with self._lock:
+            if not self.is_running:
+                await self.start()
+
+            self._request_id += 1
+            request_id = self._request_id
+            # Probes never need the tool list, which can be large
+            probe_servers = {
+                path: {key: value for key, value in info.items() if key != "tool_list"}
+                for path, info in servers.items()
+            }
+            request = {
+                "id": request_id,
+                "type": "check",
+                "servers": probe_servers,
+                "statuses": statuses,
+                "latencies": latencies or {},
+            }
+
+            try:
+                self.process.stdin.write(json.dumps(request).encode("utf-8") + b"\n")
+                await self.process.stdin.drain()
+                await asyncio.wait_for(
+                    self._read_results(request_id, on_delta),
+                    timeout=settings.health_worker_cycle_timeout_seconds,
+                )
+            except asyncio.TimeoutError:
+                # The worker may be wedged; restart it on the next cycle
+                self.process.kill()
+                raise HealthWorkerError("Health worker cycle timed out")
+            except (BrokenPipeError, ConnectionResetError) as e:
+                raise HealthWorkerError(f"Health worker pipe closed: {e}")
+
+    async def _read_results(self, request_id: int, on_delta: Callable[[str, Dict], Awaitable[None]]):
+        while True:
+            line = await self.process.stdout.readline()
+            if not line:
+                raise HealthWorkerError("Health worker exited unexpectedly")
+            try:
+                message = json.loads(line)
+            except ValueError:
+                message = None
+            if not isinstance(message, dict):
+                # Stray or truncated output: the protocol stream can't be trusted, restart on the next cycle
+                self.process.kill()
+                raise HealthWorkerError(f"Health worker sent malformed output: {line[:200]!r}")
+            if message.get("id") != request_id:
+                # Left over from a cycle that timed out
+                continue
+            if message.get("type") == "done":
+                return
+            if message.get("type") == "delta":
+                await on_delta(message["path"], message["delta"])
+
+
+class _ProbeSampleCollector:
+    """Stands in for HealthHistoryStore in the worker; keeps only the latest sample per service."""
+
+    def __init__(self):
+        self.samples: Dict[str, tuple] = {}
+
+    def record(self, service_path: str, latency_ms: float, status: str, timestamp: Optional[float] = None):
+        from time import time
+        self.samples[service_path] = (latency_ms, timestamp if timestamp is not None else time())
+
+
+def _create_worker_service():
+    """HealthMonitoringService whose side effects are reported back instead of applied locally."""
+    from .service import HealthMonitoringService
+
+    class WorkerHealthService(HealthMonitoringService):
+        def __init__(self):
+            super().__init__()
+            self.history = _ProbeSampleCollector()
+            self.tool_refresh_requests: Set[str] = set()
+
+        def schedule_tool_refresh(self, service_path: str, proxy_pass_url: str, force: bool = False):
+            # Tool lists live in the API process, which performs the refresh
+            self.tool_refresh_requests.add(service_path)
+            return None
+
+    return WorkerHealthService()
+
+
+async def _run_check_cycle(service, request: Dict, write: Callable[[Dict], None]):
+    request_id = request["id"]
+    servers: Dict[str, Dict] = request["servers"]
+    service.server_health_status.update(request.get("statuses", {}))
+    # The API process owns latency state; services it has forgotten start from a fresh EWMA here too
+    # (endpoint EWMAs of multi-instance servers only live here and are dropped along with it)
+    latencies = request.get("latencies", {})
+    for service_path in servers:
+        if latencies.get(service_path):
+            service.latency_tracker.load_latency(service_path, latencies[service_path])
+        else:
+            service.latency_tracker.remove(service_path)
+            service.endpoint_latency.pop(service_path, None)
+            service.endpoint_health.pop(service_path, None)
+    service.tool_refresh_requests.clear()
+
+    async def report(service_path: str, server_info: Dict):
+        latency_ms, timestamp = service.history.samples[service_path]
+        write({
+            "id": request_id,
+            "type": "delta",
+            "path": service_path,
+            "delta": {
+                "status": service.server_health_status[service_path],
+                "last_checked_iso": service.server_last_check_time[service_path].isoformat(),
+                "probe_ms": latency_ms,
+                "timestamp": timestamp,
+                "latency": service.latency_tracker.get_latency(service_path),
+                "refresh_tools": service_path in service.tool_refresh_requests,
+                "endpoints": service.endpoint_health.get(service_path),
+            },
+        })
+
+    await service.probe_services(servers, on_checked=report)
+    write({"id": request_id, "type": "done"})
+
+
+async def _serve():
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=_STREAM_LIMIT_BYTES)
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+
+    def write(message: Dict):
+        sys.stdout.write(json.dumps(message) + "\n")
+        sys.stdout.flush()
+
+    service = _create_worker_service()
+    logger.info("Health check worker ready")
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        request = json.loads(line)
+        if request.get("type") == "shutdown":
+            break
+        if request.get("type") == "check":
+            await _run_check_cycle(service, request, write)
+
+
+def main():
+    # stdout carries the protocol, so logs go to stderr (inherited from the API process)
+    logging.basicConfig(
+        level=logging.INFO,
+        stream=sys.stderr,
+        format="%(asctime)s,p%(process)s,{%(filename)s:%(lineno)d},%(levelname)s,%(message)s",
+    )
+    asyncio.run(_serve())
+
+
+if __name__ == "__main__":
+    main()
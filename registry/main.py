@@ -26,7 +26,7 @@ from registry.agent_registry.api.server_routes import router as agent_servers_ro
 
 
 # Import auth dependencies
-from registry.auth.dependencies import enhanced_auth
+from registry.auth.dependencies import enhanced_auth, scopes_loader
 
 # Import services for initialization
 from registry.services.server_service import server_service
@@ -116,9 +116,19 @@ async def lifespan(app: FastAPI):
         
         logger.info(f"✅ FAISS index updated with {len(all_servers)} services")
         
+        if settings.health_worker_enabled:
+            logger.info("🧵 Starting out-of-process health check worker...")
+            await health_service.start_worker()
+
         logger.info("🏥 Initializing health monitoring service...")
         await health_service.initialize()
         
+        logger.info("🔐 Watching scopes configuration for changes...")
+        scopes_loader.start_watching()
+
+        logger.info("🌍 Resolving public DNS for Nginx...")
+        await nginx_service.start_public_dns_refresh()
+
         logger.info("🌐 Generating initial Nginx configuration...")
         enabled_servers = {
             path: server_service.get_server_info(path) 
@@ -140,6 +150,9 @@ async def lifespan(app: FastAPI):
     try:
         # Shutdown services gracefully
         await health_service.shutdown()
+        await nginx_service.stop_reconciler()
+        await nginx_service.stop_public_dns_refresh()
+        scopes_loader.stop_watching()
         logger.info("✅ Shutdown completed successfully!")
     except Exception as e:
         logger.error(f"❌ Error during shutdown: {e}", exc_info=True)
@@ -189,7 +202,14 @@ async def get_current_user(user_context: Dict[str, Any] = Depends(enhanced_auth)
 @app.get("/health")
 async def health_check():
     """Simple health check for load balancers and monitoring."""
-    return {"status": "healthy", "service": "mcp-gateway-registry"}
+    # scopes_hash identifies the loaded scopes.yml, comparable with the auth server's
+    scopes = scopes_loader.snapshot
+    return {
+        "status": "healthy",
+        "service": "mcp-gateway-registry",
+        "scopes_version": scopes.version,
+        "scopes_hash": scopes.content_hash,
+    }
 
 # Serve React static files
 FRONTEND_BUILD_PATH = Path(__file__).parent.parent / "frontend" / "build"
@@ -59,6 +59,9 @@ class ServerService:
                         server_info["is_python"] = server_info.get("is_python", False)
                         server_info["license"] = server_info.get("license", "N/A")
                         server_info["proxy_pass_url"] = server_info.get("proxy_pass_url", None)
+                        if not server_info["proxy_pass_url"] and server_info.get("endpoints"):
+                            # Multi-instance servers: the first endpoint stands in for tool discovery
+                            server_info["proxy_pass_url"] = server_info["endpoints"][0].get("url")
                         server_info["tool_list"] = server_info.get("tool_list", [])
                         
                         temp_servers[server_path] = server_info
@@ -199,13 +202,7 @@ class ServerService:
         if self.is_service_enabled(path):
             try:
                 from ..core.nginx_service import nginx_service
-                enabled_servers = {
-                    service_path: self.get_server_info(service_path) 
-                    for service_path in self.get_enabled_services()
-                }
-                nginx_service.generate_config(enabled_servers)
-                nginx_service.reload_nginx()
-                logger.info(f"Regenerated nginx config due to server update: {path}")
+                nginx_service.request_reconcile(f"server update: {path}")
             except Exception as e:
                 logger.error(f"Failed to regenerate nginx configuration after server update: {e}")
         
@@ -226,12 +223,7 @@ class ServerService:
         # Trigger nginx config regeneration and reload
         try:
             from ..core.nginx_service import nginx_service
-            enabled_servers = {
-                service_path: self.get_server_info(service_path) 
-                for service_path in self.get_enabled_services()
-            }
-            nginx_service.generate_config(enabled_servers)
-            nginx_service.reload_nginx()
+            nginx_service.request_reconcile(f"toggle: {path}")
         except Exception as e:
             logger.error(f"Failed to update nginx configuration after toggle: {e}")
         
@@ -360,13 +352,8 @@ class ServerService:
             # Regenerate nginx configuration due to state changes
             try:
                 from ..core.nginx_service import nginx_service
-                enabled_servers = {
-                    service_path: self.get_server_info(service_path) 
-                    for service_path in self.get_enabled_services()
-                }
-                nginx_service.generate_config(enabled_servers)
-                nginx_service.reload_nginx()
-                logger.info("Regenerated nginx config due to state reload")
+                nginx_service.request_reconcile("state reload")
+                logger.info("Requested nginx config regeneration due to state reload")
             except Exception as e:
                 logger.error(f"Failed to regenerate nginx configuration after state reload: {e}")
         else:
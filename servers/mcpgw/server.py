@@ -16,11 +16,21 @@ from fastmcp.server.dependencies import get_http_request  # New dependency funct
 from typing import Dict, Any, Optional, ClassVar, List
 from dotenv import load_dotenv
 import os
+import sys
 from sentence_transformers import SentenceTransformer # Added
 import numpy as np # Added
 from sklearn.metrics.pairwise import cosine_similarity # Added
 import faiss # Added
-import yaml # Added for scopes.yml parsing
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+try:
+    from auth_server.scopes_loader import ScopesLoader
+except ImportError:
+    # Local development: the shared loader lives in the repository's auth_server/
+    # (the container image copies it to /app/auth_server/)
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+    from auth_server.scopes_loader import ScopesLoader
 
 # Configure logging
 logging.basicConfig(
@@ -37,43 +47,33 @@ REGISTRY_BASE_URL = os.environ.get("REGISTRY_BASE_URL", "http://localhost:7860")
 if not REGISTRY_BASE_URL:
     raise ValueError("REGISTRY_BASE_URL environment variable is not set.")
 
-# Global variable to cache loaded scopes
-_scopes_config = None
+# --- Scopes Management Helper Functions ---
+def _get_scopes_path() -> Path:
+    # First try the docker container path, then fallback to local development path
+    scopes_path = Path("/app/auth_server/scopes.yml")
+    if not scopes_path.exists():
+        scopes_path = Path(__file__).resolve().parents[2] / "auth_server" / "scopes.yml"
+    return scopes_path
+
+
+# scopes.yml through the loader shared with the auth server and the registry, so all three
+# accept the same files and report comparable versions and content hashes
+scopes_loader = ScopesLoader(_get_scopes_path(), poll_interval_seconds=0)
 
 
-# --- Scopes Management Helper Functions ---
 async def load_scopes_config() -> Dict[str, Any]:
     """
     Load and parse the scopes.yml configuration file.
     
+    The file is re-read when its mtime, size or inode changes, so permission
+    changes apply without a restart. A file that fails to parse or validate
+    is ignored and the last good version stays in use.
+    
     Returns:
         Dict containing the parsed scopes configuration
     """
-    global _scopes_config
-    
-    if _scopes_config is not None:
-        return _scopes_config
-    
-    try:
-        # Look for scopes.yml in the auth_server directory
-        # First try the docker container path, then fallback to local development path
-        scopes_path = Path("/app/auth_server/scopes.yml")
-        if not scopes_path.exists():
-            scopes_path = Path(__file__).parent.parent / "auth_server" / "scopes.yml"
-        
-        if not scopes_path.exists():
-            logger.warning(f"Scopes file not found at {scopes_path}")
-            return {}
-        
-        with open(scopes_path, 'r') as f:
-            _scopes_config = yaml.safe_load(f)
-        
-        logger.info(f"Successfully loaded scopes configuration from {scopes_path}")
-        return _scopes_config
-        
-    except Exception as e:
-        logger.error(f"Failed to load scopes configuration: {e}")
-        return {}
+    scopes_loader.check_for_changes()
+    return scopes_loader.config
 
 
 def extract_user_scopes_from_headers(headers: Dict[str, str]) -> List[str]:
@@ -1368,6 +1368,19 @@ async def intelligent_tool_finder(
     return final_results
 
 
+@mcp.custom_route("/health", methods=["GET"])
+async def health_check(request: Request) -> JSONResponse:
+    """Simple health check, reporting the loaded scopes.yml like the registry and auth server."""
+    scopes_loader.check_for_changes()
+    scopes = scopes_loader.snapshot
+    return JSONResponse({
+        "status": "healthy",
+        "service": "mcpgw",
+        "scopes_version": scopes.version,
+        "scopes_hash": scopes.content_hash,
+    })
+
+
 # --- Main Execution ---
 
 def main():
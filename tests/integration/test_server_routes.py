@@ -104,6 +104,43 @@ class TestServerRoutes:
             assert data["service_path"] == server_data["path"]
             assert data["new_enabled_state"] is True
 
+    def test_toggle_service_off_forgets_health_state(self, test_client: TestClient):
+        """Test that disabling a service drops its health history and reconciles nginx."""
+        from registry.auth.dependencies import enhanced_auth
+        from registry.main import app
+
+        server_data = ServerInfoFactory()
+        admin_context = {
+            "username": "admin",
+            "is_admin": True,
+            "ui_permissions": {"toggle_service": ["all"]},
+            "accessible_servers": ["all"],
+        }
+        app.dependency_overrides[enhanced_auth] = lambda: admin_context
+
+        try:
+            with patch('registry.api.server_routes.server_service') as mock_service, \
+                 patch('registry.search.service.faiss_service') as mock_faiss, \
+                 patch('registry.core.nginx_service.nginx_service') as mock_nginx, \
+                 patch('registry.health.service.health_service') as mock_health:
+
+                mock_service.get_server_info.return_value = server_data
+                mock_service.toggle_service.return_value = True
+                mock_faiss.add_or_update_service = AsyncMock()
+                mock_health.broadcast_health_update = AsyncMock()
+
+                response = test_client.post(f"/api/toggle{server_data['path']}", data={
+                    "enabled": "off"
+                })
+
+                assert response.status_code == 200
+                assert response.json()["status"] == "disabled"
+                mock_service.toggle_service.assert_called_once_with(server_data["path"], False)
+                mock_health.forget_service.assert_called_once_with(server_data["path"])
+                mock_nginx.request_reconcile.assert_called_once_with(f"toggle: {server_data['path']}")
+        finally:
+            app.dependency_overrides.pop(enhanced_auth, None)
+
     def test_toggle_service_not_found(self, test_client: TestClient, mock_authenticated_user):
         """Test toggling non-existent service."""
         with patch('registry.api.server_routes.server_service') as mock_service:
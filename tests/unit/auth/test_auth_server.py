@@ -0,0 +1,332 @@
+"""
+Unit tests for request validation in the auth server (auth_server/server.py).
+"""
+import hashlib
+import logging
+import os
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+import yaml
+
+AUTH_SERVER_DIR = Path(__file__).resolve().parents[3] / "auth_server"
+
+SCOPES_CONFIG = {
+    "group_mappings": {"readers": ["read"]},
+    "read": [{"server": "fininfo", "methods": ["tools/list", "tools/call"], "tools": ["get_stock_aggregates"]}],
+    "execute": [{"server": "currenttime", "methods": ["tools/call"], "tools": ["current_time_by_timezone"]}],
+}
+
+
+def _write_scopes(path: Path, config: dict, mtime_offset: int = 0):
+    path.write_text(yaml.dump(config))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + mtime_offset))
+
+
+@pytest.fixture(scope="module")
+def auth_server():
+    """The auth server module, imported the way it runs (with auth_server/ on sys.path)."""
+    pytest.importorskip("boto3")
+    pytest.importorskip("requests")
+    os.environ.setdefault("SECRET_KEY", "test-secret-key")
+    os.environ.setdefault("SCOPES_RELOAD_INTERVAL_SECONDS", "0")
+    if str(AUTH_SERVER_DIR) not in sys.path:
+        sys.path.insert(0, str(AUTH_SERVER_DIR))
+    import server
+    return server
+
+
+@pytest.fixture
+def scopes_file(tmp_path):
+    path = tmp_path / "scopes.yml"
+    _write_scopes(path, SCOPES_CONFIG)
+    return path
+
+
+@pytest.fixture
+def scopes_loader(auth_server, scopes_file):
+    """A scopes loader over a temporary scopes.yml, swapped in for the server's."""
+    from scope_engine import ScopeEngine
+    from scopes_loader import ScopesLoader
+
+    loader = ScopesLoader(scopes_file, compile=ScopeEngine, poll_interval_seconds=0)
+    with patch.object(auth_server, "scopes_loader", loader):
+        yield loader
+
+
+@pytest.fixture(autouse=True)
+def clear_caches(auth_server):
+    auth_server.session_cache.clear()
+    auth_server.token_cache.clear()
+    yield
+    auth_server.session_cache.clear()
+    auth_server.token_cache.clear()
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestSessionCookieCache:
+    """Test suite for the cache in front of session cookie validation."""
+
+    def test_valid_cookie_is_decoded_once(self, auth_server, scopes_loader):
+        """Test that repeat validations of a cookie are served from the cache."""
+        cookie = auth_server.signer.dumps({"username": "alice", "groups": ["readers"]})
+
+        with patch.object(auth_server, "_decode_session_cookie", wraps=auth_server._decode_session_cookie) as decode:
+            first = auth_server.validate_session_cookie(cookie)
+            second = auth_server.validate_session_cookie(cookie)
+
+        assert first["username"] == "alice"
+        assert first["scopes"] == ["read"]
+        assert second is first
+        assert decode.call_count == 1
+
+    def test_invalid_cookie_failure_is_cached(self, auth_server, scopes_loader):
+        """Test that a tampered cookie is rejected and the failure remembered."""
+        cookie = auth_server.signer.dumps({"username": "alice", "groups": ["readers"]}) + "tampered"
+
+        with patch.object(auth_server, "_decode_session_cookie", wraps=auth_server._decode_session_cookie) as decode:
+            for _ in range(2):
+                with pytest.raises(ValueError, match="Invalid session cookie"):
+                    auth_server.validate_session_cookie(cookie)
+
+        assert decode.call_count == 1
+
+    def test_expired_cookie_is_rejected(self, auth_server, scopes_loader):
+        """Test that an expired session is rejected and not cached as valid."""
+        cookie = auth_server.signer.dumps({"username": "alice", "groups": ["readers"]})
+
+        with patch.object(auth_server, "SESSION_MAX_AGE_SECONDS", -1):
+            with pytest.raises(ValueError, match="expired"):
+                auth_server.validate_session_cookie(cookie)
+
+        key = auth_server.session_cache.make_key(cookie, str(scopes_loader.version))
+        assert auth_server.session_cache.get(key) is None
+
+    def test_scopes_reload_invalidates_cached_sessions(self, auth_server, scopes_loader, scopes_file):
+        """Test that a cached session picks up new group mappings after scopes.yml is reloaded."""
+        cookie = auth_server.signer.dumps({"username": "alice", "groups": ["readers"]})
+        assert auth_server.validate_session_cookie(cookie)["scopes"] == ["read"]
+
+        _write_scopes(
+            scopes_file,
+            {**SCOPES_CONFIG, "group_mappings": {"readers": ["read", "execute"]}},
+            mtime_offset=1_000_000_000,
+        )
+        assert scopes_loader.check_for_changes() is True
+
+        assert auth_server.validate_session_cookie(cookie)["scopes"] == ["read", "execute"]
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestHealth:
+    """Test suite for GET /health."""
+
+    def test_reports_scopes_version_and_hash(self, auth_server, scopes_loader, scopes_file):
+        """Test that /health identifies the loaded scopes.yml by content, not only by reload count."""
+        from fastapi.testclient import TestClient
+
+        response = TestClient(auth_server.app).get("/health")
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "status": "healthy",
+            "service": "simplified-auth-server",
+            "scopes_version": 1,
+            "scopes_hash": hashlib.sha256(scopes_file.read_bytes()).hexdigest(),
+        }
+
+
+INTERNAL_KEY = "internal-test-key"
+
+
+@pytest.fixture
+def client(auth_server, scopes_loader):
+    from fastapi.testclient import TestClient
+
+    with patch.object(auth_server, "INTERNAL_API_KEY", INTERNAL_KEY):
+        yield TestClient(auth_server.app)
+
+
+@pytest.fixture
+def verify_bearer_token(auth_server):
+    """Stub token verification: "token-<user>" is valid with read scope, anything else is rejected."""
+    from fastapi import HTTPException
+
+    async def verify(token, user_pool_id, client_id, region):
+        if not token.startswith("token-"):
+            raise HTTPException(status_code=401, detail="Invalid token signature")
+        return {"valid": True, "method": "cognito", "username": token[len("token-"):], "scopes": ["read"]}, False
+
+    with patch.object(auth_server, "verify_bearer_token", side_effect=verify) as mock:
+        yield mock
+
+
+def _post_batch(client, items, key=INTERNAL_KEY):
+    headers = {"X-Internal-Api-Key": key} if key is not None else {}
+    return client.post("/validate/batch", json={"items": items}, headers=headers)
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestValidateBatch:
+    """Test suite for POST /validate/batch."""
+
+    def test_disabled_without_configured_key(self, auth_server, client, verify_bearer_token):
+        """Test that the endpoint refuses all callers when no internal key is configured."""
+        with patch.object(auth_server, "INTERNAL_API_KEY", None):
+            response = _post_batch(client, [{"token": "token-alice"}])
+
+        assert response.status_code == 503
+        verify_bearer_token.assert_not_called()
+
+    @pytest.mark.parametrize("key", [None, "", "wrong-key"])
+    def test_rejects_unauthenticated_caller(self, client, verify_bearer_token, key):
+        """Test that a missing or wrong internal key is rejected before any validation."""
+        response = _post_batch(client, [{"scopes": ["read"], "server": "fininfo", "method": "tools/list"}], key=key)
+
+        assert response.status_code == 401
+        verify_bearer_token.assert_not_called()
+
+    def test_rejects_oversized_batch(self, auth_server, client, verify_bearer_token):
+        """Test that batches over VALIDATE_BATCH_MAX_ITEMS are rejected."""
+        max_items = auth_server.VALIDATE_BATCH_MAX_ITEMS
+        assert _post_batch(client, [{"token": "token-alice"}] * max_items).status_code == 200
+        response = _post_batch(client, [{"token": "token-alice"}] * (max_items + 1))
+
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["type"] == "too_long"
+
+    def test_authenticates_before_reading_body(self, client, verify_bearer_token):
+        """Test that an unauthenticated caller is rejected before its body is parsed."""
+        response = client.post("/validate/batch", content=b"not json", headers={"Content-Type": "application/json"})
+
+        assert response.status_code == 401
+
+    def test_invalid_token(self, client, verify_bearer_token):
+        """Test that an invalid token is neither valid nor allowed."""
+        response = _post_batch(client, [{"token": "forged", "server": "fininfo", "method": "tools/list"}])
+
+        assert response.status_code == 200
+        [result] = response.json()["results"]
+        assert result["valid"] is False
+        assert result["allowed"] is False
+        assert result["error"] == "Invalid token signature"
+
+    def test_mixed_items(self, client, verify_bearer_token):
+        """Test that each item gets its own decision, in request order."""
+        items = [
+            {"token": "token-alice", "server": "fininfo", "method": "tools/call", "tool": "get_stock_aggregates"},
+            {"token": "token-alice", "server": "currenttime", "method": "tools/call", "tool": "current_time_by_timezone"},
+            {"token": "forged", "server": "fininfo", "method": "tools/list"},
+            {"scopes": ["execute"], "server": "currenttime", "method": "tools/call", "tool": "current_time_by_timezone"},
+            {"token": "token-bob"},
+            {"server": "fininfo", "method": "tools/list"},
+        ]
+
+        response = _post_batch(client, items)
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [(r["valid"], r["allowed"]) for r in results] == [
+            (True, True),
+            (True, False),
+            (False, False),
+            (None, True),
+            (True, True),
+            (None, False),
+        ]
+        assert results[0]["username"] == "alice"
+        assert results[1]["error"] == "Access denied to currenttime.tools/call"
+        assert results[4]["username"] == "bob"
+        assert results[5]["error"] == "Item needs a token or scopes"
+        # Each distinct token is verified once
+        assert sorted(call.args[0] for call in verify_bearer_token.call_args_list) == ["forged", "token-alice", "token-bob"]
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestValidateLogging:
+    """Test suite for what a /validate denial writes to the logs."""
+
+    def test_rejected_token_writes_one_access_log_line(self, auth_server, scopes_loader, caplog):
+        """Test that a rejected bearer token, fresh or from the negative cache, logs only its access line."""
+        from fastapi.testclient import TestClient
+
+        provider = Mock()
+        provider.validate_token_async = AsyncMock(side_effect=ValueError("Invalid token: Signature verification failed"))
+        client = TestClient(auth_server.app)
+        caplog.set_level(logging.INFO)
+
+        with patch.object(auth_server, "get_auth_provider", return_value=provider):
+            for _ in range(2):
+                caplog.clear()
+                response = client.get("/validate", headers={"X-Authorization": "Bearer forged"})
+
+                assert response.status_code >= 400
+                problems = [record for record in caplog.records if record.levelno >= logging.WARNING]
+                assert [record.name for record in problems] == ["validate_access"]
+                assert "Signature verification failed" in problems[0].getMessage()
+
+        # The second request was served from the negative cache
+        assert provider.validate_token_async.await_count == 1
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestTokenGenerationRateLimit:
+    """Test suite for the rate limit check of POST /internal/tokens."""
+
+    def test_rate_limit_checked_off_the_event_loop(self, auth_server):
+        """Test that the (possibly blocking) counter store is consulted from a worker thread."""
+        from fastapi.testclient import TestClient
+
+        checked_on = []
+
+        def check_rate_limit(username):
+            checked_on.append(threading.current_thread())
+            return False
+
+        with patch.object(auth_server, "check_rate_limit", side_effect=check_rate_limit):
+            response = TestClient(auth_server.app).post(
+                "/internal/tokens", json={"user_context": {"username": "alice", "scopes": ["read"]}}
+            )
+
+        assert response.status_code == 429
+        assert len(checked_on) == 1
+        assert checked_on[0] is not threading.main_thread()
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestMultiWorkerStartup:
+    """Test suite for starting the auth server with several workers."""
+
+    def test_workers_require_secret_key(self, auth_server):
+        """Test that several workers refuse to start with per-worker random signing keys."""
+        args = Mock(host="127.0.0.1", port=8888, region="eu-west-1", workers=4)
+        with patch.object(auth_server, "parse_arguments", return_value=args), \
+             patch.object(auth_server.uvicorn, "run") as run, \
+             patch.dict(os.environ, {"SECRET_KEY": ""}):
+            with pytest.raises(SystemExit):
+                auth_server.main()
+
+        run.assert_not_called()
+
+    def test_workers_inherit_region(self, auth_server):
+        """Test that the region reaches the workers, which re-import the module."""
+        args = Mock(host="127.0.0.1", port=8888, region="eu-west-1", workers=4)
+        with patch.object(auth_server, "parse_arguments", return_value=args), \
+             patch.object(auth_server.uvicorn, "run") as run, \
+             patch.object(auth_server, "validator"), \
+             patch.dict(os.environ, {"SECRET_KEY": "test-secret-key"}):
+            auth_server.main()
+            assert os.environ["AUTH_SERVER_REGION"] == "eu-west-1"
+            assert os.environ["AUTH_SERVER_WORKERS"] == "4"
+
+        run.assert_called_once_with("server:app", host="127.0.0.1", port=8888, workers=4)
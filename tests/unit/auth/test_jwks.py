@@ -0,0 +1,248 @@
+"""
+Unit tests for the JWKS cache shared by the JWT-based auth providers.
+"""
+import asyncio
+import base64
+from unittest.mock import Mock
+
+import pytest
+
+pytest.importorskip("requests")
+
+from auth_server.providers import jwks
+from auth_server.providers.jwks import JWKSCache
+
+JWKS_URL = "https://idp.example.com/jwks.json"
+
+
+class FakeClock:
+    """Stands in for the time module in jwks."""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+class FakeIdentityProvider:
+    """Serves a JWKS to both the pooled async client and requests.get, counting fetches."""
+
+    def __init__(self, *kids: str):
+        self.kids = list(kids)
+        self.fetches = 0
+        self.fail = False
+        # Cleared to hold async fetches in flight
+        self.release = asyncio.Event()
+        self.release.set()
+
+    def _response(self):
+        self.fetches += 1
+        response = Mock()
+        if self.fail:
+            response.raise_for_status.side_effect = RuntimeError("identity provider unavailable")
+        response.json.return_value = {"keys": [_jwk(kid) for kid in self.kids]}
+        return response
+
+    async def get(self, url):
+        await self.release.wait()
+        return self._response()
+
+    def get_sync(self, url, timeout=None):
+        return self._response()
+
+
+def _jwk(kid: str, **extra) -> dict:
+    secret = base64.urlsafe_b64encode(f"secret-{kid}".encode()).decode().rstrip("=")
+    return {"kty": "oct", "kid": kid, "k": secret, "alg": "HS256", **extra}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(jwks, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def idp(monkeypatch):
+    idp = FakeIdentityProvider("key-1")
+    monkeypatch.setattr(jwks, "get_http_client", lambda: idp)
+    monkeypatch.setattr(jwks.requests, "get", idp.get_sync)
+    return idp
+
+
+@pytest.fixture
+async def cache(clock, idp):
+    cache = JWKSCache(JWKS_URL, ttl_seconds=300, stale_seconds=600, min_refetch_interval_seconds=10, overlap_seconds=60)
+    yield cache
+    await cache.stop_background_refresh()
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestStore:
+    """Test suite for installing fetched key sets."""
+
+    def test_skips_encryption_and_unusable_keys(self, cache):
+        """Test that only signature keys that parse are kept."""
+        cache.store({"keys": [
+            _jwk("sig"),
+            _jwk("enc", use="enc"),
+            {"kty": "oct", "k": "bm8ta2lk"},
+            {"kty": "RSA", "kid": "broken", "n": "x"},
+        ]})
+
+        assert set(cache._keys) == {"sig"}
+        assert cache._find_key("sig") is not None
+        assert cache._find_key("enc") is None
+
+    def test_unchanged_keys_are_not_parsed_again(self, cache):
+        """Test that a key present in consecutive sets keeps its parsed object."""
+        cache.store({"keys": [_jwk("key-1")]})
+        parsed = cache._find_key("key-1")
+
+        cache.store({"keys": [_jwk("key-1"), _jwk("key-2")]})
+
+        assert cache._find_key("key-1") is parsed
+
+    def test_retired_key_overlap(self, cache, clock):
+        """Test that a key dropped by the provider keeps validating for overlap_seconds."""
+        cache.store({"keys": [_jwk("old"), _jwk("new")]})
+        cache.store({"keys": [_jwk("new")]})
+        retired_at = clock.now
+
+        assert cache._find_key("old") is not None
+        assert [key["kid"] for key in cache.peek()["keys"]] == ["new", "old"]
+
+        # Later stores keep the original retirement time
+        clock.now += 30
+        cache.store({"keys": [_jwk("new")]})
+        assert cache._keys["old"].retired_at == retired_at
+
+        clock.now = retired_at + 60
+        assert cache._find_key("old") is None
+        cache.store({"keys": [_jwk("new")]})
+        assert set(cache._keys) == {"new"}
+
+    def test_retired_key_returning_is_active_again(self, cache, clock):
+        """Test that a key published again is no longer treated as retired."""
+        cache.store({"keys": [_jwk("key-1")]})
+        cache.store({"keys": []})
+        cache.store({"keys": [_jwk("key-1")]})
+
+        clock.now += 3600
+        assert cache._keys["key-1"].retired_at is None
+        assert cache._find_key("key-1") is not None
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestSigningKeySync:
+    """Test suite for the blocking lookup used by synchronous providers."""
+
+    def test_fetches_once_while_fresh(self, cache, idp, clock):
+        """Test that a fresh set is served without I/O."""
+        assert cache.get_signing_key_sync("key-1") is not None
+        clock.now += 299
+        assert cache.get_signing_key_sync("key-1") is not None
+
+        assert idp.fetches == 1
+
+    def test_unknown_kid_refetches_and_finds_rotated_key(self, cache, idp, clock):
+        """Test that a token signed with a newly published key is accepted immediately."""
+        cache.get_signing_key_sync("key-1")
+        idp.kids.append("key-2")
+
+        clock.now += 10
+        assert cache.get_signing_key_sync("key-2") is not None
+        assert idp.fetches == 2
+
+    def test_unknown_kid_refetch_is_throttled(self, cache, idp, clock):
+        """Test that bogus kids trigger at most one refetch per min_refetch_interval_seconds."""
+        cache.get_signing_key_sync("key-1")
+
+        clock.now += 10
+        for kid in ("bogus-1", "bogus-2", "bogus-3"):
+            with pytest.raises(ValueError, match="No matching key found"):
+                cache.get_signing_key_sync(kid)
+        assert idp.fetches == 2
+
+        clock.now += 10
+        with pytest.raises(ValueError):
+            cache.get_signing_key_sync("bogus-4")
+        assert idp.fetches == 3
+
+    def test_stale_keys_served_when_refresh_fails(self, cache, idp, clock):
+        """Test that an expired set is kept within stale_seconds if the provider is down."""
+        cache.get_signing_key_sync("key-1")
+        idp.fail = True
+
+        clock.now += 300 + 599
+        assert cache.get_signing_key_sync("key-1") is not None
+
+        clock.now += 1
+        with pytest.raises(ValueError, match="Cannot retrieve JWKS"):
+            cache.get_signing_key_sync("key-1")
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestSigningKeyAsync:
+    """Test suite for the async lookup and background refresh."""
+
+    async def test_unknown_kid_refetches_and_finds_rotated_key(self, cache, idp, clock):
+        """Test that a newly published key is picked up on first use."""
+        assert await cache.get_signing_key("key-1") is not None
+        idp.kids.append("key-2")
+
+        clock.now += 10
+        assert await cache.get_signing_key("key-2") is not None
+        assert idp.fetches == 2
+
+    async def test_unknown_kid_refetch_is_throttled(self, cache, idp, clock):
+        """Test that an unknown kid right after a fetch does not hit the provider again."""
+        await cache.get_signing_key("key-1")
+
+        with pytest.raises(ValueError, match="No matching key found"):
+            await cache.get_signing_key("bogus")
+        assert idp.fetches == 1
+
+    async def test_stale_keys_served_while_refreshing(self, cache, idp, clock):
+        """Test that an expired set is returned at once while one refresh runs in the background."""
+        await cache.get_jwks()
+        idp.kids = ["key-2"]
+        idp.release.clear()
+
+        clock.now += 301
+        assert await cache.get_signing_key("key-1") is not None
+        assert [key["kid"] for key in (await cache.get_jwks())["keys"]] == ["key-1"]
+
+        idp.release.set()
+        await cache._refresh_task
+        assert idp.fetches == 2
+        assert cache.peek() is not None
+        assert await cache.get_signing_key("key-2") is not None
+
+    async def test_callers_wait_beyond_stale_window(self, cache, idp, clock):
+        """Test that a set older than ttl + stale_seconds is not served."""
+        await cache.get_jwks()
+        idp.fail = True
+
+        clock.now += 300 + 600
+        with pytest.raises(ValueError, match="Cannot retrieve JWKS"):
+            await cache.get_jwks()
+
+    async def test_refresh_is_single_flight(self, cache, idp):
+        """Test that concurrent refreshes share one request, and a cancelled caller does not cancel it."""
+        idp.release.clear()
+        callers = [asyncio.ensure_future(cache.refresh()) for _ in range(5)]
+        await asyncio.sleep(0)
+        callers[0].cancel()
+
+        idp.release.set()
+        results = await asyncio.gather(*callers[1:])
+
+        assert idp.fetches == 1
+        assert all(result is results[0] for result in results)
+        assert cache._find_key("key-1") is not None
@@ -0,0 +1,94 @@
+"""
+Unit tests for the auth provider factory and the pooled HTTP client.
+"""
+import pytest
+
+pytest.importorskip("requests")
+
+from auth_server.providers import factory, http
+from auth_server.providers.cognito import CognitoProvider
+from auth_server.providers.factory import get_auth_provider, reset_auth_providers
+from auth_server.providers.keycloak import KeycloakProvider
+
+KEYCLOAK_ENV = {
+    "KEYCLOAK_URL": "http://keycloak:8080",
+    "KEYCLOAK_CLIENT_ID": "mcp-gateway-web",
+    "KEYCLOAK_CLIENT_SECRET": "web-secret",
+}
+COGNITO_ENV = {
+    "COGNITO_USER_POOL_ID": "us-east-1_example",
+    "COGNITO_CLIENT_ID": "cognito-client",
+    "COGNITO_CLIENT_SECRET": "cognito-secret",
+}
+
+
+@pytest.fixture(autouse=True)
+def providers_env(monkeypatch):
+    for name, value in {**KEYCLOAK_ENV, **COGNITO_ENV}.items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.delenv("AUTH_PROVIDER", raising=False)
+    reset_auth_providers()
+    yield
+    reset_auth_providers()
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestProviderFactory:
+    """Test suite for the per-type provider cache."""
+
+    @pytest.mark.parametrize("provider_type, provider_class", [("keycloak", KeycloakProvider), ("cognito", CognitoProvider)])
+    def test_same_instance_on_repeat_calls(self, provider_type, provider_class):
+        """Test that a provider (and its JWKS cache) is created once per type."""
+        provider = get_auth_provider(provider_type)
+
+        assert isinstance(provider, provider_class)
+        assert get_auth_provider(provider_type) is provider
+        assert get_auth_provider(provider_type).jwks_cache is provider.jwks_cache
+
+    def test_default_type_from_environment(self, monkeypatch):
+        """Test that AUTH_PROVIDER selects the cached provider when no type is given."""
+        monkeypatch.setenv("AUTH_PROVIDER", "keycloak")
+
+        assert get_auth_provider() is get_auth_provider("keycloak")
+        assert get_auth_provider("cognito") is not get_auth_provider("keycloak")
+
+    def test_reset_creates_new_instances(self):
+        """Test that reset_auth_providers forgets the cached providers."""
+        provider = get_auth_provider("keycloak")
+        reset_auth_providers()
+
+        assert get_auth_provider("keycloak") is not provider
+
+    def test_failed_creation_is_not_cached(self, monkeypatch):
+        """Test that a provider missing configuration is retried once configured."""
+        monkeypatch.delenv("KEYCLOAK_CLIENT_SECRET")
+        with pytest.raises(ValueError, match="KEYCLOAK_CLIENT_SECRET"):
+            get_auth_provider("keycloak")
+
+        monkeypatch.setenv("KEYCLOAK_CLIENT_SECRET", "web-secret")
+        assert isinstance(get_auth_provider("keycloak"), KeycloakProvider)
+
+    def test_unknown_provider(self):
+        """Test that an unknown provider type is rejected."""
+        with pytest.raises(ValueError, match="Unknown auth provider"):
+            get_auth_provider("okta")
+        assert "okta" not in factory._providers
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestHttpClient:
+    """Test suite for the shared identity provider HTTP client."""
+
+    async def test_client_is_shared_until_closed(self):
+        """Test that every caller gets the same pooled client, and a new one after close."""
+        client = http.get_http_client()
+        assert http.get_http_client() is client
+
+        await http.close_http_client()
+        assert client.is_closed
+
+        replacement = http.get_http_client()
+        assert replacement is not client
+        await http.close_http_client()
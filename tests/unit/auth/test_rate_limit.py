@@ -0,0 +1,212 @@
+"""
+Unit tests for the auth server's sliding-window rate limiter and counter stores.
+"""
+import threading
+
+import pytest
+
+from auth_server import rate_limit
+from auth_server.rate_limit import (
+    CounterStore,
+    InMemoryRedis,
+    MemoryCounterStore,
+    RateLimiter,
+    RedisCounterStore,
+    SharedCounterStore,
+    create_counter_store,
+)
+
+WINDOW = 60
+LIMIT = 10
+# Start of a fixed window, so offsets below are positions within windows
+WINDOW_START = 100_000 * WINDOW
+
+
+class FakeClock:
+    """Stands in for the time module in rate_limit."""
+
+    def __init__(self, now: float):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock(WINDOW_START)
+    monkeypatch.setattr(rate_limit, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["memory", "shared", "redis"])
+def store(request, tmp_path, clock):
+    if request.param == "memory":
+        store = MemoryCounterStore()
+    elif request.param == "shared":
+        store = SharedCounterStore(str(tmp_path / "rate-limit.sqlite3"))
+    else:
+        store = RedisCounterStore(InMemoryRedis())
+    yield store
+    store.close()
+
+
+def _allowed(limiter: RateLimiter, key: str, attempts: int) -> int:
+    return sum(limiter.hit(key) for _ in range(attempts))
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestCounterStores:
+    """Behaviour shared by every counter store."""
+
+    def test_caps_at_limit(self, store):
+        """Test that a key is limited after exactly `limit` events in a window."""
+        limiter = RateLimiter(store, LIMIT, WINDOW)
+
+        assert _allowed(limiter, "alice", 25) == LIMIT
+        # Other keys have their own budget
+        assert _allowed(limiter, "bob", 3) == 3
+
+    def test_hit_with_count(self, store):
+        """Test that the estimated count includes the allowed event."""
+        limiter = RateLimiter(store, LIMIT, WINDOW)
+
+        assert limiter.hit_with_count("alice") == (True, 1)
+        assert limiter.hit_with_count("alice") == (True, 2)
+
+    def test_window_rollover(self, store, clock):
+        """Test that the previous window is weighted by its unexpired fraction, then forgotten."""
+        limiter = RateLimiter(store, LIMIT, WINDOW)
+        assert _allowed(limiter, "alice", LIMIT + 5) == LIMIT
+
+        # Start of the next window: the previous one still counts in full
+        clock.now = WINDOW_START + WINDOW
+        assert _allowed(limiter, "alice", 3) == 0
+
+        # Halfway through: half of the previous window's 10 events remain
+        clock.now = WINDOW_START + WINDOW * 1.5
+        assert _allowed(limiter, "alice", LIMIT) == 5
+
+        # Two windows later nothing of the old windows is left
+        clock.now = WINDOW_START + WINDOW * 3
+        assert _allowed(limiter, "alice", LIMIT + 5) == LIMIT
+
+    def test_rejected_events_are_not_counted(self, store, clock):
+        """Test that retrying while limited does not extend the lockout into the next window."""
+        limiter = RateLimiter(store, LIMIT, WINDOW)
+        _allowed(limiter, "alice", LIMIT)
+        _allowed(limiter, "alice", 100)
+
+        clock.now = WINDOW_START + WINDOW * 1.5
+        assert _allowed(limiter, "alice", LIMIT) == 5
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+def test_counter_store_is_abstract():
+    """Test that a store must implement hit."""
+    with pytest.raises(TypeError):
+        CounterStore()
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestMemoryCounterStore:
+    """Test suite for the in-process store."""
+
+    def test_expired_keys_are_swept(self, clock):
+        """Test that keys idle for more than a window are dropped."""
+        store = MemoryCounterStore()
+        store.hit("alice", LIMIT, WINDOW)
+
+        clock.now = WINDOW_START + WINDOW * 2
+        store.hit("bob", LIMIT, WINDOW)
+
+        assert set(store._counters) == {"bob"}
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestSharedCounterStore:
+    """Test suite for the SQLite store shared by workers."""
+
+    def test_concurrent_connections_share_one_budget(self, tmp_path, clock):
+        """Test that BEGIN IMMEDIATE serializes increments from separate connections."""
+        store = SharedCounterStore(str(tmp_path / "rate-limit.sqlite3"))
+        allowed = []
+
+        def worker():
+            # Each thread opens its own connection, like a separate worker process
+            allowed.append(sum(store.hit("alice", 50, WINDOW)[0] for _ in range(20)))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sum(allowed) == 50
+
+    def test_counts_survive_a_new_store_on_the_same_file(self, tmp_path, clock):
+        """Test that a second store (another worker) sees the first one's counts."""
+        path = str(tmp_path / "rate-limit.sqlite3")
+        RateLimiter(SharedCounterStore(path), LIMIT, WINDOW).hit("alice")
+
+        assert RateLimiter(SharedCounterStore(path), LIMIT, WINDOW).hit_with_count("alice") == (True, 2)
+
+    def test_failed_transaction_is_rolled_back(self, tmp_path, clock):
+        """Test that an error inside the transaction does not leave it open."""
+        store = SharedCounterStore(str(tmp_path / "rate-limit.sqlite3"))
+
+        with pytest.raises(Exception):
+            store.hit(["not", "a", "key"], LIMIT, WINDOW)
+
+        assert store.hit("alice", LIMIT, WINDOW) == (True, 1)
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestRedisCounterStore:
+    """Test suite for the Redis store."""
+
+    def test_rejected_hit_is_rolled_back(self, clock):
+        """Test that a rejected INCR is undone with DECR."""
+        redis = InMemoryRedis()
+        store = RedisCounterStore(redis, prefix="rl:")
+        for _ in range(LIMIT + 3):
+            store.hit("alice", LIMIT, WINDOW)
+
+        assert redis.get(f"rl:alice:{WINDOW_START // WINDOW}") == str(LIMIT).encode()
+
+    def test_window_keys_expire(self, clock):
+        """Test that counters expire after two windows."""
+        redis = InMemoryRedis()
+        store = RedisCounterStore(redis, prefix="rl:")
+        store.hit("alice", LIMIT, WINDOW)
+        key = f"rl:alice:{WINDOW_START // WINDOW}"
+
+        clock.now = WINDOW_START + WINDOW * 2 - 1
+        assert redis.get(key) == b"1"
+        clock.now = WINDOW_START + WINDOW * 2
+        assert redis.get(key) is None
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestCreateCounterStore:
+    """Test suite for create_counter_store."""
+
+    def test_backends(self, tmp_path):
+        """Test that each backend name builds the matching store."""
+        assert isinstance(create_counter_store("memory"), MemoryCounterStore)
+        assert isinstance(create_counter_store("shared", shared_path=str(tmp_path / "rl.sqlite3")), SharedCounterStore)
+
+        store = create_counter_store("redis")
+        assert isinstance(store, RedisCounterStore)
+        assert isinstance(store.client, InMemoryRedis)
+
+    def test_unknown_backend(self):
+        """Test that an unknown backend is rejected."""
+        with pytest.raises(ValueError, match="Unknown rate-limit store"):
+            create_counter_store("memcached")
@@ -0,0 +1,179 @@
+"""
+Unit tests for the compiled scope authorization engine.
+"""
+import itertools
+
+import pytest
+
+from auth_server.scope_engine import ScopeEngine, compile_scopes
+
+SCOPES_CONFIG = {
+    "UI-Scopes": {"mcp-servers-restricted/read": {"list_service": ["all"]}},
+    "group_mappings": {
+        "readers": ["mcp-servers-restricted/read"],
+        "operators": ["mcp-servers-restricted/execute", "mcp-servers-restricted/read"],
+        "admins": ["mcp-servers-unrestricted/execute"],
+    },
+    "mcp-servers-restricted/read": [
+        {"server": "fininfo", "methods": ["initialize", "tools/list"], "tools": ["get_stock_aggregates"]},
+    ],
+    "mcp-servers-restricted/execute": [
+        {"server": "fininfo", "methods": ["initialize", "tools/list", "tools/call"], "tools": ["get_stock_aggregates"]},
+        # A second entry for the same server, merged with the first
+        {"server": "fininfo", "methods": ["resources/list"], "tools": ["print_stock_data"]},
+        # Method listed under tools only (backward compatibility)
+        {"server": "currenttime", "methods": [], "tools": ["tools/list", "current_time_by_timezone"]},
+    ],
+    "mcp-servers-unrestricted/execute": [
+        {"server": "currenttime", "methods": ["initialize", "tools/list", "tools/call"], "tools": ["tools/call"]},
+    ],
+}
+
+
+def validate_server_tool_access(server_name, method, tool_name, user_scopes, scopes_config):
+    """The rules of the auth server's scope check before it was compiled, as the reference for parity."""
+    if not scopes_config:
+        return True
+    for scope in user_scopes:
+        scope_config = scopes_config.get(scope, [])
+        if not isinstance(scope_config, list):
+            # The old check raised on these (UI-Scopes, group_mappings) and denied the whole
+            # request, even when another scope allowed it; the engine only ignores them
+            continue
+        for server_config in scope_config:
+            if server_config.get("server") != server_name:
+                continue
+            allowed_methods = server_config.get("methods", [])
+            if method in allowed_methods and method != "tools/call":
+                return True
+            allowed_tools = server_config.get("tools", [])
+            if method == "tools/call" and tool_name:
+                if tool_name in allowed_tools:
+                    return True
+            elif method in allowed_tools:
+                return True
+    return False
+
+
+@pytest.fixture
+def engine():
+    return ScopeEngine(SCOPES_CONFIG)
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestScopeEngine:
+    """Test suite for ScopeEngine decisions."""
+
+    def test_tools_call_checks_only_tools(self, engine):
+        """Test that tools/call with a tool name is decided by the tools list alone."""
+        scopes = ["mcp-servers-restricted/read"]
+
+        # The read scope lists the tool but not the tools/call method
+        assert engine.is_allowed(scopes, "fininfo", "tools/call", "get_stock_aggregates")
+        assert not engine.is_allowed(scopes, "fininfo", "tools/call", "print_stock_data")
+        # Listing tools/call as a method does not allow unlisted tools
+        assert not engine.is_allowed(["mcp-servers-restricted/execute"], "fininfo", "tools/call", "delete_everything")
+
+    def test_tools_call_without_tool_name(self, engine):
+        """Test that tools/call without a tool needs an explicit tools/call entry in tools."""
+        assert not engine.is_allowed(["mcp-servers-restricted/execute"], "fininfo", "tools/call")
+        assert engine.is_allowed(["mcp-servers-unrestricted/execute"], "currenttime", "tools/call")
+
+    def test_other_methods_allowed_by_methods_or_tools(self, engine):
+        """Test that other methods are allowed when listed under methods or tools."""
+        assert engine.is_allowed(["mcp-servers-restricted/read"], "fininfo", "tools/list")
+        assert engine.is_allowed(["mcp-servers-restricted/execute"], "currenttime", "tools/list")
+        assert not engine.is_allowed(["mcp-servers-restricted/read"], "fininfo", "resources/list")
+
+    def test_unknown_server_and_scope_denied(self, engine):
+        """Test that servers and scopes missing from the configuration are denied."""
+        assert not engine.is_allowed(["mcp-servers-restricted/read"], "unknown", "tools/list")
+        assert not engine.is_allowed(["no-such-scope"], "fininfo", "tools/list")
+        assert not engine.is_allowed([], "fininfo", "tools/list")
+
+    @pytest.mark.parametrize("scope", ["group_mappings", "UI-Scopes"])
+    def test_non_scope_keys_grant_nothing(self, engine, scope):
+        """Test that group_mappings and UI-Scopes are never treated as scopes."""
+        assert scope not in engine.grants
+        assert not engine.is_allowed([scope], "fininfo", "tools/list")
+        assert not engine.is_allowed([scope], "readers", "tools/list")
+
+    def test_entries_for_same_server_are_merged(self, engine):
+        """Test that two entries for one server within a scope are combined."""
+        methods, tools = compile_scopes(SCOPES_CONFIG)["mcp-servers-restricted/execute"]["fininfo"]
+
+        assert methods == {"initialize", "tools/list", "tools/call", "resources/list"}
+        assert tools == {"get_stock_aggregates", "print_stock_data"}
+        assert engine.is_allowed(["mcp-servers-restricted/execute"], "fininfo", "resources/list")
+        assert engine.is_allowed(["mcp-servers-restricted/execute"], "fininfo", "tools/call", "print_stock_data")
+
+    def test_empty_configuration_allows_everything(self):
+        """Test that no configuration leaves access unrestricted, as before."""
+        assert ScopeEngine({}).is_allowed([], "fininfo", "tools/call", "anything")
+        assert ScopeEngine(None).is_allowed(["x"], "fininfo", "tools/list")
+
+    def test_parity_with_uncompiled_rules(self, engine):
+        """Test that every decision matches the uncompiled scope check."""
+        scopes = list(SCOPES_CONFIG) + ["no-such-scope"]
+        servers = ["fininfo", "currenttime", "unknown"]
+        methods = ["initialize", "tools/list", "tools/call", "resources/list"]
+        tools = [None, "get_stock_aggregates", "print_stock_data", "current_time_by_timezone", "tools/call"]
+
+        for scope_count in range(3):
+            for user_scopes, server, method, tool in itertools.product(
+                itertools.combinations(scopes, scope_count), servers, methods, tools
+            ):
+                expected = validate_server_tool_access(server, method, tool, user_scopes, SCOPES_CONFIG)
+                assert engine.is_allowed(user_scopes, server, method, tool) == expected, (
+                    user_scopes, server, method, tool
+                )
+
+    def test_decisions_are_memoized(self, engine):
+        """Test that a repeat decision is served from the memo, whatever the scope order."""
+        engine.is_allowed(["mcp-servers-restricted/read", "no-such-scope"], "fininfo", "tools/list")
+        engine.is_allowed(["no-such-scope", "mcp-servers-restricted/read"], "fininfo", "tools/list")
+
+        assert engine.cache_info().hits == 1
+        assert engine.cache_info().misses == 1
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestGroupMappings:
+    """Test suite for mapping identity provider groups to scopes."""
+
+    def test_groups_map_to_scopes_in_sorted_order(self, engine):
+        """Test that scopes are unique and follow group name order, not request order."""
+        expected = [
+            "mcp-servers-unrestricted/execute",
+            "mcp-servers-restricted/execute",
+            "mcp-servers-restricted/read",
+        ]
+
+        assert engine.scopes_for_groups(["readers", "operators", "admins"]) == expected
+        assert engine.scopes_for_groups(["admins", "readers", "operators"]) == expected
+
+    def test_unknown_groups_map_to_nothing(self, engine):
+        """Test that groups without a mapping contribute no scopes."""
+        assert engine.scopes_for_groups(["strangers"]) == []
+        assert engine.scopes_for_groups(["strangers", "readers"]) == ["mcp-servers-restricted/read"]
+
+    def test_memo_does_not_survive_recompilation(self, engine):
+        """Test that a newly compiled configuration does not reuse decisions of the previous one."""
+        assert engine.scopes_for_groups(["readers"]) == ["mcp-servers-restricted/read"]
+        assert engine.is_allowed(["mcp-servers-restricted/read"], "fininfo", "tools/list")
+
+        updated = {
+            **SCOPES_CONFIG,
+            "group_mappings": {"readers": ["mcp-servers-restricted/execute"]},
+            "mcp-servers-restricted/read": [{"server": "fininfo", "methods": ["initialize"], "tools": []}],
+        }
+        recompiled = ScopeEngine(updated)
+
+        assert recompiled.scopes_for_groups(["readers"]) == ["mcp-servers-restricted/execute"]
+        assert not recompiled.is_allowed(["mcp-servers-restricted/read"], "fininfo", "tools/list")
+        assert recompiled.cache_info().hits == 0
+        assert recompiled.group_cache_info().hits == 0
+        # The previous version keeps answering for itself
+        assert engine.scopes_for_groups(["readers"]) == ["mcp-servers-restricted/read"]
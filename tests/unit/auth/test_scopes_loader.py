@@ -0,0 +1,98 @@
+"""
+Unit tests for the hot-reloadable scopes.yml loader.
+"""
+import hashlib
+import os
+import pytest
+import yaml
+
+from auth_server.scopes_loader import ScopesLoader, validate_scopes_config
+
+
+def _write(path, config, mtime_offset=0):
+    path.write_text(yaml.dump(config))
+    # Make sure the change is visible even on filesystems with coarse mtimes
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + mtime_offset))
+
+
+@pytest.fixture
+def scopes_file(tmp_path):
+    path = tmp_path / "scopes.yml"
+    _write(path, {
+        "group_mappings": {"admins": ["read"]},
+        "read": [{"server": "fininfo", "methods": ["tools/list"], "tools": []}],
+    })
+    return path
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestScopesLoader:
+    """Test suite for loading and hot-reloading scopes.yml."""
+
+    def test_initial_load(self, scopes_file):
+        """Test that the file is loaded and compiled as version 1."""
+        loader = ScopesLoader(scopes_file, compile=lambda config: sorted(config), poll_interval_seconds=0)
+        assert loader.version == 1
+        assert loader.config["group_mappings"] == {"admins": ["read"]}
+        assert loader.compiled == ["group_mappings", "read"]
+
+    def test_reload_on_change(self, scopes_file):
+        """Test that a changed file is swapped in as a new version and listeners are told."""
+        loader = ScopesLoader(scopes_file, poll_interval_seconds=0)
+        seen = []
+        loader.add_listener(seen.append)
+        assert loader.check_for_changes() is False
+
+        _write(scopes_file, {"group_mappings": {"admins": ["read", "execute"]}}, mtime_offset=1_000_000_000)
+        assert loader.check_for_changes() is True
+        assert loader.version == 2
+        assert loader.config["group_mappings"]["admins"] == ["read", "execute"]
+        assert [snapshot.version for snapshot in seen] == [2]
+
+    def test_content_hash(self, scopes_file, tmp_path):
+        """Test that the hash identifies the file's content, unlike the per-process version."""
+        loader = ScopesLoader(scopes_file, poll_interval_seconds=0)
+        assert loader.content_hash == hashlib.sha256(scopes_file.read_bytes()).hexdigest()
+
+        # Another process that loaded the same file reports the same hash at a different version
+        other = ScopesLoader(scopes_file, poll_interval_seconds=0)
+        other.reload()
+        assert (other.version, other.content_hash) == (2, loader.content_hash)
+
+        _write(scopes_file, {"group_mappings": {"admins": ["execute"]}}, mtime_offset=1_000_000_000)
+        loader.check_for_changes()
+        assert loader.content_hash == hashlib.sha256(scopes_file.read_bytes()).hexdigest()
+        assert loader.content_hash != other.content_hash
+
+        assert ScopesLoader(tmp_path / "missing.yml", poll_interval_seconds=0).content_hash is None
+
+    def test_invalid_file_keeps_current_version(self, scopes_file):
+        """Test that an invalid file is ignored and reported once."""
+        loader = ScopesLoader(scopes_file, poll_interval_seconds=0)
+        snapshot = loader.snapshot
+
+        _write(scopes_file, {"read": [{"methods": ["tools/list"]}]}, mtime_offset=1_000_000_000)
+        assert loader.check_for_changes() is False
+        assert loader.snapshot is snapshot
+        # Same broken file is not re-parsed on the next poll
+        assert loader.check_for_changes() is False
+
+    def test_missing_file(self, tmp_path):
+        """Test that a missing file yields an empty version 0."""
+        loader = ScopesLoader(tmp_path / "missing.yml", compile=len, poll_interval_seconds=0)
+        assert loader.version == 0
+        assert loader.config == {}
+        assert loader.compiled == 0
+
+    def test_validate_scopes_config(self):
+        """Test structural validation of scopes.yml."""
+        assert validate_scopes_config(None) == {}
+        assert validate_scopes_config({"UI-Scopes": {"admin": {"list_service": ["all"]}}})
+        with pytest.raises(ValueError):
+            validate_scopes_config(["read"])
+        with pytest.raises(ValueError):
+            validate_scopes_config({"group_mappings": {"admins": "read"}})
+        with pytest.raises(ValueError):
+            validate_scopes_config({"read": [{"server": "fininfo", "tools": "get_quote"}]})
@@ -0,0 +1,143 @@
+"""
+Unit tests for the auth server's token validation cache.
+"""
+import pytest
+
+from auth_server import token_cache
+from auth_server.token_cache import TokenValidationCache, get_expires_at
+
+
+class FakeClock:
+    """Stands in for the time module in token_cache."""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(token_cache, "time", clock)
+    return clock
+
+
+def _result(expires_at: float, username: str = "alice") -> dict:
+    return {"valid": True, "username": username, "expires_at": expires_at}
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestTokenValidationCache:
+    """Test suite for TokenValidationCache."""
+
+    def test_make_key_hashes_token_and_context(self):
+        """Test that keys never contain the token and depend on the validation context."""
+        key = TokenValidationCache.make_key("secret-token", "pool-a", "client-1")
+
+        assert "secret-token" not in key
+        assert len(key) == 64
+        assert key == TokenValidationCache.make_key("secret-token", "pool-a", "client-1")
+        assert key != TokenValidationCache.make_key("secret-token", "pool-b", "client-1")
+        assert key != TokenValidationCache.make_key("other-token", "pool-a", "client-1")
+
+    def test_get_expires_at(self):
+        """Test expiry lookup from the result or the decoded claims."""
+        assert get_expires_at({"expires_at": 123}) == 123.0
+        assert get_expires_at({"data": {"exp": 456}}) == 456.0
+        assert get_expires_at({"valid": True}) is None
+
+    def test_hit_until_token_expiry(self, clock):
+        """Test that a result is served until the token expires."""
+        cache = TokenValidationCache(max_ttl_seconds=300)
+        cache.put("k", _result(clock.now + 60))
+
+        clock.now += 59
+        assert cache.get("k")["username"] == "alice"
+
+        clock.now += 1
+        assert cache.get("k") is None
+        assert cache.stats() == {"entries": 0, "hits": 1, "misses": 1}
+
+    def test_ttl_bounded_by_max_ttl(self, clock):
+        """Test that a long-lived token is revalidated after the maximum TTL."""
+        cache = TokenValidationCache(max_ttl_seconds=300)
+        cache.put("k", _result(clock.now + 3600))
+
+        clock.now += 299
+        assert cache.get("k") is not None
+        clock.now += 1
+        assert cache.get("k") is None
+
+    def test_expired_token_is_not_cached(self, clock):
+        """Test that a result for an already expired token is rejected."""
+        cache = TokenValidationCache()
+        cache.put("k", _result(clock.now - 1))
+
+        assert cache.get("k") is None
+        assert cache.stats()["entries"] == 0
+
+    def test_result_without_expiry_is_not_cached(self, clock):
+        """Test that results with no known expiry are never cached."""
+        cache = TokenValidationCache()
+        cache.put("k", {"valid": True, "username": "alice"})
+
+        assert cache.get("k") is None
+
+    def test_lru_eviction(self, clock):
+        """Test that the least recently used entry is evicted at capacity."""
+        cache = TokenValidationCache(max_entries=2)
+        cache.put("a", _result(clock.now + 60, "a"))
+        cache.put("b", _result(clock.now + 60, "b"))
+        assert cache.get("a") is not None  # "b" is now least recently used
+
+        cache.put("c", _result(clock.now + 60, "c"))
+
+        assert cache.get("b") is None
+        assert cache.get("a")["username"] == "a"
+        assert cache.get("c")["username"] == "c"
+        assert cache.stats()["entries"] == 2
+
+    def test_negative_cache(self, clock):
+        """Test that failures are remembered for the negative TTL only."""
+        cache = TokenValidationCache(negative_ttl_seconds=5)
+        cache.put_failure("bad", "Invalid token signature")
+
+        assert cache.get_failure("bad") == "Invalid token signature"
+        # A remembered failure is not a cached success
+        assert cache.get("bad") is None
+
+        clock.now += 5
+        assert cache.get_failure("bad") is None
+
+    def test_success_replaces_failure(self, clock):
+        """Test that a later successful validation overrides a remembered failure."""
+        cache = TokenValidationCache()
+        cache.put_failure("k", "Token validation failed")
+        cache.put("k", _result(clock.now + 60))
+
+        assert cache.get_failure("k") is None
+        assert cache.get("k")["username"] == "alice"
+
+    @pytest.mark.parametrize("kwargs", [{"max_entries": 0}, {"max_ttl_seconds": 0, "negative_ttl_seconds": 0}])
+    def test_disabled(self, clock, kwargs):
+        """Test that a zero size or TTL disables caching."""
+        cache = TokenValidationCache(**kwargs)
+        cache.put("k", _result(clock.now + 60))
+        cache.put_failure("bad", "nope")
+
+        assert cache.get("k") is None
+        assert cache.get_failure("bad") is None
+
+    def test_clear(self, clock):
+        """Test that clear drops every entry."""
+        cache = TokenValidationCache()
+        cache.put("k", _result(clock.now + 60))
+        cache.put_failure("bad", "nope")
+
+        cache.clear()
+
+        assert cache.stats()["entries"] == 0
+        assert cache.get("k") is None
@@ -0,0 +1,125 @@
+"""
+Unit tests for the sampled /validate access log.
+"""
+import json
+import logging
+from unittest.mock import Mock
+
+import pytest
+
+from auth_server import validate_log
+from auth_server.validate_log import ValidateLogRecord
+
+LOGGER_NAME = "validate_access"
+
+
+@pytest.fixture
+def access_log(caplog):
+    caplog.set_level(logging.INFO, logger=LOGGER_NAME)
+    return caplog
+
+
+def _entries(caplog):
+    return [
+        (record.levelno, json.loads(record.getMessage()))
+        for record in caplog.records
+        if record.name == LOGGER_NAME
+    ]
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestValidateLogRecord:
+    """Test suite for ValidateLogRecord."""
+
+    def test_success_is_one_info_line(self, access_log):
+        """Test that a sampled success is written once at INFO with every field."""
+        record = ValidateLogRecord(sample_rate=1.0)
+        record.set(server="fininfo", rpc_method="tools/list")
+        record.set_lazy("user", lambda: "hashed-user")
+
+        record.emit(200)
+
+        [(level, entry)] = _entries(access_log)
+        assert level == logging.INFO
+        assert entry["event"] == "validate"
+        assert entry["status"] == 200
+        assert entry["server"] == "fininfo"
+        assert entry["user"] == "hashed-user"
+        assert "reason" not in entry
+        assert "sample_rate" not in entry
+        assert entry["duration_ms"] >= 0
+
+    @pytest.mark.parametrize("status_code", [401, 403, 500])
+    def test_denials_are_always_logged(self, access_log, status_code):
+        """Test that denials are written at WARNING with their reason, whatever the sample rate."""
+        record = ValidateLogRecord(sample_rate=0)
+
+        record.emit(status_code, "Invalid token: Signature verification failed")
+
+        [(level, entry)] = _entries(access_log)
+        assert level == logging.WARNING
+        assert entry["status"] == status_code
+        assert entry["reason"] == "Invalid token: Signature verification failed"
+
+    def test_zero_sample_rate_skips_successes(self, access_log):
+        """Test that sample_rate=0 writes nothing and computes no lazy field."""
+        compute = Mock(return_value="hashed-user")
+        record = ValidateLogRecord(sample_rate=0)
+        record.set_lazy("user", compute)
+
+        record.emit(200)
+
+        assert _entries(access_log) == []
+        compute.assert_not_called()
+
+    def test_disabled_info_level_skips_successes(self, caplog):
+        """Test that successes are not written when INFO is disabled for the access logger."""
+        caplog.set_level(logging.WARNING, logger=LOGGER_NAME)
+        compute = Mock(return_value="hashed-user")
+        record = ValidateLogRecord(sample_rate=1.0)
+        record.set_lazy("user", compute)
+
+        record.emit(200)
+        record.emit(401, "Token has expired")
+
+        assert [level for level, _ in _entries(caplog)] == [logging.WARNING]
+        # Computed once, for the denial
+        assert compute.call_count == 1
+
+    def test_unsampled_request_computes_no_lazy_field(self, access_log, monkeypatch):
+        """Test that a request left out by sampling costs no lazy evaluation."""
+        monkeypatch.setattr(validate_log.random, "random", lambda: 0.75)
+        compute = Mock(return_value="hashed-user")
+        record = ValidateLogRecord(sample_rate=0.5)
+        record.set_lazy("user", compute)
+
+        record.emit(200)
+
+        assert _entries(access_log) == []
+        compute.assert_not_called()
+
+    def test_sampled_request_records_sample_rate(self, access_log, monkeypatch):
+        """Test that a sampled success carries the rate, so counts can be scaled back up."""
+        monkeypatch.setattr(validate_log.random, "random", lambda: 0.25)
+        record = ValidateLogRecord(sample_rate=0.5)
+
+        record.emit(200)
+
+        [(_, entry)] = _entries(access_log)
+        assert entry["sample_rate"] == 0.5
+
+    def test_failing_lazy_field(self, access_log):
+        """Test that a lazy field that raises is logged as an error value, not dropped with the line."""
+        def fail():
+            raise RuntimeError("no client address")
+
+        record = ValidateLogRecord()
+        record.set_lazy("client_ip", fail)
+        record.set_lazy("user", lambda: "hashed-user")
+
+        record.emit(200)
+
+        [(_, entry)] = _entries(access_log)
+        assert entry["client_ip"] == "<error: no client address>"
+        assert entry["user"] == "hashed-user"
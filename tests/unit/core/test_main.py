@@ -1,11 +1,15 @@
 """
 Unit tests for main application module.
 """
+import hashlib
+import os
 import pytest
+import yaml
 from unittest.mock import Mock, patch, AsyncMock
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
+from auth_server.scopes_loader import ScopesLoader
 from registry.main import app, lifespan, health_check
 
 
@@ -22,6 +26,7 @@ class TestMainApplication:
             mock_settings.container_log_dir.mkdir = Mock()
             mock_settings.static_dir = "/static"
             mock_settings.templates_dir = "/templates"
+            mock_settings.health_worker_enabled = False
             yield mock_settings
 
     @pytest.fixture
@@ -30,7 +35,8 @@ class TestMainApplication:
         with patch('registry.main.server_service') as mock_server_service, \
              patch('registry.main.faiss_service') as mock_faiss_service, \
              patch('registry.main.health_service') as mock_health_service, \
-             patch('registry.main.nginx_service') as mock_nginx_service:
+             patch('registry.main.nginx_service') as mock_nginx_service, \
+             patch('registry.main.scopes_loader') as mock_scopes_loader:
             
             # Configure mocks
             mock_server_service.load_servers_and_state = Mock()
@@ -40,15 +46,20 @@ class TestMainApplication:
             mock_faiss_service.initialize = AsyncMock()
             
             mock_health_service.initialize = AsyncMock()
+            mock_health_service.start_worker = AsyncMock()
             mock_health_service.shutdown = AsyncMock()
             
-            mock_nginx_service.generate_config = Mock()
+            mock_nginx_service.generate_config_async = AsyncMock()
+            mock_nginx_service.start_public_dns_refresh = AsyncMock()
+            mock_nginx_service.stop_public_dns_refresh = AsyncMock()
+            mock_nginx_service.stop_reconciler = AsyncMock()
             
             yield {
                 'server_service': mock_server_service,
                 'faiss_service': mock_faiss_service,
                 'health_service': mock_health_service,
-                'nginx_service': mock_nginx_service
+                'nginx_service': mock_nginx_service,
+                'scopes_loader': mock_scopes_loader,
             }
 
     @pytest.mark.asyncio
@@ -61,11 +72,22 @@ class TestMainApplication:
             mock_services['server_service'].load_servers_and_state.assert_called_once()
             mock_services['faiss_service'].initialize.assert_called_once()
             mock_services['health_service'].initialize.assert_called_once()
-            mock_services['nginx_service'].generate_config.assert_called_once()
+            mock_services['health_service'].start_worker.assert_not_called()
+            mock_services['nginx_service'].generate_config_async.assert_called_once()
             
             # Verify log directory was created
             mock_settings.container_log_dir.mkdir.assert_called_once_with(parents=True, exist_ok=True)
 
+    @pytest.mark.asyncio
+    async def test_lifespan_starts_health_worker_when_enabled(self, mock_settings, mock_services):
+        """Test that the out-of-process health worker is started only when enabled."""
+        mock_settings.health_worker_enabled = True
+        test_app = FastAPI()
+
+        async with lifespan(test_app):
+            mock_services['health_service'].start_worker.assert_called_once()
+            mock_services['health_service'].initialize.assert_called_once()
+
     @pytest.mark.asyncio
     async def test_lifespan_startup_server_service_failure(self, mock_settings, mock_services):
         """Test startup failure during server service initialization."""
@@ -109,6 +131,9 @@ class TestMainApplication:
         
         # Verify shutdown was called
         mock_services['health_service'].shutdown.assert_called_once()
+        mock_services['scopes_loader'].stop_watching.assert_called_once()
+        mock_services['nginx_service'].stop_reconciler.assert_called_once()
+        mock_services['nginx_service'].stop_public_dns_refresh.assert_called_once()
 
     @pytest.mark.asyncio
     async def test_lifespan_shutdown_failure(self, mock_settings, mock_services):
@@ -124,9 +149,40 @@ class TestMainApplication:
     @pytest.mark.asyncio
     async def test_health_check(self):
         """Test health check endpoint."""
-        response = await health_check()
+        with patch('registry.main.scopes_loader') as mock_scopes_loader:
+            mock_scopes_loader.snapshot.version = 3
+            mock_scopes_loader.snapshot.content_hash = "abc123"
+            response = await health_check()
         
-        assert response == {"status": "healthy", "service": "mcp-gateway-registry"}
+        assert response == {
+            "status": "healthy",
+            "service": "mcp-gateway-registry",
+            "scopes_version": 3,
+            "scopes_hash": "abc123",
+        }
+
+    @pytest.mark.asyncio
+    async def test_health_check_reports_reloaded_scopes_version(self, tmp_path):
+        """Test that /health reports the new scopes version after scopes.yml is reloaded."""
+        scopes_file = tmp_path / "scopes.yml"
+        scopes_file.write_text(yaml.dump({"group_mappings": {"admins": ["read"]}}))
+        loader = ScopesLoader(scopes_file, poll_interval_seconds=0)
+
+        with patch('registry.main.scopes_loader', loader):
+            before = await health_check()
+
+            scopes_file.write_text(yaml.dump({"group_mappings": {"admins": ["read", "execute"]}}))
+            stat = scopes_file.stat()
+            os.utime(scopes_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+            assert loader.check_for_changes() is True
+
+            after = await health_check()
+
+        assert before["scopes_version"] == 1
+        assert after["scopes_version"] == 2
+        # The hash identifies the file's content, so it changes with it
+        assert after["scopes_hash"] == hashlib.sha256(scopes_file.read_bytes()).hexdigest()
+        assert before["scopes_hash"] != after["scopes_hash"]
 
     def test_app_configuration(self):
         """Test FastAPI app configuration."""
@@ -143,11 +199,19 @@ class TestMainApplication:
         with patch('registry.main.server_service'), \
              patch('registry.main.faiss_service'), \
              patch('registry.main.health_service'), \
-             patch('registry.main.nginx_service'):
+             patch('registry.main.nginx_service'), \
+             patch('registry.main.scopes_loader') as mock_scopes_loader:
+            mock_scopes_loader.snapshot.version = 1
+            mock_scopes_loader.snapshot.content_hash = "abc123"
             
             response = client.get("/health")
             assert response.status_code == 200
-            assert response.json() == {"status": "healthy", "service": "mcp-gateway-registry"}
+            assert response.json() == {
+                "status": "healthy",
+                "service": "mcp-gateway-registry",
+                "scopes_version": 1,
+                "scopes_hash": "abc123",
+            }
 
     def test_static_files_mounted(self):
         """Test that static files are properly mounted."""
@@ -179,8 +243,8 @@ class TestMainApplication:
             pass
         
         # Verify nginx config was generated with correct servers
-        mock_services['nginx_service'].generate_config.assert_called_once()
-        call_args = mock_services['nginx_service'].generate_config.call_args[0][0]
+        mock_services['nginx_service'].generate_config_async.assert_called_once()
+        call_args = mock_services['nginx_service'].generate_config_async.call_args[0][0]
         
         # Check that enabled servers were passed to nginx config
         assert "service1" in call_args
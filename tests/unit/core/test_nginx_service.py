@@ -1,13 +1,20 @@
 """
 Unit tests for the Nginx configuration service.
 """
+import asyncio
+import json
+import os
 import pytest
 from pathlib import Path
-from unittest.mock import Mock, patch, mock_open
+from unittest.mock import AsyncMock, Mock, patch, mock_open
 import tempfile
 import shutil
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
 
-from registry.core.nginx_service import NginxConfigService
+import httpx
+
+from registry.core.nginx_service import NginxConfigService, get_response_cache_version, get_upstream_name
 
 
 @pytest.mark.unit
@@ -22,6 +29,7 @@ class TestNginxConfigService:
         mock_settings = Mock()
         mock_settings.container_registry_dir = temp_dir
         mock_settings.nginx_config_path = temp_dir / "nginx.conf"
+        mock_settings.ec2_public_dns = ""
         
         # Patch settings for the duration of each test
         with patch('registry.core.nginx_service.settings', mock_settings):
@@ -327,4 +335,769 @@ http {
         # All paths should be included as-is (no normalization in current implementation)
         assert "location /api/test/ {" in config_content
         assert "location api/test2 {" in config_content
-        assert "location /api/test3// {" in config_content 
\ No newline at end of file
+        assert "location /api/test3// {" in config_content 
+
+@pytest.mark.unit
+@pytest.mark.core
+class TestNginxConfigDiffing:
+    """Test that config generation skips writes and reloads when nothing changed."""
+
+    @pytest.fixture
+    def temp_dir(self):
+        temp_dir = Path(tempfile.mkdtemp())
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    @pytest.fixture
+    def service(self, temp_dir):
+        template_path = temp_dir / "nginx_template.conf"
+        template_path.write_text("server {\n{{LOCATION_BLOCKS}}\n# {{EC2_PUBLIC_DNS}}\n}\n")
+
+        mock_settings = Mock()
+        mock_settings.nginx_config_path = temp_dir / "nginx.conf"
+        mock_settings.ec2_public_dns = ""
+        mock_settings.nginx_upstream_keepalive = 32
+        mock_settings.nginx_upstream_keepalive_requests = 1000
+        mock_settings.nginx_upstream_keepalive_timeout_seconds = 60
+        mock_settings.nginx_response_cache_enabled = True
+        mock_settings.nginx_response_cache_ttl_seconds = 300
+
+        service = NginxConfigService()
+        service.nginx_template_path = template_path
+        with patch('registry.core.nginx_service.settings', mock_settings), \
+             patch('registry.health.service.health_service') as mock_health, \
+             patch.object(service, 'get_ec2_public_dns', return_value=""), \
+             patch.object(service, 'validate_nginx_config', new_callable=AsyncMock, return_value=True), \
+             patch.object(service, 'reload_nginx_async', new_callable=AsyncMock, return_value=Mock(success=True)) as mock_reload:
+            mock_health.server_health_status = {"/a": "healthy", "/b": "healthy"}
+            self.config_path = mock_settings.nginx_config_path
+            self.mock_reload = mock_reload
+            self.mock_health = mock_health
+            yield service
+
+    @pytest.mark.asyncio
+    async def test_unchanged_config_skips_write_and_reload(self, service):
+        servers = {"/a": {"proxy_pass_url": "http://a:8000"}}
+
+        assert await service.generate_config_async(servers) is True
+        assert self.mock_reload.call_count == 1
+        mtime = self.config_path.stat().st_mtime_ns
+
+        assert await service.generate_config_async(servers) is True
+        assert self.mock_reload.call_count == 1
+        assert self.config_path.stat().st_mtime_ns == mtime
+
+    @pytest.mark.asyncio
+    async def test_changed_health_triggers_reload(self, service):
+        servers = {"/a": {"proxy_pass_url": "http://a:8000"}}
+        await service.generate_config_async(servers)
+
+        self.mock_health.server_health_status["/a"] = "unhealthy: timeout"
+        await service.generate_config_async(servers)
+
+        assert self.mock_reload.call_count == 2
+        assert "Service currently unhealthy" in self.config_path.read_text()
+
+    @pytest.mark.asyncio
+    async def test_degraded_health_does_not_reload(self, service):
+        servers = {"/a": {"proxy_pass_url": "http://a:8000"}}
+        await service.generate_config_async(servers)
+        config = self.config_path.read_text()
+
+        self.mock_health.server_health_status["/a"] = "degraded"
+        await service.generate_config_async(servers)
+
+        assert self.mock_reload.call_count == 1
+        assert self.config_path.read_text() == config
+
+    @pytest.mark.asyncio
+    async def test_failed_reload_is_retried(self, service):
+        servers = {"/a": {"proxy_pass_url": "http://a:8000"}}
+        self.mock_reload.return_value = Mock(success=False)
+        await service.generate_config_async(servers)
+
+        self.mock_reload.return_value = Mock(success=True)
+        await service.generate_config_async(servers)
+
+        assert self.mock_reload.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_existing_config_on_disk_is_not_reapplied(self, service):
+        servers = {"/a": {"proxy_pass_url": "http://a:8000"}}
+        await service.generate_config_async(servers)
+
+        # A fresh service (e.g. after restart) sees the identical config already on disk
+        restarted = NginxConfigService()
+        restarted.nginx_template_path = service.nginx_template_path
+        with patch.object(restarted, 'get_ec2_public_dns', return_value=""), \
+             patch.object(restarted, 'validate_nginx_config', new_callable=AsyncMock, return_value=True), \
+             patch.object(restarted, 'reload_nginx_async', new_callable=AsyncMock) as restarted_reload:
+            await restarted.generate_config_async(servers)
+
+        restarted_reload.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_location_blocks_are_memoized(self, service):
+        servers = {
+            "/a": {"proxy_pass_url": "http://a:8000"},
+            "/b": {"proxy_pass_url": "http://b:8000"},
+        }
+        with patch.object(service, '_generate_transport_location_blocks', wraps=service._generate_transport_location_blocks) as mock_generate:
+            await service.generate_config_async(servers)
+            await service.generate_config_async(servers)
+            assert mock_generate.call_count == 2
+
+            servers["/b"] = {"proxy_pass_url": "http://b:9000"}
+            await service.generate_config_async(servers)
+            assert mock_generate.call_count == 3
+
+        # Entries for superseded inputs are evicted
+        assert len(service._location_block_cache) == 2
+
+    @pytest.mark.asyncio
+    async def test_template_is_cached(self, service):
+        servers = {"/a": {"proxy_pass_url": "http://a:8000"}}
+        with patch('builtins.open', wraps=open) as mock_file_open:
+            await service.generate_config_async(servers)
+            await service.generate_config_async(servers)
+        template_reads = [c for c in mock_file_open.call_args_list if c.args[0] == service.nginx_template_path]
+        assert len(template_reads) == 1
+
+
+    @pytest.mark.asyncio
+    async def test_auth_cache_rendered(self, service):
+        """Test that the auth_request cache zone and /validate settings are emitted when enabled."""
+        service.nginx_template_path.write_text("{{AUTH_CACHE_ZONE}}\nlocation = /validate {\n{{AUTH_CACHE_SETTINGS}}\n}\n")
+        with patch('registry.core.nginx_service.settings.nginx_auth_cache_enabled', True), \
+             patch('registry.core.nginx_service.settings.nginx_auth_cache_path', "/var/cache/nginx/auth"):
+            await service.generate_config_async({})
+
+        config = self.config_path.read_text()
+        assert "proxy_cache_path /var/cache/nginx/auth " in config
+        assert "keys_zone=auth_cache:" in config
+        assert "proxy_cache_key $http_x_auth_cache_key;" in config
+        assert "proxy_cache_bypass $auth_cache_skip;" in config
+
+    @pytest.mark.asyncio
+    async def test_auth_cache_disabled(self, service):
+        """Test that no cache directives are emitted when the auth cache is disabled."""
+        service.nginx_template_path.write_text("{{AUTH_CACHE_ZONE}}\nlocation = /validate {\n{{AUTH_CACHE_SETTINGS}}\n}\n")
+        with patch('registry.core.nginx_service.settings.nginx_auth_cache_enabled', False):
+            await service.generate_config_async({})
+
+        config = self.config_path.read_text()
+        assert "proxy_cache" not in config
+        assert "{{" not in config
+
+@pytest.mark.unit
+@pytest.mark.core
+class TestNginxUpstreams:
+    """Test keepalive upstream generation."""
+
+    @pytest.fixture
+    def service(self):
+        mock_settings = Mock()
+        mock_settings.nginx_upstream_keepalive = 32
+        mock_settings.nginx_upstream_keepalive_requests = 1000
+        mock_settings.nginx_upstream_keepalive_timeout_seconds = 60
+        mock_settings.nginx_response_cache_enabled = True
+        mock_settings.nginx_response_cache_ttl_seconds = 300
+        with patch('registry.core.nginx_service.settings', mock_settings):
+            self.mock_settings = mock_settings
+            yield NginxConfigService()
+
+    def test_upstream_name(self):
+        """Test that upstream names are derived from scheme, host and port."""
+        assert get_upstream_name("http://atlassian-server:8005/mcp/") == "mcp_http_atlassian_server_8005"
+        assert get_upstream_name("https://api.example.com/mcp") == "mcp_https_api_example_com_443"
+        assert get_upstream_name("http://localhost") == "mcp_http_localhost_80"
+
+    def test_upstream_defaults(self, service):
+        """Test one upstream per backend with default keepalive settings."""
+        blocks = service._generate_upstream_blocks({
+            "/a": {"proxy_pass_url": "http://backend:8000/a/"},
+            "/b": {"proxy_pass_url": "http://backend:8000/b/"},
+            "/c": {"proxy_pass_url": "http://other:9000/"},
+        })
+        assert len(blocks) == 2
+        assert "upstream mcp_http_backend_8000 {" in blocks[0]
+        assert "server backend:8000;" in blocks[0]
+        assert "keepalive 32;" in blocks[0]
+        assert "keepalive_requests 1000;" in blocks[0]
+        assert "keepalive_timeout 60s;" in blocks[0]
+
+    def test_upstream_per_server_overrides(self, service):
+        """Test that per-server settings apply and shared backends take the largest value."""
+        blocks = service._generate_upstream_blocks({
+            "/a": {"proxy_pass_url": "http://backend:8000/a/", "keepalive": 64, "keepalive_timeout": "2m"},
+            "/b": {"proxy_pass_url": "http://backend:8000/b/", "keepalive_requests": 5000},
+        })
+        assert len(blocks) == 1
+        assert "keepalive 64;" in blocks[0]
+        assert "keepalive_requests 5000;" in blocks[0]
+        assert "keepalive_timeout 120s;" in blocks[0]
+
+    def test_upstream_invalid_settings_use_defaults(self, service):
+        """Test that invalid per-server settings fall back to defaults."""
+        blocks = service._generate_upstream_blocks({
+            "/a": {"proxy_pass_url": "http://backend:8000/", "keepalive_timeout": "soon"},
+        })
+        assert "keepalive_timeout 60s;" in blocks[0]
+
+    def test_location_block_uses_upstream(self, service):
+        """Test that location blocks proxy through the named upstream with the original URI."""
+        block = service._create_location_block("/atlassian", "http://atlassian-server:8005/mcp/", "streamable-http")
+        assert "proxy_pass http://mcp_http_atlassian_server_8005/mcp/;" in block
+        assert 'proxy_set_header Connection "";' in block
+        assert "proxy_ssl_name" not in block
+
+    def test_location_block_https_sets_sni(self, service):
+        """Test that https upstreams send the real hostname for SNI."""
+        block = service._create_location_block("/remote", "https://api.example.com/mcp", "streamable-http")
+        assert "proxy_pass https://mcp_https_api_example_com_443/mcp;" in block
+        assert "proxy_ssl_server_name on;" in block
+        assert "proxy_ssl_name api.example.com;" in block
+        assert "proxy_set_header Host api.example.com;" in block
+
+
+    def test_multi_instance_upstream(self, service):
+        """Test a weighted least_conn upstream for multi-instance servers, without failing endpoints."""
+        server_info = {
+            "proxy_pass_url": "http://fininfo-1:8000/mcp/",
+            "endpoints": [
+                {"url": "http://fininfo-1:8000/mcp/", "weight": 3},
+                {"url": "http://fininfo-2:8000/mcp/"},
+                {"url": "http://fininfo-3:8000/mcp/"},
+            ],
+        }
+        blocks = service._generate_upstream_blocks(
+            {"/fininfo/": server_info},
+            {"/fininfo/": {"http://fininfo-3:8000/mcp/": "unhealthy: timeout"}},
+        )
+        assert len(blocks) == 1
+        assert "upstream mcp_srv_fininfo {" in blocks[0]
+        assert "least_conn;" in blocks[0]
+        assert "server fininfo-1:8000 weight=3;" in blocks[0]
+        assert "server fininfo-2:8000 weight=1;" in blocks[0]
+        assert "fininfo-3" not in blocks[0]
+
+    def test_multi_instance_degraded_endpoint_weighted_down(self, service):
+        """Test that healthy endpoints outweigh degraded ones, whatever the balancing method."""
+        self.mock_settings.nginx_degraded_endpoint_weight_divisor = 4
+        server_info = {
+            "proxy_pass_url": "http://fininfo-1:8000/mcp/",
+            "load_balancing": "hash",
+            "endpoints": [
+                {"url": "http://fininfo-1:8000/mcp/", "weight": 2},
+                {"url": "http://fininfo-2:8000/mcp/"},
+            ],
+        }
+        blocks = service._generate_upstream_blocks(
+            {"/fininfo/": server_info},
+            {"/fininfo/": {"http://fininfo-1:8000/mcp/": "degraded", "http://fininfo-2:8000/mcp/": "healthy"}},
+        )
+        assert "server fininfo-1:8000 weight=2;" in blocks[0]
+        assert "server fininfo-2:8000 weight=4;" in blocks[0]
+
+        # With every endpoint degraded there is nothing faster to prefer
+        blocks = service._generate_upstream_blocks(
+            {"/fininfo/": server_info},
+            {"/fininfo/": {"http://fininfo-1:8000/mcp/": "degraded", "http://fininfo-2:8000/mcp/": "degraded"}},
+        )
+        assert "server fininfo-1:8000 weight=2;" in blocks[0]
+        assert "server fininfo-2:8000 weight=1;" in blocks[0]
+
+    def test_multi_instance_hash_upstream(self, service):
+        """Test consistent hashing on the MCP session."""
+        blocks = service._generate_upstream_blocks({
+            "/fininfo/": {
+                "proxy_pass_url": "http://fininfo-1:8000/mcp/",
+                "load_balancing": "hash",
+                "endpoints": [{"url": "http://fininfo-1:8000/mcp/"}, {"url": "http://fininfo-2:8000/mcp/"}],
+            },
+        })
+        assert "hash $mcp_session_key consistent;" in blocks[0]
+        assert "least_conn" not in blocks[0]
+
+    def test_multi_instance_location_pins_sessions(self, service):
+        """Test that least_conn streamable-http servers pin MCP sessions to their instance."""
+        blocks = service._generate_transport_location_blocks("/fininfo/", {
+            "proxy_pass_url": "http://fininfo-1:8000/mcp/",
+            "endpoints": [{"url": "http://fininfo-1:8000/mcp/"}, {"url": "http://fininfo-2:8000/mcp/"}],
+        })
+        block = blocks[0]
+        assert "set_by_lua_file $mcp_peer /etc/nginx/lua/session_peer.lua mcp_srv_fininfo;" in block
+        assert 'rewrite "^/fininfo/(.*)$" /mcp/$1 break;' in block
+        assert "header_filter_by_lua_file /etc/nginx/lua/session_learn.lua;" in block
+        assert "proxy_pass http://$mcp_peer;" in block
+
+    def test_multi_instance_hash_location(self, service):
+        """Test that hash balanced servers proxy straight to their upstream."""
+        blocks = service._generate_transport_location_blocks("/fininfo/", {
+            "proxy_pass_url": "http://fininfo-1:8000/mcp/",
+            "load_balancing": "hash",
+            "endpoints": [{"url": "http://fininfo-1:8000/mcp/"}, {"url": "http://fininfo-2:8000/mcp/"}],
+        })
+        assert "proxy_pass http://mcp_srv_fininfo/mcp/;" in blocks[0]
+        assert "session_peer.lua" not in blocks[0]
+
+    def test_listing_response_cache(self, service):
+        """Test that streamable-http locations cache listings under the tool-list version."""
+        server_info = {"proxy_pass_url": "http://fininfo:8000/mcp/", "tool_list": [{"name": "quote"}]}
+        version = get_response_cache_version(server_info)
+        block = service._generate_transport_location_blocks("/fininfo/", server_info)[0]
+        assert f'set $mcp_cache_version "{version}";' in block
+        assert "set $mcp_cache_ttl 300;" in block
+        assert "access_by_lua_file /etc/nginx/lua/response_cache.lua;" in block
+        assert "body_filter_by_lua_file /etc/nginx/lua/response_cache_store.lua;" in block
+
+        changed = dict(server_info, tool_list=[{"name": "quote"}, {"name": "history"}])
+        assert get_response_cache_version(changed) != version
+        assert service._location_block_key("/fininfo/", changed, "healthy") != \
+            service._location_block_key("/fininfo/", server_info, "healthy")
+
+    def test_listing_response_cache_skipped(self, service):
+        """Test that SSE locations and a disabled cache emit no response cache."""
+        sse_block = service._generate_transport_location_blocks(
+            "/sse/", {"proxy_pass_url": "http://sse:8000/sse", "supported_transports": ["sse"]}
+        )[0]
+        assert "response_cache" not in sse_block
+
+        self.mock_settings.nginx_response_cache_enabled = False
+        block = service._generate_transport_location_blocks("/fininfo/", {"proxy_pass_url": "http://fininfo:8000/mcp/"})[0]
+        assert "response_cache" not in block
+        assert get_response_cache_version({"tool_list": []}) is None
+
+@pytest.mark.unit
+@pytest.mark.core
+class TestNginxDynamicRouting:
+    """Test the shared-dict routing mode and its fallback to file-based routing."""
+
+    @pytest.fixture
+    def temp_dir(self):
+        temp_dir = Path(tempfile.mkdtemp())
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    @pytest.fixture
+    def service(self, temp_dir):
+        template_path = temp_dir / "nginx_template.conf"
+        template_path.write_text("location / {{{DYNAMIC_ROUTING_HOOK}}\n}\n{{LOCATION_BLOCKS}}\n")
+
+        mock_settings = Mock()
+        mock_settings.nginx_config_path = temp_dir / "nginx.conf"
+        mock_settings.ec2_public_dns = ""
+        mock_settings.nginx_routing_mode = "dynamic"
+        mock_settings.nginx_admin_url = "http://127.0.0.1:8089/_mcp/routes"
+        mock_settings.nginx_dns_resolver = "127.0.0.11"
+        mock_settings.nginx_response_cache_enabled = False
+        mock_settings.nginx_upstream_keepalive = 32
+        mock_settings.nginx_upstream_keepalive_requests = 1000
+        mock_settings.nginx_upstream_keepalive_timeout_seconds = 60
+
+        service = NginxConfigService()
+        service.nginx_template_path = template_path
+        with patch('registry.core.nginx_service.settings', mock_settings), \
+             patch('registry.health.service.health_service') as mock_health, \
+             patch.object(service, 'get_ec2_public_dns', return_value=""), \
+             patch.object(service, 'validate_nginx_config', new_callable=AsyncMock, return_value=True), \
+             patch.object(service, 'reload_nginx_async', new_callable=AsyncMock, return_value=Mock(success=True)) as mock_reload:
+            mock_health.server_health_status = {"/a": "healthy"}
+            self.config_path = mock_settings.nginx_config_path
+            self.mock_reload = mock_reload
+            self.mock_health = mock_health
+            yield service
+
+    def test_build_route_table(self, service):
+        """Test that routes mirror the per-server location block mapping."""
+        self.mock_health.server_health_status = {"/a/": "healthy", "/ext": "healthy"}
+        routes = service.build_route_table({
+            "/a/": {"proxy_pass_url": "http://a:8000/mcp/", "supported_transports": ["sse"]},
+            "/ext": {"proxy_pass_url": "https://api.example.com"},
+            "/b": {"proxy_pass_url": "http://b:8000/"},
+        })
+        assert routes["/a"] == {
+            "prefix": "/a/",
+            "base": "http://a:8000",
+            "endpoints": [{"base": "http://a:8000", "weight": 1}],
+            "uri": "/mcp/",
+            "host": None,
+            "ssl_name": "a",
+            "transport": "sse",
+            "healthy": True,
+            "cache_version": None,
+        }
+        assert routes["/ext"]["uri"] is None
+        assert routes["/ext"]["host"] == "api.example.com"
+        assert routes["/b"]["healthy"] is False
+
+    @pytest.mark.asyncio
+    async def test_push_routes(self, service):
+        """Test that the route table is PUT to the admin endpoint."""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json={"count": 1})
+
+        real_client = httpx.AsyncClient
+        with patch('registry.core.nginx_service.httpx.AsyncClient',
+                   side_effect=lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs)):
+            assert await service.push_routes({"/a": {"proxy_pass_url": "http://a:8000/"}}) is True
+
+        assert requests[0].method == "PUT"
+        payload = json.loads(requests[0].content)
+        assert set(payload["routes"]) == {"/a"}
+        assert payload["version"]
+
+    @pytest.mark.asyncio
+    async def test_push_routes_unreachable(self, service):
+        """Test that an unreachable admin endpoint reports failure."""
+        def handler(request):
+            raise httpx.ConnectError("connection refused")
+
+        real_client = httpx.AsyncClient
+        with patch('registry.core.nginx_service.httpx.AsyncClient',
+                   side_effect=lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs)):
+            assert await service.push_routes({"/a": {"proxy_pass_url": "http://a:8000/"}}) is False
+
+    @pytest.mark.asyncio
+    async def test_health_change_does_not_reload(self, service):
+        """Test that dynamic mode renders one generic location and only pushes on changes."""
+        servers = {"/a": {"proxy_pass_url": "http://a:8000/"}}
+        with patch.object(service, 'push_routes', new_callable=AsyncMock, return_value=True) as mock_push:
+            await service.generate_config_async(servers)
+            self.mock_health.server_health_status["/a"] = "unhealthy: timeout"
+            await service.generate_config_async(servers)
+
+        config = self.config_path.read_text()
+        assert "location @mcp_dynamic" in config
+        assert "rewrite_by_lua_file /etc/nginx/lua/dynamic_route.lua;" in config
+        assert "location /a/" not in config
+        assert mock_push.call_count == 2
+        assert self.mock_reload.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_file_routing(self, service):
+        """Test that per-server location blocks are rendered when routes cannot be pushed."""
+        servers = {"/a": {"proxy_pass_url": "http://a:8000/"}}
+        with patch.object(service, 'push_routes', new_callable=AsyncMock, return_value=False):
+            await service.generate_config_async(servers)
+
+        config = self.config_path.read_text()
+        assert service.dynamic_routing_active is False
+        assert "location /a {" in config
+        assert "@mcp_dynamic" not in config
+        assert "dynamic_route.lua" not in config
+
+
+@pytest.mark.unit
+@pytest.mark.core
+class TestNginxReconciler:
+    """Test the coalescing reconcile loop."""
+
+    @pytest.fixture
+    def service(self):
+        mock_settings = Mock()
+        mock_settings.nginx_reload_debounce_seconds = 0.05
+        mock_settings.nginx_reload_min_interval_seconds = 0.0
+        service = NginxConfigService()
+        with patch('registry.core.nginx_service.settings', mock_settings), \
+             patch.object(service, '_get_enabled_servers', return_value={}), \
+             patch.object(service, 'generate_config_async', new_callable=AsyncMock) as mock_generate:
+            self.mock_settings = mock_settings
+            self.mock_generate = mock_generate
+            yield service
+
+    @pytest.mark.asyncio
+    async def test_burst_is_coalesced(self, service):
+        for i in range(10):
+            service.request_reconcile(f"toggle: /svc{i}")
+        await asyncio.sleep(0.15)
+        await service.stop_reconciler()
+
+        assert self.mock_generate.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_request_during_reconcile_converges(self, service):
+        async def slow_generate(servers):
+            await asyncio.sleep(0.05)
+
+        self.mock_generate.side_effect = slow_generate
+        service.request_reconcile("first")
+        await asyncio.sleep(0.07)  # inside the first generation
+        service.request_reconcile("second")
+        await asyncio.sleep(0.2)
+        await service.stop_reconciler()
+
+        assert self.mock_generate.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_min_interval_between_reloads(self, service):
+        self.mock_settings.nginx_reload_min_interval_seconds = 0.3
+        service.request_reconcile("first")
+        await asyncio.sleep(0.1)
+        service.request_reconcile("second")
+        await asyncio.sleep(0.1)
+        assert self.mock_generate.call_count == 1
+
+        await asyncio.sleep(0.25)
+        await service.stop_reconciler()
+        assert self.mock_generate.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_route_push_backs_off(self, service):
+        self.mock_settings.nginx_route_push_retry_seconds = 1.0
+        self.mock_settings.nginx_route_push_retry_max_seconds = 8.0
+        loop = asyncio.get_running_loop()
+        with patch.object(loop, 'call_later') as mock_call_later:
+            for _ in range(6):
+                service._schedule_route_push_retry()
+
+        delays = [call.args[0] for call in mock_call_later.call_args_list]
+        assert delays == [1.0, 2.0, 4.0, 8.0, 8.0, 8.0]
+
+    @pytest.mark.asyncio
+    async def test_route_push_retry_resets_after_success(self, service):
+        self.mock_settings.nginx_routing_mode = "dynamic"
+        self.mock_settings.nginx_route_push_retry_seconds = 0.05
+        self.mock_settings.nginx_route_push_retry_max_seconds = 1.0
+
+        async def push_succeeds_on_fourth_attempt(servers):
+            service.dynamic_routing_active = self.mock_generate.call_count >= 4
+
+        self.mock_generate.side_effect = push_succeeds_on_fourth_attempt
+        service.request_reconcile("startup")
+        # Passes at ~0.05s, then retries after 0.05s, 0.1s and 0.2s (plus debounce)
+        await asyncio.sleep(0.8)
+
+        assert self.mock_generate.call_count == 4
+        assert service._route_push_failures == 0
+        assert service._route_push_retry is None
+
+        await asyncio.sleep(0.2)
+        await service.stop_reconciler()
+        assert self.mock_generate.call_count == 4
+
+    def test_request_without_event_loop_applies_immediately(self, service):
+        with patch.object(service, 'generate_config') as mock_generate_sync:
+            service.request_reconcile("script")
+        mock_generate_sync.assert_called_once_with({})
+
+
+@pytest.mark.unit
+@pytest.mark.core
+class TestNginxValidation:
+    """Test nginx -t validation before applying a new config."""
+
+    @pytest.fixture
+    def temp_dir(self):
+        temp_dir = Path(tempfile.mkdtemp())
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    @pytest.mark.asyncio
+    async def test_invalid_config_is_rolled_back(self, temp_dir):
+        template_path = temp_dir / "nginx_template.conf"
+        template_path.write_text("server {\n{{LOCATION_BLOCKS}}\n}\n")
+        config_path = temp_dir / "nginx.conf"
+        config_path.write_text("previous config")
+
+        mock_settings = Mock()
+        mock_settings.nginx_config_path = config_path
+        mock_settings.ec2_public_dns = ""
+        service = NginxConfigService()
+        service.nginx_template_path = template_path
+
+        with patch('registry.core.nginx_service.settings', mock_settings), \
+             patch('registry.health.service.health_service') as mock_health, \
+             patch.object(service, 'get_ec2_public_dns', new_callable=AsyncMock, return_value=""), \
+             patch.object(service, 'validate_nginx_config', new_callable=AsyncMock, return_value=False), \
+             patch.object(service, 'reload_nginx_async', new_callable=AsyncMock) as mock_reload:
+            mock_health.server_health_status = {"/a": "healthy"}
+            result = await service.generate_config_async({"/a": {"proxy_pass_url": "http://a:8000"}})
+
+        assert result is False
+        assert config_path.read_text() == "previous config"
+        mock_reload.assert_not_called()
+
+    @pytest.fixture
+    def fake_nginx(self, temp_dir, monkeypatch):
+        """Put a fake nginx on PATH that logs its arguments and exits with $FAKE_NGINX_EXIT."""
+        bin_dir = temp_dir / "bin"
+        bin_dir.mkdir()
+        calls_log = temp_dir / "calls.log"
+        script = bin_dir / "nginx"
+        script.write_text(
+            "#!/bin/sh\n"
+            f'echo "$@" >> "{calls_log}"\n'
+            'if [ -n "$FAKE_NGINX_SLEEP" ]; then exec sleep "$FAKE_NGINX_SLEEP"; fi\n'
+            'echo "fake nginx: $@" >&2\n'
+            'exit "${FAKE_NGINX_EXIT:-0}"\n'
+        )
+        script.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}")
+        return calls_log
+
+    @pytest.mark.asyncio
+    async def test_validate_with_fake_nginx(self, fake_nginx, monkeypatch):
+        service = NginxConfigService()
+        assert await service.validate_nginx_config() is True
+
+        monkeypatch.setenv("FAKE_NGINX_EXIT", "1")
+        assert await service.validate_nginx_config() is False
+        assert fake_nginx.read_text().splitlines() == ["-t", "-t"]
+
+    @pytest.mark.asyncio
+    async def test_reload_with_fake_nginx_records_event(self, fake_nginx):
+        service = NginxConfigService()
+        result = await service.reload_nginx_async()
+
+        assert result.success is True
+        assert result.returncode == 0
+        assert result.command == "nginx -s reload"
+        assert "fake nginx: -s reload" in result.stderr
+        assert service.get_command_events()[0]["command"] == "nginx -s reload"
+
+    @pytest.mark.asyncio
+    async def test_command_timeout(self, fake_nginx, monkeypatch):
+        monkeypatch.setenv("FAKE_NGINX_SLEEP", "5")
+        mock_settings = Mock()
+        mock_settings.nginx_command_timeout_seconds = 0.2
+        service = NginxConfigService()
+        with patch('registry.core.nginx_service.settings', mock_settings):
+            result = await service.reload_nginx_async()
+
+        assert result.success is False
+        assert result.timed_out is True
+
+    @pytest.mark.asyncio
+    async def test_nginx_missing(self, temp_dir, monkeypatch):
+        monkeypatch.setenv("PATH", str(temp_dir))
+        service = NginxConfigService()
+        assert await service.validate_nginx_config() is True
+        result = await service.reload_nginx_async()
+        assert result.success is False
+        assert result.nginx_missing is True
+
+    def test_atomic_write_replaces_file(self, temp_dir):
+        from registry.core.nginx_service import _write_file_atomic
+
+        target = temp_dir / "nginx.conf"
+        target.write_text("old")
+        _write_file_atomic(target, "new")
+
+        assert target.read_text() == "new"
+        assert [p.name for p in temp_dir.iterdir()] == ["nginx.conf"]
+
+
+class _FakeMetadataHandler(BaseHTTPRequestHandler):
+    """IMDSv2 subset: token endpoint and public-hostname."""
+
+    hostname = "ec2-1-2-3-4.compute-1.amazonaws.com"
+    requests = 0
+
+    def do_PUT(self):
+        self._reply("token" if self.path == "/latest/api/token" else None)
+
+    def do_GET(self):
+        type(self).requests += 1
+        authorized = self.headers.get("X-aws-ec2-metadata-token") == "token"
+        if self.path == "/latest/meta-data/public-hostname" and authorized:
+            self._reply(type(self).hostname)
+        else:
+            self._reply(None)
+
+    def _reply(self, body):
+        self.send_response(200 if body else 404)
+        self.end_headers()
+        if body:
+            self.wfile.write(body.encode())
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.mark.unit
+@pytest.mark.core
+class TestNginxPublicDns:
+    """Test suite for resolving the public DNS name off the config hot path."""
+
+    @pytest.fixture
+    def metadata_server(self):
+        _FakeMetadataHandler.requests = 0
+        server = HTTPServer(("127.0.0.1", 0), _FakeMetadataHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield f"http://127.0.0.1:{server.server_port}"
+        server.shutdown()
+        server.server_close()
+
+    @pytest.fixture
+    def mock_settings(self, metadata_server):
+        mock_settings = Mock()
+        mock_settings.ec2_public_dns = ""
+        mock_settings.ec2_metadata_url = metadata_server
+        mock_settings.ec2_public_dns_refresh_seconds = 0
+        with patch('registry.core.nginx_service.settings', mock_settings):
+            yield mock_settings
+
+    @pytest.mark.asyncio
+    async def test_resolved_from_metadata(self, mock_settings):
+        """Test the IMDSv2 lookup against a local fake metadata server."""
+        service = NginxConfigService()
+        await service.start_public_dns_refresh()
+        assert service._public_dns == "ec2-1-2-3-4.compute-1.amazonaws.com"
+        assert service._public_dns_task is None
+
+    @pytest.mark.asyncio
+    async def test_override_skips_metadata(self, mock_settings):
+        """Test that a configured public DNS is used without contacting the metadata service."""
+        mock_settings.ec2_public_dns = "gateway.example.com"
+        service = NginxConfigService()
+        assert await service.resolve_public_dns() == "gateway.example.com"
+        assert _FakeMetadataHandler.requests == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_lookup_keeps_previous(self, mock_settings, metadata_server):
+        """Test that an unreachable metadata service does not clear a resolved name."""
+        service = NginxConfigService()
+        await service.resolve_public_dns()
+        mock_settings.ec2_metadata_url = "http://127.0.0.1:1"
+        assert await service.resolve_public_dns() == "ec2-1-2-3-4.compute-1.amazonaws.com"
+
+    @pytest.mark.asyncio
+    async def test_refresh_requests_reconcile_on_change(self, mock_settings, monkeypatch):
+        """Test that the background refresh reconciles nginx when the name changes."""
+        mock_settings.ec2_public_dns_refresh_seconds = 0.05
+        service = NginxConfigService()
+        with patch.object(service, 'request_reconcile') as mock_reconcile:
+            await service.start_public_dns_refresh()
+            monkeypatch.setattr(_FakeMetadataHandler, "hostname", "ec2-5-6-7-8.compute-1.amazonaws.com")
+            for _ in range(100):
+                if mock_reconcile.called:
+                    break
+                await asyncio.sleep(0.02)
+            await service.stop_public_dns_refresh()
+
+        mock_reconcile.assert_called_with("public DNS change")
+        assert service._public_dns == "ec2-5-6-7-8.compute-1.amazonaws.com"
+
+    @pytest.mark.asyncio
+    async def test_generate_config_uses_resolved_name(self, mock_settings, tmp_path):
+        """Test that config generation reuses the resolved name instead of querying metadata."""
+        template_path = tmp_path / "nginx_template.conf"
+        template_path.write_text("server_name localhost {{EC2_PUBLIC_DNS}};\n{{LOCATION_BLOCKS}}\n")
+        mock_settings.nginx_config_path = tmp_path / "nginx.conf"
+        service = NginxConfigService()
+        service.nginx_template_path = template_path
+        await service.resolve_public_dns()
+
+        with patch('registry.health.service.health_service'), \
+             patch.object(service, 'get_ec2_public_dns', new_callable=AsyncMock) as mock_lookup, \
+             patch.object(service, 'validate_nginx_config', new_callable=AsyncMock, return_value=True), \
+             patch.object(service, 'reload_nginx_async', new_callable=AsyncMock, return_value=Mock(success=True)):
+            assert await service.generate_config_async({}) is True
+
+        mock_lookup.assert_not_called()
+        assert "server_name localhost ec2-1-2-3-4.compute-1.amazonaws.com;" in mock_settings.nginx_config_path.read_text()
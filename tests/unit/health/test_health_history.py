@@ -0,0 +1,174 @@
+"""
+Unit tests for the per-service health history store.
+"""
+import pytest
+from time import time
+from unittest.mock import patch
+
+from fastapi import HTTPException
+
+from registry.constants import HealthStatus
+from registry.health.history import (
+    HealthHistoryStore,
+    ServiceHealthHistory,
+    STATUS_CODE_DOWN,
+    STATUS_CODE_UP,
+    STATUS_CODE_UP_WITH_ISSUES,
+    status_to_code,
+)
+
+
+@pytest.mark.unit
+@pytest.mark.health
+class TestServiceHealthHistory:
+    """Test suite for the array-backed ring buffer."""
+
+    def test_status_to_code(self):
+        """Test mapping of status strings to compact codes."""
+        assert status_to_code(HealthStatus.HEALTHY) == STATUS_CODE_UP
+        assert status_to_code(HealthStatus.HEALTHY_AUTH_EXPIRED) == STATUS_CODE_UP_WITH_ISSUES
+        assert status_to_code(HealthStatus.UNHEALTHY_TIMEOUT) == STATUS_CODE_DOWN
+        assert status_to_code("error: ConnectError") == STATUS_CODE_DOWN
+
+    def test_ring_buffer_overwrites_oldest(self):
+        """Test that the ring buffer keeps only the newest samples."""
+        history = ServiceHealthHistory(capacity=3, rollup_interval_seconds=60, rollup_capacity=10)
+        for i in range(5):
+            history.record(1000.0 + i, float(i), STATUS_CODE_UP)
+
+        assert len(history) == 3
+        summary = history.summarize(since=0)
+        assert summary["samples"] == 3
+        assert summary["latency_ms"]["max"] == 4.0
+        assert summary["latency_ms"]["p50"] == 3.0
+
+    def test_percentiles_and_uptime(self):
+        """Test latency percentiles and uptime over raw samples."""
+        history = ServiceHealthHistory(capacity=200, rollup_interval_seconds=60, rollup_capacity=10)
+        for i in range(1, 101):
+            status_code = STATUS_CODE_DOWN if i % 10 == 0 else STATUS_CODE_UP
+            history.record(1000.0, float(i), status_code)
+
+        summary = history.summarize(since=0)
+        assert summary["samples"] == 100
+        assert summary["uptime_percent"] == 90.0
+        assert summary["latency_ms"]["p50"] == 50.0
+        assert summary["latency_ms"]["p95"] == 95.0
+        assert summary["latency_ms"]["p99"] == 99.0
+        assert summary["latency_ms"]["avg"] == 50.5
+
+    def test_summarize_filters_by_time(self):
+        """Test that samples older than the window are ignored."""
+        history = ServiceHealthHistory(capacity=10, rollup_interval_seconds=60, rollup_capacity=10)
+        history.record(100.0, 500.0, STATUS_CODE_DOWN)
+        history.record(200.0, 10.0, STATUS_CODE_UP)
+
+        summary = history.summarize(since=150.0)
+        assert summary["samples"] == 1
+        assert summary["uptime_percent"] == 100.0
+        assert summary["latency_ms"]["max"] == 10.0
+
+    def test_empty_summary(self):
+        """Test summary with no samples in range."""
+        history = ServiceHealthHistory(capacity=10, rollup_interval_seconds=60, rollup_capacity=10)
+        summary = history.summarize(since=0)
+        assert summary["samples"] == 0
+        assert summary["uptime_percent"] is None
+        assert summary["latency_ms"]["p99"] is None
+
+    def test_rollups_bucket_by_interval(self):
+        """Test that samples are downsampled into interval buckets."""
+        history = ServiceHealthHistory(capacity=10, rollup_interval_seconds=60, rollup_capacity=2)
+        history.record(0.0, 10.0, STATUS_CODE_UP)
+        history.record(30.0, 30.0, STATUS_CODE_DOWN)
+        history.record(60.0, 5.0, STATUS_CODE_UP)
+        history.record(120.0, 7.0, STATUS_CODE_UP)
+
+        rollups = history.get_rollups(since=0)
+        # Capacity of 2 drops the first bucket
+        assert len(rollups) == 2
+        assert rollups[0]["samples"] == 1
+        assert rollups[0]["avg_latency_ms"] == 5.0
+
+        history = ServiceHealthHistory(capacity=10, rollup_interval_seconds=60, rollup_capacity=5)
+        history.record(0.0, 10.0, STATUS_CODE_UP)
+        history.record(30.0, 30.0, STATUS_CODE_DOWN)
+        rollups = history.get_rollups(since=0)
+        assert len(rollups) == 1
+        assert rollups[0]["samples"] == 2
+        assert rollups[0]["uptime_percent"] == 50.0
+        assert rollups[0]["avg_latency_ms"] == 20.0
+        assert rollups[0]["max_latency_ms"] == 30.0
+
+
+@pytest.mark.unit
+@pytest.mark.health
+class TestHealthHistoryStore:
+    """Test suite for HealthHistoryStore."""
+
+    def test_get_history_unknown_service(self):
+        """Test that unknown services have no history."""
+        store = HealthHistoryStore(max_samples=10)
+        assert store.get_history("/missing") is None
+        assert not store.has_history("/missing")
+
+    def test_record_and_get_history(self):
+        """Test recording samples and summarizing them."""
+        store = HealthHistoryStore(max_samples=10, retention_seconds=3600)
+        now = time()
+        store.record("/svc", 12.0, HealthStatus.HEALTHY, timestamp=now)
+        store.record("/svc", 20.0, HealthStatus.UNHEALTHY_TIMEOUT, timestamp=now)
+
+        result = store.get_history("/svc")
+        assert result["service_path"] == "/svc"
+        assert result["samples"] == 2
+        assert result["uptime_percent"] == 50.0
+        assert result["window_seconds"] == 3600
+        assert len(result["rollups"]) == 1
+
+    def test_window_clamped_to_retention(self):
+        """Test that raw windows never exceed retention."""
+        store = HealthHistoryStore(max_samples=10, retention_seconds=60)
+        now = time()
+        store.record("/svc", 1.0, HealthStatus.HEALTHY, timestamp=now - 120)
+        store.record("/svc", 2.0, HealthStatus.HEALTHY, timestamp=now)
+
+        result = store.get_history("/svc", window_seconds=3600)
+        assert result["window_seconds"] == 60
+        assert result["samples"] == 1
+
+    def test_remove(self):
+        """Test removing a service's history."""
+        store = HealthHistoryStore(max_samples=10)
+        store.record("/svc", 1.0, HealthStatus.HEALTHY)
+        store.remove("/svc")
+        assert store.get_history("/svc") is None
+
+
+@pytest.mark.unit
+@pytest.mark.health
+class TestHealthHistoryRoute:
+    """Test suite for the history endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_history_not_found(self):
+        """Test 404 when a service has no history."""
+        from registry.health.routes import health_history
+
+        with patch('registry.health.routes.health_service') as mock_service:
+            mock_service.get_health_history.return_value = None
+            with pytest.raises(HTTPException) as exc_info:
+                await health_history("missing", None)
+            assert exc_info.value.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_history_normalizes_path(self):
+        """Test that the service path gets a leading slash."""
+        from registry.health.routes import health_history
+
+        with patch('registry.health.routes.health_service') as mock_service:
+            mock_service.get_health_history.return_value = {"service_path": "/svc", "samples": 1}
+            result = await health_history("svc", 300)
+
+        assert result["samples"] == 1
+        mock_service.get_health_history.assert_called_with("/svc", 300)
@@ -0,0 +1,118 @@
+"""
+Unit tests for probe latency tracking and degraded classification.
+"""
+import asyncio
+import pytest
+from unittest.mock import patch
+
+import httpx
+
+from registry.constants import HealthStatus
+from registry.health.latency import LatencyTracker, ProbeTimings, attach_probe_trace, probe
+
+
+def _timings(total_ms: float, ttfb_ms: float = None) -> ProbeTimings:
+    timings = ProbeTimings()
+    timings.started = 0.0
+    timings.finished = total_ms / 1000.0
+    if ttfb_ms is not None:
+        timings.first_byte = ttfb_ms / 1000.0
+    return timings
+
+
+@pytest.mark.unit
+@pytest.mark.health
+class TestProbeTimings:
+    """Test suite for ProbeTimings."""
+
+    def test_trace_events(self):
+        """Test connect and TTFB measurement from trace events."""
+        timings = ProbeTimings()
+        with patch('registry.health.latency.perf_counter', side_effect=[1.0, 1.05, 1.05, 1.1, 1.3]):
+            asyncio.run(timings.trace("connection.connect_tcp.started", {}))
+            asyncio.run(timings.trace("connection.connect_tcp.complete", {}))
+            asyncio.run(timings.trace("connection.start_tls.started", {}))
+            asyncio.run(timings.trace("connection.start_tls.complete", {}))
+            asyncio.run(timings.trace("http11.receive_response_headers.complete", {}))
+        timings.started = 1.0
+        timings.finished = 1.5
+
+        assert timings.connect_ms == pytest.approx(100.0)
+        assert timings.ttfb_ms == pytest.approx(300.0)
+        assert timings.total_ms == pytest.approx(500.0)
+
+    def test_reused_connection_has_no_connect_time(self):
+        """Test that pooled connections report no connect time."""
+        timings = _timings(10.0, 5.0)
+        assert timings.connect_ms is None
+        assert timings.to_dict() == {"connect": None, "ttfb": 5.0, "total": 10.0}
+
+    @pytest.mark.asyncio
+    async def test_attach_probe_trace(self):
+        """Test that the request hook wires the current probe's trace callback."""
+        with probe() as timings:
+            request = httpx.Request("GET", "http://example.com")
+            await attach_probe_trace(request)
+            assert request.extensions["trace"] == timings.trace
+
+        # Requests made after the probe are not traced
+        request = httpx.Request("GET", "http://example.com")
+        await attach_probe_trace(request)
+        assert "trace" not in request.extensions
+
+
+@pytest.mark.unit
+@pytest.mark.health
+class TestLatencyTracker:
+    """Test suite for LatencyTracker."""
+
+    def test_ewma(self):
+        """Test exponentially weighted moving average."""
+        tracker = LatencyTracker(alpha=0.5, total_threshold_ms=1000, ttfb_threshold_ms=1000)
+        tracker.observe("/svc", _timings(100.0))
+        tracker.observe("/svc", _timings(300.0))
+        assert tracker.get_ewma_total("/svc") == pytest.approx(200.0)
+        assert tracker.get_latency("/svc")["last"]["total"] == 300.0
+
+    def test_classify_degraded(self):
+        """Test that slow healthy services are marked degraded."""
+        tracker = LatencyTracker(alpha=1.0, total_threshold_ms=1000, ttfb_threshold_ms=500)
+        tracker.observe("/fast", _timings(5.0, 2.0))
+        tracker.observe("/slow", _timings(1900.0, 100.0))
+        tracker.observe("/slow-ttfb", _timings(900.0, 800.0))
+
+        assert tracker.classify("/fast", HealthStatus.HEALTHY) == HealthStatus.HEALTHY
+        assert tracker.classify("/slow", HealthStatus.HEALTHY) == HealthStatus.DEGRADED
+        assert tracker.classify("/slow-ttfb", HealthStatus.HEALTHY) == HealthStatus.DEGRADED
+
+    def test_classify_leaves_other_statuses(self):
+        """Test that only fully healthy statuses are downgraded."""
+        tracker = LatencyTracker(alpha=1.0, total_threshold_ms=10, ttfb_threshold_ms=10)
+        tracker.observe("/svc", _timings(1000.0))
+        assert tracker.classify("/svc", HealthStatus.HEALTHY_AUTH_EXPIRED) == HealthStatus.HEALTHY_AUTH_EXPIRED
+        assert tracker.classify("/unknown", HealthStatus.HEALTHY) == HealthStatus.HEALTHY
+
+    def test_classify_hysteresis(self):
+        """Test that degraded services recover only below threshold * recovery ratio."""
+        tracker = LatencyTracker(alpha=1.0, total_threshold_ms=1000, ttfb_threshold_ms=1000, recovery_ratio=0.8)
+        tracker.observe("/svc", _timings(900.0))
+        assert tracker.classify("/svc", HealthStatus.HEALTHY, HealthStatus.HEALTHY) == HealthStatus.HEALTHY
+        assert tracker.classify("/svc", HealthStatus.HEALTHY, HealthStatus.DEGRADED) == HealthStatus.DEGRADED
+
+        tracker.observe("/svc", _timings(700.0))
+        assert tracker.classify("/svc", HealthStatus.HEALTHY, HealthStatus.DEGRADED) == HealthStatus.HEALTHY
+
+    def test_remove(self):
+        """Test that a removed service is no longer classified from its old EWMA."""
+        tracker = LatencyTracker(alpha=1.0, total_threshold_ms=1000, ttfb_threshold_ms=1000)
+        tracker.observe("/svc", _timings(1900.0))
+        assert tracker.classify("/svc", HealthStatus.HEALTHY) == HealthStatus.DEGRADED
+
+        tracker.remove("/svc")
+
+        assert tracker.get_latency("/svc") is None
+        assert tracker.classify("/svc", HealthStatus.HEALTHY) == HealthStatus.HEALTHY
+
+    def test_degraded_is_routable(self):
+        """Test that degraded services are still considered healthy for nginx inclusion."""
+        assert HealthStatus.is_healthy(HealthStatus.DEGRADED)
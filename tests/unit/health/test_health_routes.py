@@ -1,11 +1,19 @@
 """
 Unit tests for health monitoring routes.
 """
+import asyncio
 import pytest
 from unittest.mock import Mock, patch, AsyncMock
-from fastapi import WebSocket, WebSocketDisconnect
+from fastapi import Request, Response, WebSocket, WebSocketDisconnect
 
-from registry.health.routes import router, websocket_endpoint, health_status_http
+from registry.health.routes import (
+    router,
+    websocket_endpoint,
+    health_status_http,
+    health_status_events,
+    _health_event_stream,
+)
+from registry.health.service import HealthChangeFeed
 
 
 @pytest.mark.unit
@@ -36,6 +44,15 @@ class TestHealthRoutes:
             }
             yield mock_service
 
+    @pytest.fixture
+    def mock_request(self):
+        """Create a mock HTTP request without conditional headers."""
+        request = Mock(spec=Request)
+        request.headers = {}
+        request.cookies = {}
+        request.query_params = {}
+        return request
+
     @pytest.mark.asyncio
     async def test_websocket_endpoint_normal_operation(self, mock_websocket, mock_health_service):
         """Test normal WebSocket operation."""
@@ -106,36 +123,36 @@ class TestHealthRoutes:
         mock_health_service.remove_websocket_connection.assert_called_once_with(mock_websocket)
 
     @pytest.mark.asyncio
-    async def test_health_status_http_success(self, mock_health_service):
+    async def test_health_status_http_success(self, mock_health_service, mock_request):
         """Test successful HTTP health status retrieval."""
         expected_status = {
             "service1": {"status": "healthy", "last_check": "2023-01-01T00:00:00Z"},
             "service2": {"status": "unhealthy", "last_check": "2023-01-01T00:00:00Z"}
         }
         
-        result = await health_status_http()
+        result = await health_status_http(mock_request, Response())
         
         assert result == expected_status
         mock_health_service.get_all_health_status.assert_called_once()
 
     @pytest.mark.asyncio
-    async def test_health_status_http_empty_status(self, mock_health_service):
+    async def test_health_status_http_empty_status(self, mock_health_service, mock_request):
         """Test HTTP health status when no services are monitored."""
         mock_health_service.get_all_health_status.return_value = {}
         
-        result = await health_status_http()
+        result = await health_status_http(mock_request, Response())
         
         assert result == {}
         mock_health_service.get_all_health_status.assert_called_once()
 
     @pytest.mark.asyncio
-    async def test_health_status_http_service_exception(self, mock_health_service):
+    async def test_health_status_http_service_exception(self, mock_health_service, mock_request):
         """Test HTTP health status when service raises exception."""
         mock_health_service.get_all_health_status.side_effect = Exception("Service error")
         
         # Should propagate the exception
         with pytest.raises(Exception, match="Service error"):
-            await health_status_http()
+            await health_status_http(mock_request, Response())
 
     def test_router_configuration(self):
         """Test that the router is properly configured."""
@@ -171,4 +188,142 @@ class TestHealthRoutes:
         mock_health_service.remove_websocket_connection.assert_called_once_with(mock_websocket)
         
         # Verify multiple receive_text calls
-        assert mock_websocket.receive_text.call_count == 4 
\ No newline at end of file
+        assert mock_websocket.receive_text.call_count == 4
+
+    @pytest.mark.asyncio
+    async def test_health_status_http_sets_etag(self, mock_health_service, mock_request):
+        """Test that the polling endpoint returns an ETag header."""
+        response = Response()
+
+        await health_status_http(mock_request, response)
+
+        assert response.headers["ETag"].startswith('W/"')
+
+    @pytest.mark.asyncio
+    async def test_health_status_http_not_modified(self, mock_health_service, mock_request):
+        """Test that a matching If-None-Match yields a bodyless 304."""
+        first_response = Response()
+        await health_status_http(mock_request, first_response)
+        etag = first_response.headers["ETag"]
+
+        mock_request.headers = {"if-none-match": etag}
+        result = await health_status_http(mock_request, Response())
+
+        assert isinstance(result, Response)
+        assert result.status_code == 304
+        assert result.headers["ETag"] == etag
+
+    @pytest.mark.asyncio
+    async def test_health_status_http_etag_changes_with_status(self, mock_health_service, mock_request):
+        """Test that a stale ETag returns the full body."""
+        first_response = Response()
+        await health_status_http(mock_request, first_response)
+
+        mock_health_service.get_all_health_status.return_value = {
+            "service1": {"status": "unhealthy", "last_check": "2023-01-01T00:05:00Z"}
+        }
+        mock_request.headers = {"if-none-match": first_response.headers["ETag"]}
+        result = await health_status_http(mock_request, Response())
+
+        assert result == {"service1": {"status": "unhealthy", "last_check": "2023-01-01T00:05:00Z"}}
+
+    @pytest.mark.asyncio
+    async def test_health_status_events_requires_session(self, mock_health_service, mock_request):
+        """Test that the SSE endpoint rejects requests without a session."""
+        result = await health_status_events(mock_request)
+
+        assert result.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_health_event_stream_starts_with_snapshot(self, mock_health_service, mock_request):
+        """Test that a new SSE client receives a full snapshot first."""
+        mock_health_service.change_feed = HealthChangeFeed(max_events=10)
+        mock_health_service.change_feed.publish({"service1": {"status": "healthy"}})
+        mock_request.is_disconnected = AsyncMock(return_value=True)
+
+        frames = [frame async for frame in _health_event_stream(mock_request, None)]
+
+        assert frames[0].startswith("retry:")
+        assert frames[1].startswith("id: 1\n")
+        assert '"service2"' in frames[1]
+
+    @pytest.mark.asyncio
+    async def test_health_event_stream_resumes_from_last_event_id(self, mock_health_service, mock_request):
+        """Test that Last-Event-ID replays only the missed changes."""
+        feed = HealthChangeFeed(max_events=10)
+        feed.publish({"service1": {"status": "checking"}})
+        feed.publish({"service1": {"status": "healthy"}})
+        feed.publish({"service2": {"status": "unhealthy"}})
+        mock_health_service.change_feed = feed
+        mock_request.is_disconnected = AsyncMock(return_value=True)
+
+        frames = [frame async for frame in _health_event_stream(mock_request, 1)]
+
+        assert len(frames) == 3
+        assert frames[1].startswith("id: 2\n")
+        assert frames[2].startswith("id: 3\n")
+        mock_health_service.get_all_health_status.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_health_event_stream_delivers_events_published_between_reads(self, mock_health_service, mock_request):
+        """Test that a change published while the client is between reads is not lost."""
+        feed = HealthChangeFeed(max_events=10)
+        mock_health_service.change_feed = feed
+        mock_request.is_disconnected = AsyncMock(return_value=False)
+
+        stream = _health_event_stream(mock_request, None)
+        assert (await stream.__anext__()).startswith("retry:")
+        assert (await stream.__anext__()).startswith("id: 0\n")
+
+        # Published while the generator is suspended in its yield, before it waits again
+        feed.publish({"service1": {"status": "unhealthy"}})
+
+        frame = await asyncio.wait_for(stream.__anext__(), timeout=1.0)
+        assert frame.startswith("id: 1\n")
+        assert '"unhealthy"' in frame
+        await stream.aclose()
+
+
+@pytest.mark.unit
+@pytest.mark.health
+class TestHealthChangeFeed:
+    """Test suite for the health change feed."""
+
+    def test_publish_assigns_increasing_ids(self):
+        """Test that events get monotonically increasing ids."""
+        feed = HealthChangeFeed(max_events=5)
+
+        assert feed.publish({"a": 1}) == 1
+        assert feed.publish({"b": 2}) == 2
+        assert feed.events_since(0) == [(1, {"a": 1}), (2, {"b": 2})]
+        assert feed.events_since(2) == []
+
+    def test_events_since_evicted_returns_none(self):
+        """Test that resuming from an evicted id requires a snapshot."""
+        feed = HealthChangeFeed(max_events=2)
+        for i in range(5):
+            feed.publish({"n": i})
+
+        assert feed.events_since(1) is None
+        assert feed.events_since(3) == [(4, {"n": 3}), (5, {"n": 4})]
+
+    def test_events_since_unknown_future_id_returns_none(self):
+        """Test that ids from a previous process trigger a snapshot."""
+        feed = HealthChangeFeed(max_events=2)
+        feed.publish({"n": 1})
+
+        assert feed.events_since(42) is None
+
+    @pytest.mark.asyncio
+    async def test_wait_for_event(self):
+        """Test waiting for new events with a timeout."""
+        feed = HealthChangeFeed(max_events=2)
+
+        assert await feed.wait_for_event(timeout=0.01) is False
+
+        waiter = asyncio.create_task(feed.wait_for_event(timeout=1.0))
+        await asyncio.sleep(0)
+        feed.publish({"n": 1})
+
+        assert await waiter is True
+
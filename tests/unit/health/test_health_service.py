@@ -2,10 +2,12 @@
 Unit tests for health monitoring service.
 """
 import asyncio
+import sys
 import pytest
 from datetime import datetime, timezone
 from unittest.mock import Mock, AsyncMock, patch
 
+from registry.constants import HealthStatus
 from registry.health.service import HealthMonitoringService
 
 
@@ -245,4 +247,136 @@ class TestHealthMonitoringService:
             
             assert "/test1" in result
             assert "/test2" in result
-            assert mock_get_data.call_count == 2 
\ No newline at end of file
+            assert mock_get_data.call_count == 2 
+
+    def test_forget_service_drops_history(self, health_service: HealthMonitoringService):
+        """Test that a forgotten service no longer reports its old probe history."""
+        health_service.history.record("/svc", 12.0, "healthy")
+        health_service.history.record("/other", 15.0, "healthy")
+
+        health_service.forget_service("/svc")
+
+        assert health_service.get_health_history("/svc") is None
+        assert health_service.get_health_history("/other") is not None
+
+        # Forgetting an unknown service is a no-op
+        health_service.forget_service("/never-registered")
+
+    def test_forget_service_drops_latency_state(self, health_service: HealthMonitoringService):
+        """Test that a forgotten service is not still classified as degraded when it returns."""
+        health_service.latency_tracker.load_latency("/svc", {"last": {"total": 5000.0}, "ewma": {"total": 5000.0}})
+        assert health_service.latency_tracker.classify("/svc", HealthStatus.HEALTHY) == HealthStatus.DEGRADED
+
+        health_service.forget_service("/svc")
+
+        assert health_service.latency_tracker.get_latency("/svc") is None
+        assert health_service.latency_tracker.classify("/svc", HealthStatus.HEALTHY) == HealthStatus.HEALTHY
+
+
+@pytest.mark.unit
+@pytest.mark.health
+class TestToolListRefresh:
+    """Test suite for single-flight tool list refresh."""
+
+    @pytest.fixture
+    def mcp_client_module(self):
+        """Stand-in for registry.core.mcp_client, whose MCP SDK imports need not resolve here."""
+        module = Mock()
+        module.mcp_client_service = Mock()
+        return module
+
+    def test_compute_tool_list_hash_is_order_insensitive_for_keys(self):
+        """Test that key order does not change the hash but content does."""
+        from registry.health.service import compute_tool_list_hash
+
+        tools_a = [{"name": "search", "description": "Search", "schema": {"a": 1, "b": 2}}]
+        tools_b = [{"schema": {"b": 2, "a": 1}, "description": "Search", "name": "search"}]
+        renamed = [{"name": "find", "description": "Search", "schema": {"a": 1, "b": 2}}]
+
+        assert compute_tool_list_hash(tools_a) == compute_tool_list_hash(tools_b)
+        assert compute_tool_list_hash(tools_a) != compute_tool_list_hash(renamed)
+        assert compute_tool_list_hash(None) == compute_tool_list_hash([])
+
+    @pytest.mark.asyncio
+    async def test_schedule_tool_refresh_single_flight(self, health_service: HealthMonitoringService):
+        """Test that concurrent refreshes for one service share a single fetch."""
+        release = asyncio.Event()
+
+        async def slow_update(service_path, proxy_pass_url):
+            await release.wait()
+
+        with patch.object(health_service, '_update_tools_background', side_effect=slow_update) as mock_update:
+            first = health_service.schedule_tool_refresh("/svc", "http://svc")
+            second = health_service.schedule_tool_refresh("/svc", "http://svc", force=True)
+            assert first is second
+
+            release.set()
+            await first
+            await asyncio.sleep(0)
+
+            assert mock_update.call_count == 1
+            assert "/svc" not in health_service._tool_refresh_tasks
+
+    @pytest.mark.asyncio
+    async def test_schedule_tool_refresh_min_interval(self, health_service: HealthMonitoringService):
+        """Test that refreshes within the minimum interval are skipped unless forced."""
+        with patch.object(health_service, '_update_tools_background', new_callable=AsyncMock) as mock_update:
+            task = health_service.schedule_tool_refresh("/svc", "http://svc")
+            await task
+
+            assert health_service.schedule_tool_refresh("/svc", "http://svc") is None
+
+            forced = health_service.schedule_tool_refresh("/svc", "http://svc", force=True)
+            await forced
+            assert mock_update.call_count == 2
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("force", [False, True])
+    async def test_immediate_health_check_forwards_forced_tool_refresh(self, health_service: HealthMonitoringService, force):
+        """Test that a manual refresh bypasses the minimum tool refresh interval."""
+        with patch('registry.services.server_service.server_service') as mock_server_service, \
+             patch('registry.core.nginx_service.nginx_service'), \
+             patch.object(health_service, '_check_server_instances', new_callable=AsyncMock) as mock_check, \
+             patch.object(health_service, 'schedule_tool_refresh') as mock_schedule:
+
+            mock_server_service.get_server_info.return_value = {"proxy_pass_url": "http://svc"}
+            mock_check.return_value = (True, "healthy", False)
+
+            status, _ = await health_service.perform_immediate_health_check("/svc", force_tool_refresh=force)
+
+            assert status == HealthStatus.HEALTHY
+            mock_schedule.assert_called_once_with("/svc", "http://svc", force=force)
+
+    @pytest.mark.asyncio
+    async def test_update_tools_detects_changed_schema(self, health_service: HealthMonitoringService, mcp_client_module):
+        """Test that a changed tool schema with the same count triggers an update."""
+        old_tools = [{"name": "search", "schema": {"type": "object"}}]
+        new_tools = [{"name": "search", "schema": {"type": "object", "required": ["q"]}}]
+
+        with patch('registry.services.server_service.server_service') as mock_server_service, \
+             patch.dict(sys.modules, {'registry.core.mcp_client': mcp_client_module}), \
+             patch.object(health_service, 'broadcast_health_update', new_callable=AsyncMock) as mock_broadcast:
+
+            mock_server_service.get_server_info.return_value = {"num_tools": 1, "tool_list": old_tools}
+            mcp_client_module.mcp_client_service.get_tools_from_server_with_server_info = AsyncMock(return_value=new_tools)
+
+            await health_service._update_tools_background("/svc", "http://svc")
+
+            updated_info = mock_server_service.update_server.call_args[0][1]
+            assert updated_info["tool_list"] == new_tools
+            mock_broadcast.assert_called_once_with("/svc")
+
+    @pytest.mark.asyncio
+    async def test_update_tools_skips_unchanged(self, health_service: HealthMonitoringService, mcp_client_module):
+        """Test that an identical tool list is not written back."""
+        tools = [{"name": "search", "schema": {"type": "object"}}]
+
+        with patch('registry.services.server_service.server_service') as mock_server_service, \
+             patch.dict(sys.modules, {'registry.core.mcp_client': mcp_client_module}):
+
+            mock_server_service.get_server_info.return_value = {"num_tools": 1, "tool_list": tools}
+            mcp_client_module.mcp_client_service.get_tools_from_server_with_server_info = AsyncMock(return_value=list(tools))
+
+            await health_service._update_tools_background("/svc", "http://svc")
+
+            mock_server_service.update_server.assert_not_called()
@@ -0,0 +1,227 @@
+"""
+Unit tests for the out-of-process health check worker.
+"""
+import asyncio
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, Mock, patch
+
+from registry.constants import HealthStatus
+from registry.health.service import HealthMonitoringService
+from registry.health.worker import HealthCheckWorker, HealthWorkerError, _create_worker_service, _run_check_cycle
+
+
+def _delta(status: str, refresh_tools: bool = False) -> dict:
+    return {
+        "status": status,
+        "last_checked_iso": datetime(2025, 1, 1, tzinfo=timezone.utc).isoformat(),
+        "probe_ms": 12.5,
+        "timestamp": 1735689600.0,
+        "latency": {"last": {"connect": 1.0, "ttfb": 10.0, "total": 12.5}, "ewma": {"connect": 1.0, "ttfb": 10.0, "total": 12.5}},
+        "refresh_tools": refresh_tools,
+    }
+
+
+@pytest.mark.unit
+@pytest.mark.health
+class TestHealthWorkerDeltas:
+    """Test suite for applying worker deltas in the API process."""
+
+    def test_apply_probe_delta(self, health_service: HealthMonitoringService):
+        """Test that a delta updates status, history and latency."""
+        with patch('registry.services.server_service.server_service') as mock_server_service:
+            mock_server_service.is_service_enabled.return_value = True
+
+            changed = health_service.apply_probe_delta("/svc", _delta(HealthStatus.HEALTHY))
+
+        assert changed is True
+        assert health_service.server_health_status["/svc"] == HealthStatus.HEALTHY
+        assert health_service.server_last_check_time["/svc"].year == 2025
+        assert health_service.history.get_history("/svc", include_rollups=False) is not None
+        assert health_service.latency_tracker.get_ewma_total("/svc") == 12.5
+
+    def test_apply_probe_delta_unchanged(self, health_service: HealthMonitoringService):
+        """Test that an unchanged status is not reported as a change."""
+        health_service.server_health_status["/svc"] = HealthStatus.HEALTHY
+        with patch('registry.services.server_service.server_service') as mock_server_service:
+            mock_server_service.is_service_enabled.return_value = True
+            assert health_service.apply_probe_delta("/svc", _delta(HealthStatus.HEALTHY)) is False
+
+    def test_apply_probe_delta_disabled_service(self, health_service: HealthMonitoringService):
+        """Test that deltas for services disabled mid-cycle are dropped."""
+        with patch('registry.services.server_service.server_service') as mock_server_service:
+            mock_server_service.is_service_enabled.return_value = False
+            assert health_service.apply_probe_delta("/svc", _delta(HealthStatus.HEALTHY)) is False
+        assert "/svc" not in health_service.server_health_status
+
+    def test_apply_probe_delta_schedules_tool_refresh(self, health_service: HealthMonitoringService):
+        """Test that tool refreshes requested by the worker run in the API process."""
+        with patch('registry.services.server_service.server_service') as mock_server_service, \
+             patch.object(health_service, 'schedule_tool_refresh') as mock_refresh:
+            mock_server_service.is_service_enabled.return_value = True
+            mock_server_service.get_server_info.return_value = {"proxy_pass_url": "http://svc"}
+
+            health_service.apply_probe_delta("/svc", _delta(HealthStatus.HEALTHY, refresh_tools=True))
+
+        mock_refresh.assert_called_once_with("/svc", "http://svc")
+
+    def test_apply_probe_delta_endpoint_change(self, health_service: HealthMonitoringService):
+        """Test that a per-endpoint health change is reported even when the status is unchanged."""
+        health_service.server_health_status["/svc"] = HealthStatus.HEALTHY
+        delta = _delta(HealthStatus.HEALTHY)
+        delta["endpoints"] = {"http://a:8000/mcp/": HealthStatus.HEALTHY, "http://b:8000/mcp/": HealthStatus.UNHEALTHY_TIMEOUT}
+        with patch('registry.services.server_service.server_service') as mock_server_service:
+            mock_server_service.is_service_enabled.return_value = True
+            assert health_service.apply_probe_delta("/svc", delta) is True
+            assert health_service.apply_probe_delta("/svc", delta) is False
+        assert health_service.endpoint_health["/svc"]["http://b:8000/mcp/"] == HealthStatus.UNHEALTHY_TIMEOUT
+
+    @pytest.mark.asyncio
+    async def test_worker_failure_falls_back_in_process(self, health_service: HealthMonitoringService):
+        """Test that checks run in-process when the worker is unavailable."""
+        health_service.worker = Mock()
+        health_service.worker.run_checks = AsyncMock(side_effect=HealthWorkerError("gone"))
+
+        with patch.object(health_service, 'probe_services', new_callable=AsyncMock) as mock_probe:
+            mock_probe.return_value = True
+            changed = await health_service._perform_health_checks_in_worker({"/svc": {"proxy_pass_url": "http://svc"}})
+
+        assert changed is True
+        mock_probe.assert_called_once()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("garbage", [
+        b"Some library printing to stdout\n",
+        b"42\n",
+        b'{"id": 1, "type": "del',  # truncated by a crash
+    ])
+    async def test_corrupted_stream_raises_worker_error(self, garbage):
+        """Test that stray worker output is reported as a worker failure and the worker is killed."""
+        worker = HealthCheckWorker()
+        worker.process = Mock(returncode=None)
+        worker.process.stdout = asyncio.StreamReader()
+        worker.process.stdout.feed_data(b'{"id": 1, "type": "delta", "path": "/a", "delta": {}}\n' + garbage)
+        worker.process.stdout.feed_eof()
+        on_delta = AsyncMock()
+
+        with pytest.raises(HealthWorkerError, match="malformed output"):
+            await worker._read_results(1, on_delta)
+
+        on_delta.assert_awaited_once_with("/a", {})
+        worker.process.kill.assert_called_once()
+
+
+@pytest.mark.unit
+@pytest.mark.health
+class TestHealthWorkerCycle:
+    """Test suite for the worker side of a check cycle."""
+
+    @pytest.mark.asyncio
+    async def test_run_check_cycle_streams_deltas(self):
+        """Test that each probed service produces a delta followed by done."""
+        service = _create_worker_service()
+
+        async def fake_check(client, service_path, server_info):
+            service.server_health_status[service_path] = HealthStatus.HEALTHY
+            service.server_last_check_time[service_path] = datetime.now(timezone.utc)
+            service.history.record(service_path, 5.0, HealthStatus.HEALTHY)
+            service.schedule_tool_refresh(service_path, server_info["proxy_pass_url"])
+            return True
+
+        messages = []
+        request = {
+            "id": 7,
+            "type": "check",
+            "servers": {"/a": {"proxy_pass_url": "http://a"}, "/b": {"proxy_pass_url": "http://b"}},
+            "statuses": {"/a": HealthStatus.UNKNOWN},
+        }
+        with patch.object(service, '_check_single_service', side_effect=fake_check):
+            await _run_check_cycle(service, request, messages.append)
+
+        deltas = {m["path"]: m["delta"] for m in messages if m["type"] == "delta"}
+        assert set(deltas) == {"/a", "/b"}
+        assert deltas["/a"]["status"] == HealthStatus.HEALTHY
+        assert deltas["/a"]["probe_ms"] == 5.0
+        assert deltas["/a"]["refresh_tools"] is True
+        assert messages[-1] == {"id": 7, "type": "done"}
+
+    @pytest.mark.asyncio
+    async def test_run_check_cycle_seeds_latency_from_api(self):
+        """Test that the worker drops EWMA state for services the API process no longer tracks."""
+        service = _create_worker_service()
+        slow = {"last": {"total": 5000.0}, "ewma": {"total": 5000.0}}
+        service.latency_tracker.load_latency("/a", slow)
+        service.latency_tracker.load_latency("/b", slow)
+
+        request = {
+            "id": 1,
+            "type": "check",
+            "servers": {"/a": {"proxy_pass_url": "http://a"}, "/b": {"proxy_pass_url": "http://b"}},
+            "statuses": {},
+            # /b was disabled and re-enabled in the API process since the last cycle
+            "latencies": {"/a": slow, "/b": None},
+        }
+        with patch.object(service, 'probe_services', new_callable=AsyncMock):
+            await _run_check_cycle(service, request, Mock())
+
+        assert service.latency_tracker.get_ewma_total("/a") == 5000.0
+        assert service.latency_tracker.get_latency("/b") is None
+
+
+@pytest.mark.unit
+@pytest.mark.health
+class TestServerInstanceChecks:
+    """Test suite for probing multi-instance servers."""
+
+    @pytest.mark.asyncio
+    async def test_healthy_when_any_instance_passes(self, health_service: HealthMonitoringService):
+        """Test that a server stays healthy while one of its instances passes."""
+        server_info = {
+            "proxy_pass_url": "http://a:8000/mcp/",
+            "endpoints": [{"url": "http://a:8000/mcp/"}, {"url": "http://b:8000/mcp/"}],
+        }
+
+        async def fake_probe(client, url, info):
+            return (url.startswith("http://b"), "healthy" if url.startswith("http://b") else "unhealthy: refused")
+
+        with patch.object(health_service, '_check_server_endpoint_transport_aware', side_effect=fake_probe):
+            is_healthy, detail, changed = await health_service._check_server_instances(
+                Mock(), "/svc", server_info["proxy_pass_url"], server_info
+            )
+
+        assert is_healthy is True
+        assert detail == "healthy"
+        assert changed is True
+        assert health_service.endpoint_health["/svc"] == {"http://a:8000/mcp/": "unhealthy: refused", "http://b:8000/mcp/": "healthy"}
+
+    @pytest.mark.asyncio
+    async def test_slow_instance_is_degraded(self, health_service: HealthMonitoringService):
+        """Test that an instance whose latency breaks the SLO is reported degraded, not the server."""
+        from registry.health.latency import LatencyTracker
+
+        server_info = {
+            "proxy_pass_url": "http://a:8000/mcp/",
+            "endpoints": [{"url": "http://a:8000/mcp/"}, {"url": "http://b:8000/mcp/"}],
+        }
+        health_service.endpoint_latency["/svc"] = LatencyTracker(total_threshold_ms=20, ttfb_threshold_ms=20)
+
+        async def fake_probe(client, url, info):
+            if url.startswith("http://b"):
+                await asyncio.sleep(0.05)
+            return True, "healthy"
+
+        with patch.object(health_service, '_check_server_endpoint_transport_aware', side_effect=fake_probe):
+            is_healthy, detail, _ = await health_service._check_server_instances(
+                Mock(), "/svc", server_info["proxy_pass_url"], server_info
+            )
+
+        assert is_healthy is True
+        assert detail == "healthy"
+        assert health_service.endpoint_health["/svc"] == {
+            "http://a:8000/mcp/": HealthStatus.HEALTHY,
+            "http://b:8000/mcp/": HealthStatus.DEGRADED,
+        }
+
+        health_service.forget_service("/svc")
+        assert "/svc" not in health_service.endpoint_latency
+        assert "/svc" not in health_service.endpoint_health